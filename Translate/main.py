@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-from deep_translator import GoogleTranslator
 import docx
 import os
 from PyPDF2 import PdfReader
@@ -10,6 +9,12 @@ from odf.opendocument import load
 from ttkthemes import ThemedTk
 import json
 from pathlib import Path
+from src.core.segmenter import TextSegmenter
+from src.core.translator import GoogleTranslationEngine
+from src.core.rate_limiter import RateLimitedEngine
+from src.core.worker import TranslationWorker, TranslationCancelled
+from src.core.docx_handler import DocxHandler
+from src.core.document_handler import DocumentWriter
 
 
 class DocumentTranslator:
@@ -25,8 +30,18 @@ class DocumentTranslator:
         self.settings_file = Path("translator_settings.json")
         self.load_settings()
         
-        # Add translation cancel flag
-        self.cancel_translation = False
+        # Reading, translating and writing run on a worker thread that reports back through a queue
+        self.worker = TranslationWorker(self.root, {
+            'progress': self.update_progress,
+            'preview': lambda text: self.preview_text.insert(tk.END, text),
+            'status': lambda message: self.progress_var.set(message),
+            'done': self.on_translation_done,
+            'cancelled': self.on_translation_cancelled,
+            'failed': self.on_translation_failed
+        })
+        
+        # One rate-limited engine so throttling and backoff state carry across runs
+        self.engine = RateLimitedEngine(GoogleTranslationEngine(), on_retry=self.report_retry)
         
         # Supported languages
         self.languages = {
@@ -181,8 +196,12 @@ class DocumentTranslator:
         if not input_file:
             messagebox.showerror("Error", "Please select a document first!")
             return
+        if self.worker.is_running:
+            messagebox.showinfo("Busy", "A translation is already running")
+            return
+        target = self.languages[self.target_lang.get()]
             
-        try:
+        def job(worker):
             # Get a sample of text to translate
             preview_text = ""
             if input_file.endswith('.docx'):
@@ -205,10 +224,13 @@ class DocumentTranslator:
                 preview_text = "\n".join([e.firstChild.data for e in elements[:3] if e.firstChild and e.firstChild.data.strip()])
                 
             if preview_text:
-                target = self.languages[self.target_lang.get()]
-                translator = GoogleTranslator(source='auto', target=target)
-                translated = translator.translate(text=preview_text)
-                
+                return preview_text, self.engine.translate(preview_text, target)
+            return None
+        
+        def show_preview(result):
+            self.progress_var.set("")
+            if result:
+                preview_text, translated = result
                 self.preview_text.delete(1.0, tk.END)
                 self.preview_text.insert(tk.END, "Original Text:\n\n")
                 self.preview_text.insert(tk.END, preview_text)
@@ -216,15 +238,38 @@ class DocumentTranslator:
                 self.preview_text.insert(tk.END, translated)
             else:
                 messagebox.showwarning("Warning", "No text content found for preview")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Preview failed: {str(e)}")
+        
+        self.progress_var.set("Preparing preview...")
+        self.worker.start(job, on_done=show_preview)
+    
+    def report_retry(self, attempt, retries, delay, error):
+        # Runs on the worker thread; cancelling here also cuts the backoff short
+        self.worker.check_cancelled()
+        self.worker.post('status', f"Retrying translation in {delay:.1f}s... (Attempt {attempt}/{retries})")
 
     def cancel_translation_task(self):
-        self.cancel_translation = True
+        self.worker.cancel()
+        if self.worker.is_running:
+            self.progress_var.set("Cancelling...")
+    
+    def update_progress(self, current, total, message):
+        self.progress_bar['value'] = (current / total) * 100 if total else 0
+        self.progress_var.set(message)
+    
+    def on_translation_done(self, result):
+        self.progress_var.set("Translation completed")
+        self.progress_bar['value'] = 100
+        messagebox.showinfo("Success", "Translation completed successfully!")
+    
+    def on_translation_cancelled(self):
         self.progress_var.set("Translation cancelled")
         self.progress_bar['value'] = 0
-        self.root.update()
+        messagebox.showinfo("Cancelled", "Translation was cancelled by user")
+    
+    def on_translation_failed(self, error):
+        self.progress_var.set("Translation failed")
+        self.progress_bar['value'] = 0
+        messagebox.showerror("Error", f"Translation failed: {str(error)}")
 
     def save_translation_as(self):
         input_file = self.file_path.get()
@@ -262,13 +307,16 @@ class DocumentTranslator:
             messagebox.showerror("Error", "Please select a document first!")
             return
 
-        # Reset cancel flag
-        self.cancel_translation = False
+        if self.worker.is_running:
+            messagebox.showinfo("Busy", "A translation is already running")
+            return
         
         target = self.languages[self.target_lang.get()]
-        translator = GoogleTranslator(source='auto', target=target)
-        max_retries = 3
-        retry_delay = 2  # seconds
+        engine = self.engine
+        segmenter = TextSegmenter()
+        # Every output format is written directly, without a temporary DOCX or Word
+        writer = DocumentWriter()
+        batch_size = 50  # paragraphs or text runs per progress update; the engine packs them into few requests
         
         # Get AI instructions
         ai_instructions = self.ai_instructions.get("1.0", tk.END).strip()
@@ -286,130 +334,67 @@ class DocumentTranslator:
         # Reset progress bar and preview
         self.progress_bar['value'] = 0
         self.preview_text.delete(1.0, tk.END)
-        translated = ""
         
-        def translate_with_retry(text, retries=max_retries):
-            if self.cancel_translation:
-                return None
-            for attempt in range(retries):
-                try:
-                    return translator.translate(text=text)
-                except Exception as e:
-                    if attempt < retries - 1 and not self.cancel_translation:
-                        self.progress_var.set(f"Retrying translation... (Attempt {attempt + 2}/{retries})")
-                        self.root.update()
-                        import time
-                        time.sleep(retry_delay)
-                    else:
-                        raise Exception(f"Translation failed after {retries} attempts: {str(e)}")
-            return None
+        def call_with_retry(call):
+            # Backoff, throttling and the circuit breaker live in the shared engine
+            self.worker.check_cancelled()
+            try:
+                return call()
+            except TranslationCancelled:
+                raise
+            except Exception as e:
+                raise Exception(f"Translation failed: {str(e)}")
 
-        try:
+        def translate_with_retry(text):
+            return call_with_retry(lambda: engine.translate(text, target))
+        
+        # Everything below runs on the worker thread and only talks to the UI through it
+        def job(worker):
+            translated = ""
             if input_file.endswith('.docx'):
-                doc = docx.Document(input_file)
-                total_paragraphs = len(doc.paragraphs)
+                # Translate run by run in the original document, so formatting,
+                # tables, headers and footers survive
+                handler = DocxHandler(input_file)
+                doc = handler.document
+                runs = handler.texts
+                translations = list(runs)  # runs that fail to translate keep their text
+                total_runs = len(runs)
 
-                for i, para in enumerate(doc.paragraphs, 1):
-                    if self.cancel_translation:
+                for start in range(0, total_runs, batch_size):
+                    if worker.cancelled:
                         break
-                    if para.text.strip():
-                        try:
-                            translated = translate_with_retry(para.text)
-                            if translated:
-                                para.text = translated
-                                self.preview_text.insert(tk.END, f"\n{translated}")
-                            else:
-                                if self.cancel_translation:
-                                    break
-                                raise Exception("Failed to translate paragraph")
-                        except Exception as e:
-                            if not self.cancel_translation:
-                                self.preview_text.insert(tk.END, f"\nError translating paragraph: {str(e)}")
-                            continue
-                        progress = (i / total_paragraphs) * 100
-                        self.progress_bar['value'] = progress
-                        self.progress_var.set(f"Translating... {i}/{total_paragraphs} paragraphs")
-                        self.root.update()
+                    batch = runs[start:start + batch_size]
+                    try:
+                        results = call_with_retry(lambda: engine.translate_batch(batch, target))
+                        if results:
+                            translations[start:start + len(batch)] = results
+                            worker.preview("\n" + "\n".join(results))
+                        else:
+                            if worker.cancelled:
+                                break
+                            raise Exception("Failed to translate paragraphs")
+                    except Exception as e:
+                        if not worker.cancelled:
+                            worker.preview(f"\nError translating paragraphs: {str(e)}")
+                        continue
+                    done = start + len(batch)
+                    worker.progress(done, total_runs, f"Translating... {done}/{total_runs} text runs")
+                handler.write_back(translations)
 
-                if not self.cancel_translation:
+                if not worker.cancelled:
                     if output_format == "DOCX":
                         doc.save(output_path)
                     else:
-                        # Save to temporary DOCX first
-                        temp_docx = f"{os.path.splitext(input_file)[0]}_temp.docx"
-                        doc.save(temp_docx)
-                        
-                        try:
-                            # Convert to desired format
-                            if output_format == "PDF":
-                                from docx2pdf import convert
-                                convert(temp_docx, output_path)
-                            elif output_format in ["TXT", "RTF", "ODT"]:
-                                # Extract text and save in desired format
-                                text_content = "\n\n".join([p.text for p in doc.paragraphs if p.text.strip()])
-                                
-                                if output_format == "RTF":
-                                    from striprtf.striprtf import rtf
-                                    with open(output_path, 'w') as f:
-                                        f.write(rtf(text_content))
-                                elif output_format == "ODT":
-                                    from odf.opendocument import OpenDocumentText
-                                    from odf.text import P
-                                    odt_doc = OpenDocumentText()
-                                    for para in text_content.split('\n\n'):
-                                        if para.strip():
-                                            odt_doc.text.addElement(P(text=para))
-                                    odt_doc.save(output_path)
-                                else:  # TXT
-                                    with open(output_path, 'w', encoding='utf-8') as f:
-                                        f.write(text_content)
-                        finally:
-                            # Clean up temporary file
-                            if os.path.exists(temp_docx):
-                                os.remove(temp_docx)
+                        writer.write_paragraphs(handler.paragraph_texts(), output_path, target_lang=target)
 
             elif input_file.endswith('.txt'):
                 with open(input_file, 'r', encoding='utf-8') as f:
                     content = f.read()
-                if not self.cancel_translation:
-                    translated = translator.translate(text=content)
+                if not worker.cancelled:
+                    translated = segmenter.translate(content, translate_with_retry)
                     if translated:
-                        if output_format == "TXT":
-                            with open(output_path, 'w', encoding='utf-8') as f:
-                                f.write(translated)
-                        else:
-                            # Create a temporary docx with the translated content
-                            temp_docx = f"{os.path.splitext(input_file)[0]}_temp.docx"
-                            doc = docx.Document()
-                            for para in translated.split('\n'):
-                                if para.strip():
-                                    doc.add_paragraph(para)
-                            doc.save(temp_docx)
-                            
-                            try:
-                                # Convert to desired format
-                                if output_format == "PDF":
-                                    from docx2pdf import convert
-                                    convert(temp_docx, output_path)
-                                elif output_format == "RTF":
-                                    from striprtf.striprtf import rtf
-                                    text_content = '\n\n'.join([p.text for p in doc.paragraphs if p.text.strip()])
-                                    with open(output_path, 'w') as f:
-                                        f.write(rtf(text_content))
-                                elif output_format == "ODT":
-                                    from odf.opendocument import OpenDocumentText
-                                    from odf.text import P
-                                    odt_doc = OpenDocumentText()
-                                    for para in doc.paragraphs:
-                                        if para.text.strip():
-                                            odt_doc.text.addElement(P(text=para.text))
-                                    odt_doc.save(output_path)
-                            finally:
-                                # Clean up temporary file
-                                if os.path.exists(temp_docx):
-                                    os.remove(temp_docx)
-                        
-                        self.preview_text.insert(tk.END, f"\n{translated}")
+                        writer.write_document(translated, output_path, target_lang=target)
+                        worker.preview(f"\n{translated}")
 
             elif input_file.endswith('.pdf'):
                 reader = PdfReader(input_file)
@@ -417,7 +402,7 @@ class DocumentTranslator:
                 total_pages = len(reader.pages)
 
                 for i, page in enumerate(reader.pages, 1):
-                    if self.cancel_translation:
+                    if worker.cancelled:
                         break
                     text = page.extract_text()
                     if text.strip():
@@ -425,154 +410,42 @@ class DocumentTranslator:
                             translated = translate_with_retry(text)
                             if translated:
                                 content.append(translated)
-                                self.preview_text.insert(tk.END, f"\n{translated}")
+                                worker.preview(f"\n{translated}")
                             else:
-                                if self.cancel_translation:
+                                if worker.cancelled:
                                     break
                                 raise Exception("Failed to translate page")
                         except Exception as e:
-                            if not self.cancel_translation:
-                                self.preview_text.insert(tk.END, f"\nError translating page {i}: {str(e)}")
+                            if not worker.cancelled:
+                                worker.preview(f"\nError translating page {i}: {str(e)}")
                             continue
-                    progress = (i / total_pages) * 100
-                    self.progress_bar['value'] = progress
-                    self.progress_var.set(f"Translating... {i}/{total_pages} pages")
-                    self.root.update()
+                    worker.progress(i, total_pages, f"Translating... {i}/{total_pages} pages")
 
-                if not self.cancel_translation:
-                    translated_content = '\n\n'.join(content)
-                    
-                    if output_format == "TXT":
-                        with open(output_path, 'w', encoding='utf-8') as f:
-                            f.write(translated_content)
-                    else:
-                        # Create a temporary docx with the translated content
-                        temp_docx = f"{os.path.splitext(input_file)[0]}_temp.docx"
-                        doc = docx.Document()
-                        for para in translated_content.split('\n\n'):
-                            if para.strip():
-                                doc.add_paragraph(para)
-                        doc.save(temp_docx)
-                        
-                        try:
-                            # Convert to desired format
-                            if output_format == "PDF":
-                                from docx2pdf import convert
-                                convert(temp_docx, output_path)
-                            elif output_format == "RTF":
-                                from striprtf.striprtf import rtf
-                                text_content = '\n\n'.join([p.text for p in doc.paragraphs if p.text.strip()])
-                                with open(output_path, 'w') as f:
-                                    f.write(rtf(text_content))
-                            elif output_format == "ODT":
-                                from odf.opendocument import OpenDocumentText
-                                from odf.text import P
-                                odt_doc = OpenDocumentText()
-                                for para in doc.paragraphs:
-                                    if para.text.strip():
-                                        odt_doc.text.addElement(P(text=para.text))
-                                odt_doc.save(output_path)
-                        finally:
-                            # Clean up temporary file
-                            if os.path.exists(temp_docx):
-                                os.remove(temp_docx)
+                if not worker.cancelled:
+                    writer.write_document('\n\n'.join(content), output_path, target_lang=target,
+                                          source_path=input_file)
 
             elif input_file.endswith('.rtf'):
                 with open(input_file, 'r') as f:
                     content = rtf_to_text(f.read())
-                if not self.cancel_translation:
-                    translated = translator.translate(text=content)
+                if not worker.cancelled:
+                    translated = segmenter.translate(content, translate_with_retry)
                     if translated:
-                        if output_format == "RTF":
-                            with open(output_path, 'w') as f:
-                                f.write(rtf(translated))
-                        else:
-                            # Create a temporary docx with the translated content
-                            temp_docx = f"{os.path.splitext(input_file)[0]}_temp.docx"
-                            doc = docx.Document()
-                            for para in translated.split('\n'):
-                                if para.strip():
-                                    doc.add_paragraph(para)
-                            doc.save(temp_docx)
-                            
-                            try:
-                                # Convert to desired format
-                                if output_format == "PDF":
-                                    from docx2pdf import convert
-                                    convert(temp_docx, output_path)
-                                elif output_format == "TXT":
-                                    with open(output_path, 'w', encoding='utf-8') as f:
-                                        f.write(translated)
-                                elif output_format == "ODT":
-                                    from odf.opendocument import OpenDocumentText
-                                    from odf.text import P
-                                    odt_doc = OpenDocumentText()
-                                    for para in doc.paragraphs:
-                                        if para.text.strip():
-                                            odt_doc.text.addElement(P(text=para.text))
-                                    odt_doc.save(output_path)
-                            finally:
-                                # Clean up temporary file
-                                if os.path.exists(temp_docx):
-                                    os.remove(temp_docx)
-                        
-                        self.preview_text.insert(tk.END, f"\n{translated}")
+                        writer.write_document(translated, output_path, target_lang=target)
+                        worker.preview(f"\n{translated}")
 
             elif input_file.endswith('.odt'):
                 doc = load(input_file)
                 elements = doc.getElementsByType(odf_text.P)
                 content = "\n\n".join([e.firstChild.data for e in elements if e.firstChild and e.firstChild.data.strip()])
                 
-                if not self.cancel_translation:
-                    translated = translator.translate(text=content)
+                if not worker.cancelled:
+                    translated = segmenter.translate(content, translate_with_retry)
                     if translated:
-                        if output_format == "ODT":
-                            odt_doc = OpenDocumentText()
-                            for para in translated.split('\n\n'):
-                                if para.strip():
-                                    odt_doc.text.addElement(P(text=para))
-                            odt_doc.save(output_path)
-                        else:
-                            # Create a temporary docx with the translated content
-                            temp_docx = f"{os.path.splitext(input_file)[0]}_temp.docx"
-                            doc = docx.Document()
-                            for para in translated.split('\n\n'):
-                                if para.strip():
-                                    doc.add_paragraph(para)
-                            doc.save(temp_docx)
-                            
-                            try:
-                                # Convert to desired format
-                                if output_format == "PDF":
-                                    from docx2pdf import convert
-                                    convert(temp_docx, output_path)
-                                elif output_format == "TXT":
-                                    with open(output_path, 'w', encoding='utf-8') as f:
-                                        f.write(translated)
-                                elif output_format == "RTF":
-                                    from striprtf.striprtf import rtf
-                                    with open(output_path, 'w') as f:
-                                        f.write(rtf(translated))
-                            finally:
-                                # Clean up temporary file
-                                if os.path.exists(temp_docx):
-                                    os.remove(temp_docx)
-                        
-                        self.preview_text.insert(tk.END, f"\n{translated}")
-
-            if not self.cancel_translation:
-                self.progress_var.set("Translation completed")
-                self.progress_bar['value'] = 100
-                messagebox.showinfo("Success", "Translation completed successfully!")
-            else:
-                self.progress_var.set("Translation cancelled")
-                self.progress_bar['value'] = 0
-                messagebox.showinfo("Cancelled", "Translation was cancelled by user")
+                        writer.write_document(translated, output_path, target_lang=target)
+                        worker.preview(f"\n{translated}")
 
-        except Exception as e:
-            self.progress_var.set("Translation failed")
-            self.progress_bar['value'] = 0
-            messagebox.showerror("Error", f"Translation failed: {str(e)}")
+        self.worker.start(job)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from core.batch_processor import BatchProcessor
+from core.document_handler import DocumentHandler
+from core.translator import TranslationManager
+
+TRANSLATED_OUTPUT = re.compile(r'_translated(_[A-Za-z-]+)?$')
+# Events come from worker threads too; one write per line under the lock keeps them one per line
+_OUTPUT_LOCK = threading.Lock()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='translateai',
+        description="Translate documents without the GUI, with all segments translated concurrently"
+    )
+    parser.add_argument('inputs', nargs='+',
+                        help="Documents, directories or glob patterns such as 'docs/**/*.docx'")
+    parser.add_argument('-t', '--target', action='append', required=True,
+                        help="Target language code, e.g. hi; repeat or separate with commas for several")
+    parser.add_argument('-o', '--output-dir', help="Directory for translated files, mirroring the input "
+                        "tree (default: next to each input with a _translated suffix); with several "
+                        "targets each output name ends in _<lang>")
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help="Include documents in subdirectories of input directories")
+    parser.add_argument('-j', '--workers', type=int, default=4,
+                        help="Documents processed at the same time")
+    parser.add_argument('--json', action='store_true',
+                        help="Report progress as JSON lines on stdout")
+    parser.add_argument('--max-in-flight', type=int, default=16,
+                        help="Maximum translation requests in flight overall")
+    parser.add_argument('--per-engine-limit', type=int, default=8,
+                        help="Maximum translation requests in flight per engine")
+    parser.add_argument('--pdf-workers', type=int,
+                        help="Processes for PDF layout analysis (default: CPU count, 1 disables)")
+    parser.add_argument('--full', action='store_true',
+                        help="Retranslate every file, ignoring the manifests and journal of earlier runs")
+    parser.add_argument('--dedup', action='store_true',
+                        help="Translate segments repeated across files only once per target, "
+                        "holding the parsed files in memory until they are written")
+    parser.add_argument('--translate-all', action='store_true',
+                        help="Send every segment to the engine, including numbers, URLs, code and "
+                        "text already in the target language")
+    parser.add_argument('--fuzzy-accept', type=float, metavar='SCORE',
+                        help="Reuse the translation of a remembered segment at least this similar "
+                        "(0 to 1, e.g. 0.9) instead of calling the engine")
+    parser.add_argument('--memory-budget', type=int, metavar='MB',
+                        help="Memory the translation memory may use; past it, it moves to a temporary file")
+    parser.add_argument('--journal', help="SQLite job journal; rerunning with the same journal resumes "
+                        "an interrupted run, skipping finished files and retrying failed ones")
+    return parser
+
+def collect_files(inputs: Iterable[str], recursive: bool, extensions: Iterable[str]) -> List[str]:
+    """Expand files, directories and glob patterns into supported documents, without duplicates.
+    
+    Files named explicitly are always kept; directory walks and globs skip
+    the outputs of earlier runs (``*_translated.*`` and ``*_translated_<lang>.*``).
+    """
+    extensions = set(extensions)
+    found: Dict[str, None] = {}
+    for item in inputs:
+        path = Path(item)
+        if path.is_file():
+            found[str(path)] = None
+            continue
+        if path.is_dir():
+            candidates = sorted(path.rglob('*') if recursive else path.glob('*'))
+        else:
+            candidates = sorted(Path(match) for match in glob.glob(item, recursive=True))
+        for candidate in candidates:
+            if (candidate.is_file() and candidate.suffix.lower() in extensions
+                    and not TRANSLATED_OUTPUT.search(candidate.stem)):
+                found[str(candidate)] = None
+    return list(found)
+
+def parse_targets(values: List[str]) -> List[str]:
+    targets: Dict[str, None] = {}
+    for value in values:
+        for code in value.split(','):
+            if code.strip():
+                targets[code.strip()] = None
+    return list(targets)
+
+def print_progress(current: int, total: int, message: str) -> None:
+    print(f"[{current}/{total}] {message}", flush=True)
+
+def print_quality(label: str, target_lang: str, issues: List[str]) -> None:
+    lines = [f"Quality issues in {label} [{target_lang}]:"] + [f"- {issue}" for issue in issues]
+    with _OUTPUT_LOCK:
+        print('\n'.join(lines), flush=True)
+
+def emit_json(event: str, **fields) -> None:
+    line = json.dumps({'event': event, **fields}, ensure_ascii=False) + '\n'
+    with _OUTPUT_LOCK:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+def json_file_reporter(total: int) -> Callable[[str, str, str, bool], None]:
+    completed = 0
+    
+    def report(file_path: str, target: str, outcome: str, succeeded: bool) -> None:
+        nonlocal completed
+        completed += 1
+        fields = {'output': outcome} if succeeded else {'error': outcome}
+        emit_json('file', file=file_path, target=target, status='done' if succeeded else 'failed',
+                  completed=completed, total=total, **fields)
+    return report
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    targets = parse_targets(args.target)
+    if args.workers <= 0:
+        parser.error("--workers must be positive")
+    
+    files = collect_files(args.inputs, args.recursive, DocumentHandler().supported_formats)
+    if not files:
+        print("No supported documents found", file=sys.stderr)
+        return 2
+    # Outputs mirror the input tree below the deepest directory shared by all inputs
+    source_root = None
+    if args.output_dir:
+        source_root = os.path.commonpath([str(Path(f).resolve().parent) for f in files])
+    
+    manager = TranslationManager(filter_segments=not args.translate_all, fuzzy_accept=args.fuzzy_accept,
+                                 memory_budget=args.memory_budget << 20 if args.memory_budget else None)
+    processor = BatchProcessor(manager, pdf_workers=args.pdf_workers, incremental=not args.full,
+                               journal_path=args.journal, dedup=args.dedup)
+    if args.json:
+        emit_json('start', files=len(files), targets=targets)
+        processor.set_file_callback(json_file_reporter(len(files) * len(targets)))
+        processor.set_quality_callback(lambda label, target_lang, issues: emit_json(
+            'quality', file=label, target_lang=target_lang, issues=issues))
+    else:
+        processor.set_progress_callback(print_progress)
+        processor.set_quality_callback(print_quality)
+    
+    started = time.perf_counter()
+    # Every file is parsed once and translated to all targets concurrently
+    results = asyncio.run(processor.process_files_async(
+        files,
+        targets,
+        args.output_dir,
+        max_in_flight=args.max_in_flight,
+        per_engine_limit=args.per_engine_limit,
+        max_files=args.workers,
+        source_root=source_root
+    ))
+    
+    # Results hold the output path of each target on success and the error message otherwise
+    failed = 0
+    for target in targets:
+        target_failed = sum(1 for outcomes in results.values() if not Path(outcomes[target]).is_file())
+        failed += target_failed
+        if not args.json:
+            print(f"Translated {len(results) - target_failed} of {len(files)} files to {target}", flush=True)
+    
+    journal = processor.journal.summary() if processor.journal else None
+    filtered = manager.segment_filter.stats() if manager.segment_filter else None
+    if args.json:
+        emit_json('summary', files=len(files), targets=targets, failed=failed,
+                  seconds=round(time.perf_counter() - started, 3), journal=journal,
+                  dedup=processor.dedup_stats or None, filter=filtered, coalesced=manager.coalesced,
+                  fuzzy_accepted=manager.fuzzy_accepted)
+    else:
+        if filtered and filtered['passed']:
+            print(f"Passed through {filtered['passed']} of {filtered['segments']} segments untranslated, "
+                  f"{filtered['characters_saved']} characters and {filtered['requests_saved']} requests saved",
+                  flush=True)
+        if manager.coalesced:
+            print(f"Shared {manager.coalesced} segments with identical requests already in flight", flush=True)
+        if manager.fuzzy_accepted:
+            print(f"Reused {manager.fuzzy_accepted} fuzzy memory matches scoring at least {args.fuzzy_accept}",
+                  flush=True)
+        for target, stats in processor.dedup_stats.items():
+            print(f"Dedup {target}: {stats['segments']} segments, {stats['unique']} unique "
+                  f"({stats['ratio']:.1%} repeated), {stats['requests_saved']} requests saved", flush=True)
+        if journal:
+            print(f"Journal {args.journal}: {journal.get('done', 0)} done, {journal.get('failed', 0)} failed",
+                  flush=True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,48 @@
-from .translator import TranslationManager, TranslationEngine, GoogleTranslationEngine
-from .config import ConfigManager
-from .document_handler import DocumentHandler, DocumentWriter
-from .quality import QualityChecker
-from .batch_processor import BatchProcessor
-
-__all__ = [
-    'TranslationManager',
-    'TranslationEngine',
-    'GoogleTranslationEngine',
-    'ConfigManager',
-    'DocumentHandler',
-    'DocumentWriter',
-    'QualityChecker',
-    'BatchProcessor'
-]
\ No newline at end of file
+from .translator import TranslationManager, TranslationEngine, GoogleTranslationEngine
+from .config import ConfigManager
+from .document_handler import DocumentHandler, DocumentWriter
+from .quality import QualityChecker
+from .batch_processor import BatchProcessor
+from .segmenter import TextSegmenter, SegmentedText
+from .translation_memory import TranslationMemory, FuzzyMatch
+from .http_client import SessionPool, GoogleWebClient, ClientCache
+from .async_pipeline import AsyncTranslationPipeline
+from .rate_limiter import AdaptiveRateLimiter, CircuitBreaker, CircuitOpenError, RateLimitedEngine
+from .manifest import TranslationManifest
+from .worker import TranslationWorker, TranslationCancelled
+from .job_journal import JobJournal
+from .dedup import SegmentDeduplicator
+from .docx_handler import DocxHandler
+from .segment_filter import SegmentFilter
+from .language_detector import LanguageDetector
+
+__all__ = [
+    'TranslationManager',
+    'TranslationEngine',
+    'GoogleTranslationEngine',
+    'ConfigManager',
+    'DocumentHandler',
+    'DocumentWriter',
+    'QualityChecker',
+    'BatchProcessor',
+    'TextSegmenter',
+    'SegmentedText',
+    'TranslationMemory',
+    'FuzzyMatch',
+    'SessionPool',
+    'GoogleWebClient',
+    'ClientCache',
+    'AsyncTranslationPipeline',
+    'AdaptiveRateLimiter',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'RateLimitedEngine',
+    'TranslationManifest',
+    'TranslationWorker',
+    'TranslationCancelled',
+    'JobJournal',
+    'SegmentDeduplicator',
+    'DocxHandler',
+    'SegmentFilter',
+    'LanguageDetector'
+]
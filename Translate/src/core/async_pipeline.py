@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional
+import asyncio
+from .translator import TranslationManager, pack_requests
+
+class AsyncTranslationPipeline:
+    """Translate the segments of one or many documents concurrently.
+    
+    Every document is segmented, memory hits are resolved up front, and the
+    remaining segments are packed into request groups that run at the same
+    time. ``max_in_flight`` bounds the requests in flight across all engines
+    and ``per_engine_limit`` bounds them for any single engine, so a large
+    document finishes in about the time of its slowest group.
+    """
+    
+    def __init__(self,
+                 translation_manager: TranslationManager,
+                 max_in_flight: int = 16,
+                 per_engine_limit: int = 8,
+                 engine_limits: Optional[Dict[str, int]] = None):
+        if max_in_flight <= 0 or per_engine_limit <= 0:
+            raise ValueError("Concurrency limits must be positive")
+        self.translation_manager = translation_manager
+        self.max_in_flight = max_in_flight
+        self.per_engine_limit = per_engine_limit
+        self.engine_limits = engine_limits or {}
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        self._engine_slots: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def translate_documents(self, texts: List[str], target_lang: str) -> List[str]:
+        """Translate several documents concurrently, returning them in order"""
+        return list(await asyncio.gather(
+            *(self.translate_document(text, target_lang) for text in texts)
+        ))
+    
+    async def translate_document(self, text: str, target_lang: str) -> str:
+        segmented = self.translation_manager.segmenter.segment(text)
+        return segmented.join(await self.translate_segments(segmented.chunks, target_lang))
+    
+    async def translate_segments(self, segments: List[str], target_lang: str) -> List[str]:
+        manager = self.translation_manager
+        # Memory lookups, filtering and fuzzy matching block, so they run off the event loop
+        preparing = asyncio.ensure_future(asyncio.to_thread(manager.prepare_batch, segments, target_lang))
+        try:
+            request = await asyncio.shield(preparing)
+        except asyncio.CancelledError as error:
+            # The thread finishes anyway; release what it claimed for others once it does
+            preparing.add_done_callback(
+                lambda done, error=error: not done.cancelled() and done.exception() is None
+                and manager.abandon_batch(done.result(), error)
+            )
+            raise
+        try:
+            sources = list(request.missing)
+            translations = []
+            if sources:
+                groups = pack_requests(sources, manager.max_request_chars(request.engine))
+                results = await asyncio.gather(
+                    *(self._translate_group(request.engine, group, target_lang) for group in groups)
+                )
+                translations = [translation for group_result in results for translation in group_result]
+            # Segments another file is translating at the same time are awaited, not requested again
+            return await manager.complete_batch_async(request, translations)
+        except BaseException as error:
+            manager.abandon_batch(request, error)
+            raise
+    
+    async def _translate_group(self, engine_name: str, group: List[str], target_lang: str) -> List[str]:
+        global_slots, engine_slots = self._slots(engine_name)
+        async with global_slots, engine_slots:
+            engine = self.translation_manager.engines[engine_name]
+            return await engine.translate_batch_async(group, target_lang)
+    
+    def _slots(self, engine_name: str):
+        # Semaphores belong to the running loop, so recreate them for each new loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._global_slots = asyncio.Semaphore(self.max_in_flight)
+            self._engine_slots = {}
+        if engine_name not in self._engine_slots:
+            limit = self.engine_limits.get(engine_name, self.per_engine_limit)
+            self._engine_slots[engine_name] = asyncio.Semaphore(limit)
+        return self._global_slots, self._engine_slots[engine_name]
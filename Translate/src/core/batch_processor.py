@@ -1,108 +1,731 @@
-from typing import List, Callable, Dict, Optional
-from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from .document_handler import DocumentHandler, DocumentWriter
-from .translator import TranslationManager
-from .quality import QualityChecker
-
-class BatchProcessor:
-    def __init__(self):
-        self.document_handler = DocumentHandler()
-        self.document_writer = DocumentWriter()
-        self.translation_manager = TranslationManager()
-        self.quality_checker = QualityChecker()
-        self.progress_callback: Optional[Callable[[int, int, str], None]] = None
-        self.cancel_flag = False
-    
-    def set_progress_callback(self, callback: Callable[[int, int, str], None]) -> None:
-        """Set callback for progress updates: (current, total, message)"""
-        self.progress_callback = callback
-    
-    def cancel(self) -> None:
-        self.cancel_flag = True
-    
-    def process_files(self, 
-                      files: List[str], 
-                      target_lang: str,
-                      output_dir: Optional[str] = None,
-                      max_workers: int = 4) -> Dict[str, str]:
-        self.cancel_flag = False
-        total_files = len(files)
-        results: Dict[str, str] = {}
-        
-        if output_dir:
-            output_path = Path(output_dir)
-            output_path.mkdir(parents=True, exist_ok=True)
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_file = {}
-            
-            for file_path in files:
-                if self.cancel_flag:
-                    break
-                    
-                future = executor.submit(
-                    self._process_single_file,
-                    file_path,
-                    target_lang,
-                    output_dir
-                )
-                future_to_file[future] = file_path
-            
-            completed = 0
-            for future in as_completed(future_to_file):
-                if self.cancel_flag:
-                    break
-                    
-                file_path = future_to_file[future]
-                try:
-                    output_path = future.result()
-                    results[file_path] = output_path
-                    completed += 1
-                    
-                    if self.progress_callback:
-                        self.progress_callback(
-                            completed,
-                            total_files,
-                            f"Processed {Path(file_path).name}"
-                        )
-                except Exception as e:
-                    results[file_path] = str(e)
-                    if self.progress_callback:
-                        self.progress_callback(
-                            completed,
-                            total_files,
-                            f"Error processing {Path(file_path).name}: {str(e)}"
-                        )
-        
-        return results
-    
-    def _process_single_file(self,
-                            file_path: str,
-                            target_lang: str,
-                            output_dir: Optional[str] = None) -> str:
-        # Read document
-        text = self.document_handler.read_document(file_path)
-        
-        # Translate
-        translated_text = self.translation_manager.translate(text, target_lang)
-        
-        # Quality check
-        issues = self.quality_checker.check_translation(text, translated_text)
-        if issues:
-            print(f"Quality issues in {file_path}:")
-            for issue in issues:
-                print(f"- {issue}")
-        
-        # Determine output path
-        input_path = Path(file_path)
-        if output_dir:
-            output_path = Path(output_dir) / input_path.name
-        else:
-            stem = input_path.stem
-            output_path = input_path.with_name(f"{stem}_translated{input_path.suffix}")
-        
-        # Write output with target language
-        self.document_writer.write_document(translated_text, str(output_path), target_lang=target_lang)
-        
-        return str(output_path)
\ No newline at end of file
+from typing import Any, List, Callable, Dict, Iterator, Optional, Tuple, Union
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from functools import partial
+import asyncio
+import logging
+import threading
+from .document_handler import DocumentHandler, DocumentWriter, ParagraphStream
+from .pdf_handler import PDFHandler
+from .docx_handler import DocxHandler
+from .manifest import TranslationManifest
+from .worker import TranslationCancelled
+from .job_journal import JobJournal
+from .dedup import SegmentDeduplicator
+from .translator import TranslationManager, pack_requests
+from .segmenter import SegmentedText
+from .quality import QualityChecker
+from .async_pipeline import AsyncTranslationPipeline
+
+logger = logging.getLogger(__name__)
+
+class BatchProcessor:
+    def __init__(self, translation_manager: Optional[TranslationManager] = None,
+                 pdf_workers: Optional[int] = None,
+                 incremental: bool = True,
+                 journal_path: Optional[str] = None,
+                 dedup: bool = False):
+        # With incremental set, unchanged files are skipped and only edited segments retranslated
+        self.incremental = incremental
+        # With a journal, an interrupted run resumes where it stopped and retries only failures
+        self.journal = JobJournal(journal_path) if journal_path else None
+        # With dedup set, segments repeated across files are translated once per target;
+        # the parsed files are held in memory until they are written
+        self.dedup = dedup
+        self.dedup_stats: Dict[str, Dict[str, float]] = {}
+        self._deduplicators: Dict[str, SegmentDeduplicator] = {}
+        self._prepared: Dict[str, Tuple[str, Any]] = {}
+        self.document_handler = DocumentHandler(pdf_workers=pdf_workers)
+        self.document_writer = DocumentWriter()
+        self.translation_manager = translation_manager or TranslationManager()
+        self.quality_checker = QualityChecker()
+        self.progress_callback: Optional[Callable[[int, int, str], None]] = None
+        self.file_callback: Optional[Callable[[str, str, str, bool], None]] = None
+        self.quality_callback: Optional[Callable[[str, str, List[str]], None]] = None
+        self.cancel_flag = False
+    
+    def set_progress_callback(self, callback: Callable[[int, int, str], None]) -> None:
+        """Set callback for progress updates: (current, total, message)"""
+        self.progress_callback = callback
+    
+    def set_file_callback(self, callback: Callable[[str, str, str, bool], None]) -> None:
+        """Set callback for finished files, called once per target:
+        (file path, target language, output path or error message, succeeded)"""
+        self.file_callback = callback
+    
+    def set_quality_callback(self, callback: Callable[[str, str, List[str]], None]) -> None:
+        """Set callback for quality issues: (label, target language, issues); without one they are logged"""
+        self.quality_callback = callback
+    
+    def cancel(self) -> None:
+        self.cancel_flag = True
+    
+    def process_files(self, 
+                      files: List[str], 
+                      target_lang: Union[str, List[str]],
+                      output_dir: Optional[str] = None,
+                      max_workers: int = 4,
+                      source_root: Optional[str] = None) -> Dict[str, Union[str, Dict[str, str]]]:
+        """Translate files on a thread pool.
+        
+        ``target_lang`` may be a list: each file is then read and segmented
+        once and translated to every target concurrently, and its result maps
+        each target to its outcome. With more than one target, output names
+        end in ``_<lang>``. With ``source_root`` set, outputs mirror each
+        file's path relative to it under ``output_dir`` instead of all
+        landing in one directory. With ``dedup`` set, the pending segments of
+        all files are collected first and each distinct one is translated
+        once per target; ``dedup_stats`` then holds the savings.
+        """
+        self.cancel_flag = False
+        targets = self._targets(target_lang)
+        by_target = not isinstance(target_lang, str)
+        total_files = len(files)
+        results: Dict[str, Union[str, Dict[str, str]]] = {}
+        
+        if output_dir:
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if self.dedup:
+                collected = executor.map(
+                    lambda file_path: self._collect_segments(file_path, targets, output_dir, source_root), files
+                )
+                self._start_dedup(files, collected, targets)
+                self._translate_unique(total_files)
+            
+            future_to_file = {}
+            
+            for file_path in files:
+                if self.cancel_flag:
+                    break
+                    
+                future = executor.submit(
+                    self._process_single_file,
+                    file_path,
+                    targets,
+                    output_dir,
+                    source_root
+                )
+                future_to_file[future] = file_path
+            
+            completed = 0
+            for future in as_completed(future_to_file):
+                if self.cancel_flag:
+                    break
+                    
+                file_path = future_to_file[future]
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    outcomes = {lang: (str(e), False) for lang in targets}
+                if self._collect(results, file_path, targets, outcomes, by_target):
+                    completed += 1
+                    message = f"Processed {Path(file_path).name}"
+                else:
+                    message = f"Error processing {Path(file_path).name}: {self._first_error(outcomes)}"
+                
+                if self.progress_callback:
+                    self.progress_callback(completed, total_files, message)
+        
+        self._finish_dedup()
+        return results
+    
+    async def process_files_async(self,
+                                  files: List[str],
+                                  target_lang: Union[str, List[str]],
+                                  output_dir: Optional[str] = None,
+                                  max_in_flight: int = 16,
+                                  per_engine_limit: int = 8,
+                                  max_files: int = 4,
+                                  source_root: Optional[str] = None) -> Dict[str, Union[str, Dict[str, str]]]:
+        """Translate files with every segment of every file in flight concurrently.
+        
+        Reading and writing run in worker threads; up to ``max_files`` files
+        are open at once, and translation requests are bounded by
+        ``max_in_flight`` overall and ``per_engine_limit`` per engine. PDFs
+        and DOCX files are laid out in their own threads, but their segments
+        go through the same pipeline, a window of pages or a whole document
+        at a time.
+        ``target_lang`` and ``source_root`` work as in ``process_files``.
+        """
+        self.cancel_flag = False
+        targets = self._targets(target_lang)
+        by_target = not isinstance(target_lang, str)
+        total_files = len(files)
+        results: Dict[str, Union[str, Dict[str, str]]] = {}
+        pipeline = AsyncTranslationPipeline(self.translation_manager, max_in_flight, per_engine_limit)
+        loop = asyncio.get_running_loop()
+        # Kept apart from the default executor, which the pipeline needs while these threads wait on it
+        in_place_executor = ThreadPoolExecutor(max_workers=max_files)
+        
+        if output_dir:
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+        
+        file_slots = asyncio.Semaphore(max_files)
+        
+        async def collect(file_path: str):
+            async with file_slots:
+                return await asyncio.to_thread(self._collect_segments, file_path, targets, output_dir, source_root)
+        
+        async def translate_unique(lang: str, deduplicator: SegmentDeduplicator) -> None:
+            async def translate_group(group: List[str]) -> None:
+                deduplicator.record(group, await pipeline.translate_segments(group, lang))
+            
+            self._report_dedup(lang, deduplicator, total_files)
+            # A failed group is left to the files that need it, which report the error
+            await asyncio.gather(*(translate_group(group) for group in deduplicator.groups()),
+                                 return_exceptions=True)
+        
+        if self.dedup:
+            self._start_dedup(files, await asyncio.gather(*(collect(file_path) for file_path in files)), targets)
+            await asyncio.gather(*(translate_unique(lang, deduplicator)
+                                   for lang, deduplicator in self._deduplicators.items()))
+        
+        async def process(file_path: str):
+            async with file_slots:
+                return await process_file(file_path)
+        
+        async def process_file(file_path: str):
+            outcomes: Dict[str, Tuple[str, bool]] = {}
+            try:
+                source_hash = await asyncio.to_thread(self._source_hash, file_path)
+                jobs = self._plan(file_path, targets, output_dir, source_root, source_hash, outcomes)
+                if not jobs:
+                    return file_path, outcomes
+                
+                process_in_place = self._in_place(file_path)
+                if process_in_place:
+                    stopped = threading.Event()
+                    translate_for = partial(self._pipeline_translator, pipeline, loop, file_path, stopped)
+                    try:
+                        outcomes.update(await loop.run_in_executor(
+                            in_place_executor, partial(process_in_place, file_path, jobs, source_hash, translate_for)
+                        ))
+                    except asyncio.CancelledError:
+                        stopped.set()
+                        raise
+                    return file_path, outcomes
+                
+                # Segment each block once, translate it to every target at the same time
+                # and write it out before reading the next
+                errors: Dict[str, BaseException] = {}
+                streams = await asyncio.to_thread(self._open_streams, jobs, errors)
+                issues: Dict[str, Dict[str, None]] = {lang: {} for lang in jobs}
+                try:
+                    with closing(self._segment_blocks(file_path)) as blocks:
+                        while True:
+                            active = [lang for lang in streams if lang not in errors]
+                            segmented = await asyncio.to_thread(next, blocks, None) if active else None
+                            if segmented is None:
+                                break
+                            
+                            async def translate_to(lang: str, segmented: SegmentedText = segmented) -> List[str]:
+                                manifest = jobs[lang][1]
+                                pending = manifest.pending(segmented.chunks)
+                                translations = await self._translate_async(pipeline, pending, lang, file_path)
+                                return manifest.complete(segmented.chunks, pending, translations)
+                            
+                            translated = await asyncio.gather(*(translate_to(lang) for lang in active),
+                                                              return_exceptions=True)
+                            await asyncio.to_thread(self._write_block, segmented, dict(zip(active, translated)),
+                                                    streams, errors, issues)
+                except Exception as e:
+                    for lang in jobs:
+                        errors.setdefault(lang, e)
+                except BaseException:
+                    self._abort_streams(streams)
+                    raise
+                outcomes.update(await asyncio.to_thread(
+                    self._close_streams, file_path, jobs, source_hash, streams, errors, issues
+                ))
+                return file_path, outcomes
+            except Exception as e:
+                for lang in targets:
+                    if lang not in outcomes:
+                        outcomes[lang] = self._settle(file_path, lang, None, None, e)
+                return file_path, outcomes
+        
+        tasks = [asyncio.ensure_future(process(file_path)) for file_path in files]
+        completed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                if self.cancel_flag:
+                    break
+                
+                file_path, outcomes = await next_done
+                if self._collect(results, file_path, targets, outcomes, by_target):
+                    completed += 1
+                    message = f"Processed {Path(file_path).name}"
+                else:
+                    message = f"Error processing {Path(file_path).name}: {self._first_error(outcomes)}"
+                
+                if self.progress_callback:
+                    self.progress_callback(completed, total_files, message)
+        finally:
+            for task in tasks:
+                task.cancel()
+            in_place_executor.shutdown(wait=False, cancel_futures=True)
+            self._finish_dedup()
+        
+        return results
+    
+    def _process_single_file(self,
+                            file_path: str,
+                            targets: List[str],
+                            output_dir: Optional[str] = None,
+                            source_root: Optional[str] = None) -> Dict[str, Tuple[str, bool]]:
+        outcomes: Dict[str, Tuple[str, bool]] = {}
+        try:
+            source_hash = self._source_hash(file_path)
+            jobs = self._plan(file_path, targets, output_dir, source_root, source_hash, outcomes)
+            if not jobs:
+                return outcomes
+            
+            process = self._in_place(file_path) or self._process_text
+            outcomes.update(process(file_path, jobs, source_hash))
+        except Exception as e:
+            for lang in targets:
+                if lang not in outcomes:
+                    outcomes[lang] = self._settle(file_path, lang, None, None, e)
+        return outcomes
+    
+    @staticmethod
+    def _map_targets(function: Callable[[str], Any], targets) -> Dict[str, Any]:
+        """Call ``function`` for every target, concurrently when there are several"""
+        targets = list(targets)
+        if len(targets) == 1:
+            return {targets[0]: function(targets[0])}
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            return dict(zip(targets, executor.map(function, targets)))
+    
+    @staticmethod
+    def _targets(target_lang: Union[str, List[str]]) -> List[str]:
+        targets = [target_lang] if isinstance(target_lang, str) else list(dict.fromkeys(target_lang))
+        if not targets:
+            raise ValueError("At least one target language is required")
+        return targets
+    
+    def _plan(self, file_path: str, targets: List[str], output_dir: Optional[str],
+              source_root: Optional[str], source_hash: str,
+              outcomes: Dict[str, Tuple[str, bool]]) -> Dict[str, Tuple[Path, TranslationManifest]]:
+        """Return the output path and manifest of each target still to translate.
+        
+        Targets that are already done are recorded in ``outcomes``.
+        """
+        jobs = {}
+        for lang in targets:
+            output_path = self._output_path(file_path, output_dir, source_root,
+                                            lang if len(targets) > 1 else None)
+            manifest = self._load_manifest(output_path, lang)
+            if self._already_done(file_path, lang, source_hash, output_path, manifest):
+                outcomes[lang] = (str(output_path), True)
+            else:
+                jobs[lang] = (output_path, manifest)
+        return jobs
+    
+    def _settle(self, file_path: str, target_lang: str, output_path: Optional[Path],
+                source_hash: Optional[str], error: Optional[BaseException]) -> Tuple[str, bool]:
+        """Journal the outcome of one target and return it as (output path or error, succeeded)"""
+        if error is None:
+            self._journal_done(file_path, target_lang, output_path, source_hash)
+            return str(output_path), True
+        self._journal_failed(file_path, target_lang, error)
+        return str(error) or type(error).__name__, False
+    
+    def _collect(self, results: Dict[str, Union[str, Dict[str, str]]], file_path: str,
+                 targets: List[str], outcomes: Dict[str, Tuple[str, bool]], by_target: bool) -> bool:
+        """Store a file's outcomes in ``results`` and report them; True when every target succeeded"""
+        if by_target:
+            results[file_path] = {lang: outcomes[lang][0] for lang in targets}
+        else:
+            results[file_path] = outcomes[targets[0]][0]
+        if self.file_callback:
+            for lang in targets:
+                self.file_callback(file_path, lang, *outcomes[lang])
+        return all(succeeded for _, succeeded in outcomes.values())
+    
+    @staticmethod
+    def _first_error(outcomes: Dict[str, Tuple[str, bool]]) -> str:
+        return next(outcome for outcome, succeeded in outcomes.values() if not succeeded)
+    
+    def _already_done(self, file_path: str, target_lang: str, source_hash: str, output_path: Path,
+                      manifest: TranslationManifest) -> bool:
+        # A full run rebuilds everything, whatever the journal or the manifests say
+        if not self.incremental:
+            return False
+        if self.journal and self.journal.is_done(file_path, target_lang, source_hash, str(output_path)):
+            return True
+        return manifest.is_current(source_hash)
+    
+    def _journal_done(self, file_path: str, target_lang: str, output_path: Path, source_hash: str) -> None:
+        if self.journal:
+            self.journal.mark_done(file_path, target_lang, str(output_path), source_hash)
+    
+    def _journal_failed(self, file_path: str, target_lang: str, error: Exception) -> None:
+        if self.journal:
+            self.journal.mark_failed(file_path, target_lang, str(error) or type(error).__name__)
+    
+    def _load_manifest(self, output_path: Path, target_lang: str) -> TranslationManifest:
+        if not self.incremental:
+            # Start afresh, but still record the manifest for the next incremental run
+            return TranslationManifest(str(output_path), target_lang)
+        return TranslationManifest.load(str(output_path), target_lang)
+    
+    def _known(self, file_path: str, target_lang: str, texts: List[str]) -> Dict[str, str]:
+        # Segments journaled by an interrupted run or translated by the dedup stage are not sent again
+        known = self._journaled(file_path, target_lang, texts)
+        if target_lang in self._deduplicators:
+            known.update(self._deduplicators[target_lang].lookup(texts))
+        return known
+    
+    def _journaled(self, file_path: str, target_lang: str, texts: List[str]) -> Dict[str, str]:
+        if not self.journal or not self.incremental:
+            return {}
+        return self.journal.segments(file_path, target_lang, texts)
+    
+    def _source_hash(self, file_path: str) -> str:
+        if file_path in self._prepared:
+            return self._prepared[file_path][0]
+        return TranslationManifest.hash_file(file_path)
+    
+    def _parsed(self, file_path: str, parse: Callable[[str], Any]) -> Any:
+        # The dedup stage has already parsed the file; hand it over only once
+        prepared = self._prepared.pop(file_path, None)
+        if prepared:
+            return prepared[1]
+        return parse(file_path)
+    
+    def _read(self, file_path: str) -> str:
+        return self._parsed(file_path, self.document_handler.read_text)
+    
+    def _collect_segments(self, file_path: str, targets: List[str], output_dir: Optional[str],
+                          source_root: Optional[str]) -> Optional[Tuple[str, Any, Dict[str, List[str]]]]:
+        """Parse a file ahead of translation for the dedup stage.
+        
+        Returns its source hash, text (or DocxHandler) and the segments each
+        target still needs, or None when there is nothing to collect. PDFs
+        are streamed page by page instead, and files that cannot be read are
+        left for their own run to report.
+        """
+        if self._streams(file_path):
+            return None
+        try:
+            source_hash = TranslationManifest.hash_file(file_path)
+            jobs = self._plan(file_path, targets, output_dir, source_root, source_hash, {})
+            if not jobs:
+                return None
+            if Path(file_path).suffix.lower() == '.docx':
+                parsed = DocxHandler(file_path)
+                chunks = parsed.texts
+            else:
+                parsed = self.document_handler.read_text(file_path)
+                chunks = self.translation_manager.segmenter.segment(parsed).chunks
+            pending = {}
+            for lang, (_, manifest) in jobs.items():
+                segments = manifest.pending(chunks)
+                known = self._journaled(file_path, lang, segments)
+                pending[lang] = [segment for segment in segments if segment not in known]
+        except Exception:
+            return None
+        return source_hash, parsed, pending
+    
+    def _start_dedup(self, files: List[str], collected, targets: List[str]) -> None:
+        max_chars = self.translation_manager.max_request_chars(self.translation_manager.current_engine)
+        self._deduplicators = {lang: SegmentDeduplicator(max_chars) for lang in targets}
+        self._prepared = {}
+        for file_path, result in zip(files, collected):
+            if result is None:
+                continue
+            source_hash, parsed, pending = result
+            self._prepared[file_path] = (source_hash, parsed)
+            for lang, segments in pending.items():
+                self._deduplicators[lang].add(segments)
+    
+    def _translate_unique(self, total_files: int) -> None:
+        for lang, deduplicator in self._deduplicators.items():
+            self._report_dedup(lang, deduplicator, total_files)
+            for group in deduplicator.groups():
+                if self.cancel_flag:
+                    return
+                try:
+                    deduplicator.record(group, self.translation_manager.translate_batch(group, lang))
+                except Exception:
+                    # Leave the rest to the files that need it, which report the error
+                    break
+    
+    def _report_dedup(self, lang: str, deduplicator: SegmentDeduplicator, total_files: int) -> None:
+        if self.progress_callback:
+            self.progress_callback(0, total_files, f"Translating {len(deduplicator.unique)} unique of "
+                                                   f"{deduplicator.occurrences} segments to {lang}")
+    
+    def _finish_dedup(self) -> None:
+        self.dedup_stats = {lang: deduplicator.stats() for lang, deduplicator in self._deduplicators.items()}
+        self._deduplicators = {}
+        self._prepared = {}
+    
+    def _translator(self, target_lang: str, file_path: str) -> Callable[[List[str]], List[str]]:
+        def translate(texts: List[str]) -> List[str]:
+            known = self._known(file_path, target_lang, texts)
+            todo = [text for text in texts if text not in known]
+            for group, translations in self.translation_manager.iter_translate_batch(todo, target_lang):
+                known.update(zip(group, translations))
+                if self.journal:
+                    self.journal.record_segments(file_path, target_lang, zip(group, translations))
+                # Check for cancellation before every request, not just between files
+                if self.cancel_flag:
+                    raise TranslationCancelled()
+            return [known[text] for text in texts]
+        return translate
+    
+    def _pipeline_translator(self, pipeline: AsyncTranslationPipeline, loop: asyncio.AbstractEventLoop,
+                             file_path: str, stopped: threading.Event,
+                             target_lang: str) -> Callable[[List[str]], List[str]]:
+        """Translate from a worker thread through the pipeline running on ``loop``"""
+        def translate(texts: List[str]) -> List[str]:
+            if self.cancel_flag or stopped.is_set():
+                raise TranslationCancelled()
+            return asyncio.run_coroutine_threadsafe(
+                self._translate_async(pipeline, texts, target_lang, file_path), loop
+            ).result()
+        return translate
+    
+    async def _translate_async(self, pipeline: AsyncTranslationPipeline, texts: List[str],
+                               target_lang: str, file_path: str) -> List[str]:
+        if not texts:
+            return []
+        known = self._known(file_path, target_lang, texts)
+        todo = [text for text in texts if text not in known]
+        if not self.journal:
+            known.update(zip(todo, await pipeline.translate_segments(todo, target_lang) if todo else []))
+            return [known[text] for text in texts]
+        
+        groups = pack_requests(todo, self.translation_manager.segmenter.max_chars)
+        
+        async def translate_group(group: List[str]) -> None:
+            translations = await pipeline.translate_segments(group, target_lang)
+            self.journal.record_segments(file_path, target_lang, zip(group, translations))
+            known.update(zip(group, translations))
+        
+        await asyncio.gather(*(translate_group(group) for group in groups))
+        return [known[text] for text in texts]
+    
+    @staticmethod
+    def _streams(file_path: str) -> bool:
+        return Path(file_path).suffix.lower() == '.pdf'
+    
+    def _in_place(self, file_path: str) -> Optional[Callable]:
+        """The processor for formats translated inside their own layout rather than as plain text"""
+        return {'.pdf': self._process_pdf, '.docx': self._process_docx}.get(Path(file_path).suffix.lower())
+    
+    def _process_text(self,
+                      file_path: str,
+                      jobs: Dict[str, Tuple[Path, TranslationManifest]],
+                      source_hash: str) -> Dict[str, Tuple[str, bool]]:
+        """Translate a plain text document block by block, writing every output as it goes.
+        
+        Each block is segmented once and translated to all targets
+        concurrently; a target that fails drops out and the others carry on.
+        """
+        errors: Dict[str, BaseException] = {}
+        streams = self._open_streams(jobs, errors)
+        issues: Dict[str, Dict[str, None]] = {lang: {} for lang in jobs}
+        
+        def translate_to(lang: str, segmented: SegmentedText) -> Union[List[str], Exception]:
+            try:
+                # Translate in bounded segments, reusing the manifest for unchanged ones
+                return jobs[lang][1].translate(segmented.chunks, self._translator(lang, file_path))
+            except Exception as e:
+                return e
+        
+        try:
+            with closing(self._segment_blocks(file_path)) as blocks:
+                for segmented in blocks:
+                    active = [lang for lang in streams if lang not in errors]
+                    if not active:
+                        break
+                    translated = self._map_targets(lambda lang: translate_to(lang, segmented), active)
+                    self._write_block(segmented, translated, streams, errors, issues)
+        except Exception as e:
+            for lang in jobs:
+                errors.setdefault(lang, e)
+        except BaseException:
+            self._abort_streams(streams)
+            raise
+        return self._close_streams(file_path, jobs, source_hash, streams, errors, issues)
+    
+    def _segment_blocks(self, file_path: str) -> Iterator[SegmentedText]:
+        segmenter = self.translation_manager.segmenter
+        if file_path in self._prepared:
+            # The dedup stage has already read the whole text
+            yield segmenter.segment(self._read(file_path))
+        else:
+            yield from self.document_handler.iter_segments(file_path, segmenter)
+    
+    def _open_streams(self, jobs: Dict[str, Tuple[Path, TranslationManifest]],
+                      errors: Dict[str, BaseException]) -> Dict[str, ParagraphStream]:
+        streams = {}
+        for lang, (output_path, _) in jobs.items():
+            try:
+                streams[lang] = self.document_writer.open(str(output_path), target_lang=lang)
+            except Exception as e:
+                errors[lang] = e
+        return streams
+    
+    def _write_block(self, segmented: SegmentedText, translated: Dict[str, Union[List[str], BaseException]],
+                     streams: Dict[str, ParagraphStream], errors: Dict[str, BaseException],
+                     issues: Dict[str, Dict[str, None]]) -> None:
+        """Write one translated block to each target's stream, noting its quality issues"""
+        text = segmented.join(segmented.chunks)
+        for lang, translations in translated.items():
+            if isinstance(translations, BaseException):
+                errors[lang] = translations
+                continue
+            try:
+                translated_text = segmented.join(translations)
+                streams[lang].write_text(translated_text)
+            except Exception as e:
+                errors[lang] = e
+                continue
+            issues[lang].update(dict.fromkeys(self.quality_checker.check_translation(text, translated_text)))
+    
+    def _close_streams(self, file_path: str, jobs: Dict[str, Tuple[Path, TranslationManifest]],
+                       source_hash: str, streams: Dict[str, ParagraphStream],
+                       errors: Dict[str, BaseException],
+                       issues: Dict[str, Dict[str, None]]) -> Dict[str, Tuple[str, bool]]:
+        """Finish the outputs that succeeded, remove the ones that failed and settle every target"""
+        outcomes = {}
+        for lang, (output_path, manifest) in jobs.items():
+            error = errors.get(lang)
+            if error is None:
+                try:
+                    streams[lang].close()
+                    manifest.save(source_hash)
+                except Exception as e:
+                    error = e
+                else:
+                    self._report_issues(file_path, lang, list(issues[lang]))
+            if error is not None and lang in streams:
+                streams[lang].abort()
+            outcomes[lang] = self._settle(file_path, lang, output_path, source_hash, error)
+        return outcomes
+    
+    @staticmethod
+    def _abort_streams(streams: Dict[str, ParagraphStream]) -> None:
+        for stream in streams.values():
+            stream.abort()
+    
+    def _process_pdf(self,
+                     file_path: str,
+                     jobs: Dict[str, Tuple[Path, TranslationManifest]],
+                     source_hash: str,
+                     translate_for: Optional[Callable[[str], Callable[[List[str]], List[str]]]] = None
+                     ) -> Dict[str, Tuple[str, bool]]:
+        """Translate a PDF page by page, so memory stays bounded however long it is.
+        
+        The layout of each page is analyzed once and shared by every target.
+        ``translate_for`` returns the translate function of a target
+        language; by default segments are translated synchronously.
+        """
+        translate_for = translate_for or (lambda lang: self._translator(lang, file_path))
+        
+        def check_page(page_num: int, target_lang: str, sources: List[str], translations: List[str]) -> None:
+            label = f"{file_path} (page {page_num + 1})"
+            self._report_quality(label, target_lang, '\n'.join(sources), '\n'.join(translations))
+        
+        def translator(lang: str, manifest: TranslationManifest) -> Callable[[List[str]], List[str]]:
+            return lambda texts: manifest.translate(texts, translate_for(lang))
+        
+        # A target that fails is dropped and reported on its own; the others are still written
+        failed: Dict[str, Exception] = {}
+        try:
+            PDFHandler(workers=self.document_handler.pdf_workers).translate_pdf_to_targets(
+                file_path,
+                {lang: (str(output_path), translator(lang, manifest))
+                 for lang, (output_path, manifest) in jobs.items()},
+                on_page=check_page,
+                failed=failed,
+                segmenter=self.translation_manager.segmenter
+            )
+        except Exception as e:
+            return {lang: self._settle(file_path, lang, None, None, e) for lang in jobs}
+        outcomes = {}
+        for lang, (output_path, manifest) in jobs.items():
+            error = failed.get(lang)
+            if error is None:
+                try:
+                    manifest.save(source_hash)
+                except Exception as e:
+                    error = e
+            outcomes[lang] = self._settle(file_path, lang, output_path, source_hash, error)
+        return outcomes
+    
+    def _process_docx(self,
+                      file_path: str,
+                      jobs: Dict[str, Tuple[Path, TranslationManifest]],
+                      source_hash: str,
+                      translate_for: Optional[Callable[[str], Callable[[List[str]], List[str]]]] = None
+                      ) -> Dict[str, Tuple[str, bool]]:
+        """Translate a DOCX run by run, keeping its formatting, tables, headers and footers.
+        
+        The document is parsed once; all targets are translated concurrently
+        and then written in turn from the same document object.
+        ``translate_for`` works as in ``_process_pdf``.
+        """
+        translate_for = translate_for or (lambda lang: self._translator(lang, file_path))
+        try:
+            handler = self._parsed(file_path, DocxHandler)
+        except Exception as e:
+            return {lang: self._settle(file_path, lang, None, None, e) for lang in jobs}
+        texts = handler.texts
+        
+        def translate_to(lang: str) -> Union[List[str], Exception]:
+            try:
+                return jobs[lang][1].translate(texts, translate_for(lang))
+            except Exception as e:
+                return e
+        
+        outcomes = {}
+        for lang, translations in self._map_targets(translate_to, jobs).items():
+            output_path, manifest = jobs[lang]
+            try:
+                if isinstance(translations, Exception):
+                    raise translations
+                self._report_quality(file_path, lang, '\n'.join(texts), '\n'.join(translations))
+                handler.write_back(translations)
+                handler.save(str(output_path))
+                manifest.save(source_hash)
+            except Exception as e:
+                outcomes[lang] = self._settle(file_path, lang, output_path, source_hash, e)
+            else:
+                outcomes[lang] = self._settle(file_path, lang, output_path, source_hash, None)
+        return outcomes
+    
+    def _report_quality(self, label: str, target_lang: str, text: str, translated_text: str) -> None:
+        self._report_issues(label, target_lang, self.quality_checker.check_translation(text, translated_text))
+    
+    def _report_issues(self, label: str, target_lang: str, issues: List[str]) -> None:
+        if issues and self.quality_callback:
+            self.quality_callback(label, target_lang, issues)
+        elif issues:
+            logger.warning("Quality issues in %s [%s]:\n%s", label, target_lang,
+                           '\n'.join(f"- {issue}" for issue in issues))
+    
+    @staticmethod
+    def _output_path(file_path: str, output_dir: Optional[str] = None,
+                     source_root: Optional[str] = None, lang_suffix: Optional[str] = None) -> Path:
+        """Where a file's translation goes; ``lang_suffix`` tells the outputs of several targets apart"""
+        input_path = Path(file_path)
+        stem = input_path.stem
+        if output_dir:
+            name = f"{stem}_{lang_suffix}{input_path.suffix}" if lang_suffix else input_path.name
+            if source_root:
+                relative = input_path.resolve().relative_to(Path(source_root).resolve())
+                output_path = Path(output_dir) / relative.with_name(name)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                return output_path
+            return Path(output_dir) / name
+        suffix = f"_translated_{lang_suffix}" if lang_suffix else "_translated"
+        return input_path.with_name(f"{stem}{suffix}{input_path.suffix}")
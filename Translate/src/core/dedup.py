@@ -0,0 +1,59 @@
+from typing import Dict, Iterable, List
+from .translator import pack_requests
+
+class SegmentDeduplicator:
+    """Collect the segments queued across a batch so each distinct one is translated once.
+    
+    Files add the segments they still need for one target language; the
+    distinct segments are then translated together and every occurrence is
+    served from ``translations``. Alongside, it counts the requests the
+    files would have needed on their own, so the saving can be reported.
+    """
+    
+    def __init__(self, max_request_chars: int):
+        self.max_request_chars = max_request_chars
+        self.occurrences = 0
+        self.files = 0
+        # Requests the files would have sent one by one, with only in-file repeats removed
+        self.requests_without = 0
+        self.requests = 0
+        self._unique: Dict[str, None] = {}
+        self.translations: Dict[str, str] = {}
+    
+    def add(self, segments: Iterable[str]) -> None:
+        segments = [segment for segment in segments if segment.strip()]
+        if not segments:
+            return
+        in_file = list(dict.fromkeys(segments))
+        self.files += 1
+        self.occurrences += len(segments)
+        self.requests_without += len(pack_requests(in_file, self.max_request_chars))
+        self._unique.update(dict.fromkeys(in_file))
+    
+    @property
+    def unique(self) -> List[str]:
+        return list(self._unique)
+    
+    def groups(self) -> List[List[str]]:
+        """Pack the distinct segments into requests, recording how many were needed"""
+        groups = pack_requests(self.unique, self.max_request_chars)
+        self.requests = len(groups)
+        return groups
+    
+    def record(self, segments: List[str], translations: List[str]) -> None:
+        self.translations.update(zip(segments, translations))
+    
+    def lookup(self, texts: Iterable[str]) -> Dict[str, str]:
+        """Return the translations known for ``texts``, keyed by source text"""
+        return {text: self.translations[text] for text in texts if text in self.translations}
+    
+    def stats(self) -> Dict[str, float]:
+        unique = len(self._unique)
+        return {
+            'files': self.files,
+            'segments': self.occurrences,
+            'unique': unique,
+            'ratio': round(1 - unique / self.occurrences, 4) if self.occurrences else 0.0,
+            'requests': self.requests,
+            'requests_saved': max(0, self.requests_without - self.requests)
+        }
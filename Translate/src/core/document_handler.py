@@ -1,119 +1,535 @@
-from typing import Dict, Optional, BinaryIO, Tuple, List
-from pathlib import Path
-import docx
-from PyPDF2 import PdfReader, PdfWriter
-from striprtf.striprtf import rtf_to_text
-from odf import text as odf_text
-from odf.opendocument import load
-from .pdf_handler import PDFHandler
-from .language_detector import LanguageDetector
-
-class DocumentHandler:
-    def __init__(self):
-        self.supported_formats = {
-            '.txt': self._handle_txt,
-            '.docx': self._handle_docx,
-            '.pdf': self._handle_pdf,
-            '.rtf': self._handle_rtf,
-            '.odt': self._handle_odt
-        }
-        self.language_detector = LanguageDetector()
-    
-    def read_document(self, file_path: str, pages: Optional[List[int]] = None) -> Tuple[str, Optional[str]]:
-        path = Path(file_path)
-        if not path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        extension = path.suffix.lower()
-        if extension not in self.supported_formats:
-            raise ValueError(f"Unsupported file format: {extension}")
-        
-        text = self.supported_formats[extension](file_path, pages)
-        clean_text = self._ensure_xml_compatible(text)
-        detected_lang = self.language_detector.detect_language(clean_text)
-        return clean_text, detected_lang
-
-    def _ensure_xml_compatible(self, text: str) -> str:
-        """Ensure text is XML compatible by removing invalid characters"""
-        if not text:
-            return ""
-        # Remove NULL bytes and control characters while preserving newlines and tabs
-        return ''.join(char for char in text if char in '\n\t' or (ord(char) >= 32 and ord(char) != 127))
-    
-    def _handle_txt(self, file_path: str) -> str:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    
-    def _handle_docx(self, file_path: str) -> str:
-        doc = docx.Document(file_path)
-        return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-    
-    def _handle_pdf(self, file_path: str, pages: Optional[List[int]] = None) -> str:
-        pdf_handler = PDFHandler()
-        text, layout_info = pdf_handler.extract_text_with_layout(file_path, pages)
-        # Store layout info for later use when writing back to PDF
-        self._current_pdf_layout = layout_info
-        # Detect and store document structure
-        self._current_pdf_structure = pdf_handler.detect_structure(file_path)
-        return text
-    
-    def _handle_rtf(self, file_path: str) -> str:
-        with open(file_path, 'r') as f:
-            return rtf_to_text(f.read())
-    
-    def _handle_odt(self, file_path: str) -> str:
-        doc = load(file_path)
-        text_elements = doc.getElementsByType(odf_text.P)
-        return '\n'.join([element.firstChild.data for element in text_elements if element.firstChild])
-
-class DocumentWriter:
-    def __init__(self):
-        self.supported_formats = {
-            '.txt': self._write_txt,
-            '.docx': self._write_docx,
-            '.pdf': self._write_pdf
-        }
-        self._pdf_handler = PDFHandler()
-        self._current_pdf_layout = None
-        self._current_pdf_structure = None
-        self._current_target_lang = None
-
-    def write_document(self, text: str, output_path: str, target_lang: str = None) -> None:
-        path = Path(output_path)
-        extension = path.suffix.lower()
-        
-        if extension not in self.supported_formats:
-            raise ValueError(f"Unsupported output format: {extension}")
-        
-        self._current_target_lang = target_lang
-        self.supported_formats[extension](text, output_path)
-    
-    def _write_txt(self, text: str, output_path: str) -> None:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(text)
-    
-    def _write_docx(self, text: str, output_path: str) -> None:
-        doc = docx.Document()
-        for paragraph in text.split('\n'):
-            if paragraph.strip():
-                doc.add_paragraph(paragraph)
-        doc.save(output_path)
-    
-    def _write_pdf(self, text: str, output_path: str) -> None:
-        if not hasattr(self, '_current_pdf_layout'):
-            # If no layout info available, create basic PDF
-            writer = PdfWriter()
-            page = writer.add_blank_page(width=612, height=792)
-            # TODO: Add basic text rendering
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            return
-        
-        # Use layout-preserving PDF writing if layout info is available
-        self._pdf_handler.write_pdf_with_layout(
-            self._original_path,  # original path for image extraction
-            text,
-            output_path,
-            self._current_pdf_layout,
-            target_lang=self._current_target_lang
-        )
\ No newline at end of file
+from typing import Callable, Dict, Iterable, Iterator, Optional, BinaryIO, Tuple, List
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from xml.etree import ElementTree
+import codecs
+import io
+import mmap
+import os
+import re
+import zipfile
+import docx
+from striprtf.striprtf import rtf_to_text
+from odf import text as odf_text
+from odf import teletype
+from odf.opendocument import OpenDocumentText
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+from .pdf_handler import PDFHandler
+from .docx_handler import DocxHandler
+from .fonts import register_font
+from .language_detector import LanguageDetector
+from .segmenter import SegmentedText, TextSegmenter
+from .sanitizer import xml_safe
+
+class DocumentHandler:
+    """Read documents as text, paragraph by paragraph.
+    
+    TXT, RTF and ODT files are read lazily by ``iter_paragraphs``: plain
+    text is memory-mapped and decoded a block at a time, RTF is converted
+    one run of body paragraphs at a time, and ODT content is parsed
+    incrementally, so a huge file never has to be held whole. Paragraphs
+    are cleaned one at a time, and the language is detected from a sample
+    of the first ``SAMPLE_CHARS`` characters rather than the whole text.
+    """
+    
+    # Enough text for a reliable guess; langdetect gains nothing from more
+    SAMPLE_CHARS = 10000
+    # Bytes decoded (TXT) or converted (RTF) at a time
+    BLOCK_SIZE = 1 << 20
+    
+    _TEXT_NS = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+    _ODT_PARAGRAPHS = (_TEXT_NS + 'p', _TEXT_NS + 'h')
+    # Deleted text kept for change tracking, and comments
+    _ODT_SKIPPED = (_TEXT_NS + 'tracked-changes',
+                    '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}annotation')
+    _RTF_TOKEN = re.compile(rb'\\[\\{}]|[{}]|\\par(?![a-z]) ?')
+    _RTF_BRACE = re.compile(r'\\[\\{}]|[{}]')
+    _RTF_FONT_TABLE = re.compile(r'{[^{}]*\\fonttbl')
+    
+    def __init__(self, pdf_workers: Optional[int] = None):
+        self.pdf_workers = pdf_workers
+        self.supported_formats = {
+            '.txt': self._handle_txt,
+            '.docx': self._handle_docx,
+            '.pdf': self._handle_pdf,
+            '.rtf': self._handle_rtf,
+            '.odt': self._handle_odt
+        }
+        # Formats that can be read one paragraph at a time
+        self.paragraph_readers = {
+            '.txt': self._iter_txt,
+            '.rtf': self._iter_rtf,
+            '.odt': self._iter_odt
+        }
+        self.language_detector = LanguageDetector()
+    
+    def read_document(self, file_path: str, pages: Optional[List[int]] = None) -> Tuple[str, Optional[str]]:
+        text = self.read_text(file_path, pages)
+        return text, self.detect_language([text])
+    
+    def read_text(self, file_path: str, pages: Optional[List[int]] = None) -> str:
+        """Read and clean the whole text of a document, without detecting its language"""
+        output = io.StringIO()
+        for index, paragraph in enumerate(self.iter_paragraphs(file_path, pages)):
+            if index:
+                output.write('\n')
+            output.write(paragraph)
+        return output.getvalue()
+    
+    def iter_paragraphs(self, file_path: str, pages: Optional[List[int]] = None) -> Iterator[str]:
+        """Yield the cleaned paragraphs of a document; joined by newlines they give its text.
+        
+        TXT, RTF and ODT are read as the paragraphs are consumed; other
+        formats are parsed first and then handed out paragraph by paragraph.
+        """
+        extension = self._check(file_path)
+        reader = self.paragraph_readers.get(extension)
+        if reader:
+            paragraphs = reader(file_path)
+        else:
+            paragraphs = iter(self.supported_formats[extension](file_path, pages).split('\n'))
+        return (xml_safe(paragraph) for paragraph in paragraphs)
+    
+    def iter_segments(self, file_path: str, segmenter: TextSegmenter,
+                      pages: Optional[List[int]] = None) -> Iterator[SegmentedText]:
+        """Yield the document segmented a block of paragraphs at a time.
+        
+        Joining the translated blocks one after another rebuilds the whole
+        document, separators included.
+        """
+        block: List[str] = []
+        size = 0
+        for paragraph in self.iter_paragraphs(file_path, pages):
+            if block and size + len(paragraph) > self.BLOCK_SIZE:
+                # Every block but the last ends with the line break that follows it
+                yield segmenter.segment('\n'.join(block) + '\n')
+                block, size = [], 0
+            block.append(paragraph)
+            size += len(paragraph) + 1
+        yield segmenter.segment('\n'.join(block))
+    
+    def read_head(self, file_path: str, max_chars: int, pages: Optional[List[int]] = None) -> str:
+        """Read the first ``max_chars`` characters, reading only as much of TXT, RTF or ODT as they need"""
+        head: List[str] = []
+        size = 0
+        for paragraph in self.iter_paragraphs(file_path, pages):
+            head.append(paragraph[:max_chars - size])
+            size += len(head[-1]) + 1
+            if size >= max_chars:
+                break
+        return '\n'.join(head)[:max_chars]
+    
+    def detect_language(self, paragraphs: Iterable[str]) -> Optional[str]:
+        """Detect the language from the first ``SAMPLE_CHARS`` characters of ``paragraphs``"""
+        sample: List[str] = []
+        size = 0
+        for paragraph in paragraphs:
+            sample.append(paragraph[:self.SAMPLE_CHARS - size])
+            size += len(sample[-1])
+            if size >= self.SAMPLE_CHARS:
+                break
+        return self.language_detector.detect_language('\n'.join(sample))
+    
+    def detect_file_language(self, file_path: str, pages: Optional[List[int]] = None) -> Optional[str]:
+        """Detect a document's language, reading only as much of TXT, RTF or ODT as the sample needs"""
+        return self.detect_language(self.iter_paragraphs(file_path, pages))
+    
+    def _check(self, file_path: str) -> str:
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        extension = path.suffix.lower()
+        if extension not in self.supported_formats:
+            raise ValueError(f"Unsupported file format: {extension}")
+        return extension
+
+    def _handle_txt(self, file_path: str, pages: Optional[List[int]] = None) -> str:
+        return '\n'.join(self._iter_txt(file_path))
+    
+    def _handle_docx(self, file_path: str, pages: Optional[List[int]] = None) -> str:
+        # Tables, headers and footers too, not just the body paragraphs
+        return '\n'.join(DocxHandler(file_path).paragraph_texts())
+    
+    def _handle_pdf(self, file_path: str, pages: Optional[List[int]] = None) -> str:
+        pdf_handler = PDFHandler(workers=self.pdf_workers)
+        # One pdfminer pass yields the text, layout and structure together
+        model = pdf_handler.analyze_document(file_path, pages)
+        # Store layout info for later use when writing back to PDF
+        self._current_pdf_model = model
+        self._current_pdf_layout = pdf_handler.layout_from_model(model)
+        self._current_pdf_structure = pdf_handler.structure_from_model(model)
+        return model['text']
+    
+    def _handle_rtf(self, file_path: str, pages: Optional[List[int]] = None) -> str:
+        return '\n'.join(self._iter_rtf(file_path))
+    
+    def _handle_odt(self, file_path: str, pages: Optional[List[int]] = None) -> str:
+        return '\n'.join(self._iter_odt(file_path))
+    
+    def _iter_txt(self, file_path: str) -> Iterator[str]:
+        """Lines of a UTF-8 file, decoded from a memory map a block at a time"""
+        # The same decoding open() applies in text mode, universal newlines included
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield ''
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                pending = ''
+                for start in range(0, len(data), self.BLOCK_SIZE):
+                    pending = yield from self._split_lines(pending + decoder.decode(data[start:start + self.BLOCK_SIZE]))
+                yield pending + decoder.decode(b'', final=True)
+    
+    def _iter_rtf(self, file_path: str) -> Iterator[str]:
+        """Paragraphs of an RTF file, converted a block of body paragraphs at a time.
+        
+        Blocks are cut only after a ``\\par`` at the top level of the
+        document, so no group is split; the header's code page and font
+        table are repeated in front of every block for its encoding.
+        """
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield ''
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                header = None
+                pending = ''
+                for block in self._rtf_blocks(data):
+                    if header is None:
+                        header = self._rtf_header(block)
+                        text = rtf_to_text(block + '}')
+                    else:
+                        text = rtf_to_text(header + block + '}')
+                    # \uN escapes outside the BMP come back as surrogate halves; pair them up again
+                    text = text.encode('utf-16', 'surrogatepass').decode('utf-16', 'replace')
+                    pending = yield from self._split_lines(pending + text)
+                yield pending
+    
+    def _rtf_blocks(self, data) -> Iterator[str]:
+        depth = 0
+        start = 0
+        for match in self._RTF_TOKEN.finditer(data):
+            token = match.group()
+            if token == b'{':
+                depth += 1
+            elif token == b'}':
+                depth -= 1
+            elif token.startswith(b'\\par') and depth == 1 and match.end() - start >= self.BLOCK_SIZE:
+                yield data[start:match.end()].decode('utf-8', 'replace')
+                start = match.end()
+        yield data[start:].decode('utf-8', 'replace')
+    
+    @classmethod
+    def _rtf_header(cls, block: str) -> str:
+        # The document-wide control words come before the first group, the font table
+        prolog_end = block.find('{', 1)
+        prolog = block if prolog_end < 0 else block[:prolog_end]
+        control_words = re.findall(r'\\(?:ansicpg|deff|uc)-?\d+', prolog)
+        return '{\\rtf1\\ansi' + ''.join(control_words) + cls._rtf_font_table(block)
+    
+    @classmethod
+    def _rtf_font_table(cls, block: str) -> str:
+        """The ``{\\fonttbl ...}`` group of ``block``, or '' when it has none"""
+        start = cls._RTF_FONT_TABLE.search(block)
+        if not start:
+            return ''
+        depth = 1
+        for brace in cls._RTF_BRACE.finditer(block, start.end()):
+            depth += {'{': 1, '}': -1}.get(brace.group(), 0)
+            if not depth:
+                return block[start.start():brace.end()]
+        # Unbalanced braces: take what is left
+        return block[start.start():]
+    
+    def _iter_odt(self, file_path: str) -> Iterator[str]:
+        """Paragraphs and headings of an ODT file, parsed incrementally from content.xml"""
+        with zipfile.ZipFile(file_path) as package, package.open('content.xml') as content:
+            parents = []
+            in_paragraph = 0
+            skipped = 0
+            for event, element in ElementTree.iterparse(content, events=('start', 'end')):
+                if event == 'start':
+                    parents.append(element)
+                    in_paragraph += element.tag in self._ODT_PARAGRAPHS
+                    skipped += element.tag in self._ODT_SKIPPED
+                    continue
+                parents.pop()
+                if element.tag in self._ODT_PARAGRAPHS:
+                    in_paragraph -= 1
+                    if not in_paragraph and not skipped:
+                        yield self._odt_text(element)
+                skipped -= element.tag in self._ODT_SKIPPED
+                # Drop everything outside paragraphs once it is read, so the tree never grows
+                if not in_paragraph and parents:
+                    parents[-1].remove(element)
+    
+    def _odt_text(self, element) -> str:
+        parts = [element.text or '']
+        for child in element:
+            if child.tag == self._TEXT_NS + 's':
+                parts.append(' ' * int(child.get(self._TEXT_NS + 'c', 1)))
+            elif child.tag == self._TEXT_NS + 'tab':
+                parts.append('\t')
+            elif child.tag == self._TEXT_NS + 'line-break':
+                parts.append('\n')
+            elif child.tag in self._ODT_PARAGRAPHS:
+                # A paragraph nested in a note or frame becomes a line of its own
+                parts.append('\n' + self._odt_text(child))
+            elif child.tag not in self._ODT_SKIPPED:
+                parts.append(self._odt_text(child))
+            parts.append(child.tail or '')
+        return ''.join(parts)
+    
+    @staticmethod
+    def _split_lines(text: str):
+        """Yield the complete lines of ``text`` and return the unfinished last one"""
+        lines = text.split('\n')
+        yield from lines[:-1]
+        return lines[-1]
+
+class ParagraphStream(ABC):
+    """An output document written one paragraph at a time.
+    
+    ``write`` adds a whole paragraph; ``write_text`` takes arbitrary pieces
+    of text and writes each paragraph as soon as its line break arrives.
+    Use it as a context manager: the document is finished on a clean exit,
+    and a partial output is removed if an exception escapes.
+    """
+    
+    def __init__(self, output_path: str, target_lang: Optional[str] = None):
+        self.output_path = output_path
+        self.target_lang = target_lang
+        self._pending: Optional[str] = None
+    
+    @abstractmethod
+    def write(self, paragraph: str) -> None:
+        pass
+    
+    def write_text(self, text: str) -> None:
+        lines = ((self._pending or '') + text).split('\n')
+        self._pending = lines.pop()
+        for line in lines:
+            self.write(line)
+    
+    def close(self) -> None:
+        if self._pending is not None:
+            self.write(self._pending)
+            self._pending = None
+        self._finish()
+    
+    def abort(self) -> None:
+        self._discard()
+        Path(self.output_path).unlink(missing_ok=True)
+    
+    def _finish(self) -> None:
+        pass
+    
+    def _discard(self) -> None:
+        pass
+    
+    def __enter__(self) -> 'ParagraphStream':
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class TxtStream(ParagraphStream):
+    """Plain text, written to disk as it arrives and exactly as given"""
+    
+    def __init__(self, output_path: str, target_lang: Optional[str] = None):
+        super().__init__(output_path, target_lang)
+        self._file = open(output_path, 'w', encoding='utf-8')
+        self._first = True
+    
+    def write(self, paragraph: str) -> None:
+        if not self._first:
+            self._file.write('\n')
+        self._first = False
+        self._file.write(paragraph)
+    
+    def _finish(self) -> None:
+        self._file.close()
+    
+    _discard = _finish
+
+class RtfStream(ParagraphStream):
+    """RTF, written to disk as it arrives.
+    
+    RTF is 7-bit; everything else goes out as \\uN escapes, which Word and
+    LibreOffice read.
+    """
+    
+    # Characters that need escaping: RTF's own syntax, tabs, and anything outside printable ASCII
+    _SPECIAL = re.compile('[\\\\{}\t]|[^\x20-\x7f]')
+    
+    def __init__(self, output_path: str, target_lang: Optional[str] = None):
+        super().__init__(output_path, target_lang)
+        self._file = open(output_path, 'w', encoding='ascii', newline='\n')
+        self._file.write('{\\rtf1\\ansi\\ansicpg1252\\deff0\\uc1'
+                         '{\\fonttbl{\\f0\\fnil\\fcharset0 Nirmala UI;}}\n'
+                         '\\f0\\fs22\n')
+    
+    def write(self, paragraph: str) -> None:
+        if paragraph.strip():
+            self._file.write(self._escape(paragraph) + '\\par\n')
+    
+    def _finish(self) -> None:
+        self._file.write('}\n')
+        self._file.close()
+    
+    def _discard(self) -> None:
+        self._file.close()
+    
+    @classmethod
+    def _escape(cls, text: str) -> str:
+        # Printable ASCII runs are copied in C; only the matched characters reach Python
+        return cls._SPECIAL.sub(lambda match: cls._escape_char(match.group()), text)
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _escape_char(char: str) -> str:
+        code = ord(char)
+        if char in '\\{}':
+            return '\\' + char
+        if char == '\t':
+            return '\\tab '
+        if code < 32:
+            return ''
+        if code > 0xFFFF:
+            # Outside the BMP: a UTF-16 surrogate pair, each as a signed 16-bit value
+            code -= 0x10000
+            return ''.join(f'\\u{unit - 0x10000}?' for unit in (0xD800 + (code >> 10), 0xDC00 + (code & 0x3FF)))
+        return f'\\u{code if code < 0x8000 else code - 0x10000}?'
+
+class PdfStream(ParagraphStream):
+    """Paragraphs typeset on A4 pages in a font that covers the target script.
+    
+    Each page is finished as soon as it is full, so only the drawn page
+    content is held until the file is saved.
+    """
+    
+    FONT_SIZE = 11
+    MARGIN = 72
+    
+    def __init__(self, output_path: str, target_lang: Optional[str] = None):
+        super().__init__(output_path, target_lang)
+        self.font_name = register_font(target_lang)
+        self.leading = self.FONT_SIZE * 1.4
+        self._width, self._height = A4
+        self._canvas = canvas.Canvas(output_path, pagesize=A4)
+        self._y = self._height - self.MARGIN
+    
+    def write(self, paragraph: str) -> None:
+        if not paragraph.strip():
+            return
+        line_width = self._width - 2 * self.MARGIN
+        for line in simpleSplit(paragraph.strip(), self.font_name, self.FONT_SIZE, line_width):
+            if self._y < self.MARGIN + self.leading:
+                self._canvas.showPage()
+                self._y = self._height - self.MARGIN
+            self._y -= self.leading
+            self._canvas.setFont(self.font_name, self.FONT_SIZE)
+            self._canvas.drawString(self.MARGIN, self._y, line)
+        self._y -= self.leading / 2
+    
+    def _finish(self) -> None:
+        self._canvas.save()
+
+class DocxStream(ParagraphStream):
+    """DOCX is a zip package, so paragraphs are collected and saved on close"""
+    
+    def __init__(self, output_path: str, target_lang: Optional[str] = None):
+        super().__init__(output_path, target_lang)
+        self._doc = docx.Document()
+    
+    def write(self, paragraph: str) -> None:
+        if paragraph.strip():
+            self._doc.add_paragraph(paragraph)
+    
+    def _finish(self) -> None:
+        self._doc.save(self.output_path)
+
+class OdtStream(ParagraphStream):
+    """ODT is a zip package, so paragraphs are collected and saved on close"""
+    
+    def __init__(self, output_path: str, target_lang: Optional[str] = None):
+        super().__init__(output_path, target_lang)
+        self._doc = OpenDocumentText()
+    
+    def write(self, paragraph: str) -> None:
+        if paragraph.strip():
+            element = odf_text.P()
+            # Keeps tabs and runs of spaces, which plain P(text=...) would collapse
+            teletype.addTextToElement(element, paragraph)
+            self._doc.text.addElement(element)
+    
+    def _finish(self) -> None:
+        self._doc.save(self.output_path)
+
+class DocumentWriter:
+    """Write translated text in any supported format, straight from its paragraphs.
+    
+    Each output extension maps to a ``ParagraphStream`` class in
+    ``supported_formats``, so converting between formats goes through no
+    intermediate file and needs neither Word nor a temporary DOCX.
+    ``register_writer`` adds or replaces a format. Blank paragraphs are
+    dropped, except in plain text, which is written exactly as given.
+    
+    ``open`` returns a stream that takes paragraphs as they are translated;
+    TXT, RTF and PDF go to disk as they arrive, so a long output never has
+    to exist as one string.
+    """
+    
+    def __init__(self):
+        self.supported_formats: Dict[str, Callable[[str, Optional[str]], ParagraphStream]] = {
+            '.txt': TxtStream,
+            '.docx': DocxStream,
+            '.odt': OdtStream,
+            '.rtf': RtfStream,
+            '.pdf': PdfStream
+        }
+        self._pdf_handler = PDFHandler()
+    
+    def register_writer(self, extension: str, stream: Callable[[str, Optional[str]], ParagraphStream]) -> None:
+        self.supported_formats[extension.lower()] = stream
+    
+    def open(self, output_path: str, target_lang: str = None) -> ParagraphStream:
+        extension = Path(output_path).suffix.lower()
+        if extension not in self.supported_formats:
+            raise ValueError(f"Unsupported output format: {extension}")
+        return self.supported_formats[extension](output_path, target_lang)
+    
+    def write_document(self, text: str, output_path: str, target_lang: str = None,
+                       source_path: Optional[str] = None) -> None:
+        """Write ``text``; a PDF translated from ``source_path`` PDF keeps that file's layout"""
+        if (source_path and Path(source_path).suffix.lower() == '.pdf'
+                and Path(output_path).suffix.lower() == '.pdf'):
+            self._write_pdf_with_layout(text, output_path, source_path, target_lang)
+            return
+        with self.open(output_path, target_lang) as stream:
+            stream.write_text(text)
+    
+    def write_paragraphs(self, paragraphs: Iterable[str], output_path: str, target_lang: str = None) -> None:
+        with self.open(output_path, target_lang) as stream:
+            for paragraph in paragraphs:
+                stream.write(paragraph)
+    
+    def _write_pdf_with_layout(self, text: str, output_path: str, source_path: str,
+                               target_lang: Optional[str]) -> None:
+        # The layout model is cached from reading the source, so this does not parse it again
+        model = self._pdf_handler.get_model(source_path)
+        self._pdf_handler.write_pdf_with_layout(
+            source_path,
+            text,
+            output_path,
+            self._pdf_handler.layout_from_model(model),
+            target_lang=target_lang,
+            model=model
+        )
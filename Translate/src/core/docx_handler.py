@@ -0,0 +1,161 @@
+from typing import Callable, Iterator, List, Optional
+import docx
+from docx.oxml.ns import qn
+
+class DocxHandler:
+    """Translate a DOCX document in place, one text run at a time.
+    
+    Runs are collected from the body, tables (including nested ones),
+    text boxes, hyperlinks, headers and footers, so every one of them keeps
+    its own formatting and the document keeps its styles and structure.
+    A run holding tabs or line breaks is split at them and each piece is
+    translated on its own, so they stay where they were. Pieces without
+    any letters (empty, numbers, punctuation) are left alone.
+    Adjacent runs with identical formatting, which Word splits for spell
+    checking or revision tracking, are merged first so the engine sees
+    whole phrases instead of fragments.
+    
+    Translations are written back into the loaded document with
+    ``write_back``; it can be called again with another language's
+    translations before the next ``save``.
+    """
+    
+    _RUN = qn('w:r')
+    _TEXT = qn('w:t')
+    _PROPERTIES = qn('w:rPr')
+    _PARAGRAPH = qn('w:p')
+    _PROOF_ERROR = qn('w:proofErr')
+    _SPACE = qn('xml:space')
+    # Run children that separate its text, and how they read as plain text
+    _SEPARATORS = {qn('w:tab'): '\t', qn('w:br'): '\n', qn('w:cr'): '\n'}
+    
+    def __init__(self, file_path: str):
+        self.document = docx.Document(file_path)
+        # The text elements of every translatable piece of a run
+        self.pieces: List[List] = []
+        for container in self._containers():
+            self._merge_runs(container)
+            for run in container.iter(self._RUN):
+                self.pieces.extend(piece for piece in self._pieces(run)
+                                   if self._translatable(self._piece_text(piece)))
+    
+    @property
+    def texts(self) -> List[str]:
+        """The text of every translatable piece, in document order"""
+        return [self._piece_text(piece) for piece in self.pieces]
+    
+    def paragraph_texts(self) -> List[str]:
+        """The text of every paragraph, headers and footers included"""
+        texts = []
+        for container in self._containers():
+            for paragraph in container.iter(self._PARAGRAPH):
+                # Text boxes nest paragraphs; each run belongs to its innermost one
+                texts.append(''.join(self._run_text(run) for run in paragraph.iter(self._RUN)
+                                     if next(run.iterancestors(self._PARAGRAPH)) is paragraph))
+        return texts
+    
+    def write_back(self, translations: List[str]) -> None:
+        if len(translations) != len(self.pieces):
+            raise ValueError(f"Expected {len(self.pieces)} translated pieces, got {len(translations)}")
+        for piece, translation in zip(self.pieces, translations):
+            self._set_text(piece, translation)
+    
+    def translate(self, translate_batch: Callable[[List[str]], List[str]],
+                  batch_size: Optional[int] = None,
+                  on_batch: Optional[Callable[[List[str], List[str]], None]] = None) -> List[str]:
+        """Translate every run with ``translate_batch`` and write the results back.
+        
+        Runs go to ``translate_batch`` ``batch_size`` at a time (all at once
+        by default); ``on_batch`` receives each batch's sources and
+        translations, e.g. for progress or cancellation.
+        """
+        texts = self.texts
+        size = batch_size or max(1, len(texts))
+        translations: List[str] = []
+        for start in range(0, len(texts), size):
+            batch = texts[start:start + size]
+            results = translate_batch(batch)
+            translations.extend(results)
+            if on_batch:
+                on_batch(batch, results)
+        self.write_back(translations)
+        return translations
+    
+    def save(self, output_path: str) -> None:
+        self.document.save(output_path)
+    
+    def _containers(self) -> Iterator:
+        yield self.document.element.body
+        seen = set()
+        for section in self.document.sections:
+            for part in (section.header, section.first_page_header, section.even_page_header,
+                         section.footer, section.first_page_footer, section.even_page_footer):
+                # A linked header or footer has no part of its own; touching it would add one
+                if part.is_linked_to_previous:
+                    continue
+                element = part.part.element
+                if id(element) not in seen:
+                    seen.add(id(element))
+                    yield element
+    
+    @staticmethod
+    def _translatable(text: str) -> bool:
+        return any(char.isalpha() for char in text)
+    
+    @classmethod
+    def _run_text(cls, run) -> str:
+        # Only the run's own text: a drawing inside it may hold a text box with runs of its own
+        return ''.join(t.text or '' if t.tag == cls._TEXT else cls._SEPARATORS.get(t.tag, '') for t in run)
+    
+    @classmethod
+    def _pieces(cls, run) -> List[List]:
+        """The run's text elements, grouped between its tabs and breaks"""
+        pieces: List[List] = [[]]
+        for child in run:
+            if child.tag == cls._TEXT:
+                pieces[-1].append(child)
+            elif child.tag in cls._SEPARATORS and pieces[-1]:
+                pieces.append([])
+        return [piece for piece in pieces if piece]
+    
+    @staticmethod
+    def _piece_text(piece: List) -> str:
+        return ''.join(element.text or '' for element in piece)
+    
+    @classmethod
+    def _plain(cls, run) -> bool:
+        """True for runs holding nothing but formatting and text"""
+        return all(child.tag in (cls._PROPERTIES, cls._TEXT) for child in run)
+    
+    @classmethod
+    def _same_format(cls, run, other) -> bool:
+        properties, other_properties = run.find(cls._PROPERTIES), other.find(cls._PROPERTIES)
+        if properties is None or other_properties is None:
+            return properties is None and other_properties is None
+        return properties.xml == other_properties.xml
+    
+    @classmethod
+    def _merge_runs(cls, container) -> None:
+        for paragraph in container.iter(cls._PARAGRAPH):
+            run = None
+            for child in list(paragraph):
+                if child.tag == cls._PROOF_ERROR and run is not None:
+                    # Spelling markers only split runs; dropping them changes nothing visible
+                    paragraph.remove(child)
+                elif child.tag != cls._RUN or not cls._plain(child):
+                    run = None
+                elif run is not None and run.find(cls._TEXT) is not None and cls._same_format(run, child):
+                    cls._set_text(run.findall(cls._TEXT), cls._run_text(run) + cls._run_text(child))
+                    paragraph.remove(child)
+                else:
+                    run = child
+    
+    @classmethod
+    def _set_text(cls, elements: List, text: str) -> None:
+        # Keep tabs, breaks and drawings: only the text elements change
+        if not elements:
+            return
+        elements[0].text = text
+        elements[0].set(cls._SPACE, 'preserve')
+        for element in elements[1:]:
+            element.getparent().remove(element)
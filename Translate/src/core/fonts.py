@@ -0,0 +1,88 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+import os
+import threading
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# Fonts tried for each target language, best first: Noto and Lohit on Linux,
+# Nirmala UI on Windows (covers every Indic script), the macOS Sangam family
+_NOTO = {
+    'hi': 'Devanagari', 'mr': 'Devanagari', 'bn': 'Bengali', 'te': 'Telugu', 'ta': 'Tamil',
+    'gu': 'Gujarati', 'kn': 'Kannada', 'ml': 'Malayalam', 'pa': 'Gurmukhi'
+}
+_LOHIT = {
+    'hi': 'Devanagari', 'mr': 'Marathi', 'bn': 'Bengali', 'te': 'Telugu', 'ta': 'Tamil',
+    'gu': 'Gujarati', 'kn': 'Kannada', 'ml': 'Malayalam', 'pa': 'Gurmukhi'
+}
+_SANGAM = {'bn': 'Bangla', 'te': 'Telugu', 'ta': 'Tamil', 'gu': 'Gujarati',
+           'kn': 'Kannada', 'ml': 'Malayalam', 'pa': 'Gurmukhi', 'hi': 'Devanagari', 'mr': 'Devanagari'}
+
+FONT_DIRS = [
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    str(Path.home() / '.fonts'),
+    str(Path.home() / '.local' / 'share' / 'fonts'),
+    os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts'),
+    '/Library/Fonts',
+    '/System/Library/Fonts',
+    '/System/Library/Fonts/Supplemental'
+]
+
+DEFAULT_FONT = 'Helvetica'
+
+_registered: Dict[Optional[str], str] = {}
+_font_files: Optional[Dict[str, str]] = None
+_lock = threading.Lock()
+
+def candidate_files(target_lang: Optional[str]) -> List[Tuple[str, str]]:
+    """(font name, file name) pairs that can render ``target_lang``, best first"""
+    candidates = []
+    if target_lang in _NOTO:
+        script = _NOTO[target_lang]
+        candidates += [(f'NotoSans{script}', f'NotoSans{script}-Regular.ttf'),
+                       (f'NotoSerif{script}', f'NotoSerif{script}-Regular.ttf')]
+    if target_lang in _LOHIT:
+        candidates.append((f'Lohit-{_LOHIT[target_lang]}', f'Lohit-{_LOHIT[target_lang]}.ttf'))
+    if target_lang in _NOTO:
+        candidates.append(('NirmalaUI', 'Nirmala.ttf'))
+    if target_lang in _SANGAM:
+        candidates.append((f'{_SANGAM[target_lang]}SangamMN', f'{_SANGAM[target_lang]} Sangam MN.ttc'))
+    return candidates
+
+def register_font(target_lang: Optional[str], font_dirs: Iterable[str] = FONT_DIRS) -> str:
+    """Register a TrueType font for ``target_lang`` with reportlab and return its name.
+    
+    Falls back to Helvetica, which only covers Latin text, when no suitable
+    font is installed. The font directories are scanned once per process.
+    """
+    with _lock:
+        if target_lang in _registered:
+            return _registered[target_lang]
+        font_name = DEFAULT_FONT
+        files = _scan(font_dirs)
+        for name, file_name in candidate_files(target_lang):
+            if name in pdfmetrics.getRegisteredFontNames():
+                font_name = name
+                break
+            path = files.get(file_name.lower())
+            if path:
+                try:
+                    pdfmetrics.registerFont(TTFont(name, path))
+                except Exception:
+                    # Collections and fonts reportlab cannot embed are skipped
+                    continue
+                font_name = name
+                break
+        _registered[target_lang] = font_name
+        return font_name
+
+def _scan(font_dirs: Iterable[str]) -> Dict[str, str]:
+    global _font_files
+    if _font_files is None:
+        _font_files = {}
+        for directory in font_dirs:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    _font_files.setdefault(name.lower(), os.path.join(root, name))
+    return _font_files
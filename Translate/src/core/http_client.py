@@ -0,0 +1,106 @@
+from typing import Callable, Dict, Optional, Tuple
+import html
+import re
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from deep_translator.exceptions import RequestError, TooManyRequests, TranslationNotFound
+
+class SessionPool:
+    """A requests.Session shared by all clients, with a bounded connection pool.
+    
+    ``max_connections`` caps the sockets kept open per host; with
+    ``pool_block`` set, worker threads wait for a free connection instead of
+    opening throwaway ones past the limit.
+    """
+    
+    def __init__(self, max_connections: int = 8, max_hosts: int = 4, pool_block: bool = True):
+        self.max_connections = max_connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_hosts,
+                              pool_maxsize=max_connections,
+                              pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.session.get(url, **kwargs)
+    
+    def close(self) -> None:
+        self.session.close()
+
+class GoogleWebClient:
+    """Client for the Google Translate web endpoint that deep_translator scrapes.
+    
+    Unlike ``deep_translator.GoogleTranslator`` it keeps no per-call state, so
+    one instance per language pair can be shared between threads, and it
+    sends every request through a pooled session.
+    """
+    
+    DEFAULT_URL = 'https://translate.google.com/m'
+    _RESULT = re.compile(r'<div[^>]*class="result-container"[^>]*>(.*?)</div>', re.DOTALL)
+    
+    def __init__(self, source: str, target: str, pool: SessionPool,
+                 base_url: str = DEFAULT_URL, timeout: float = 30.0):
+        self.source = source
+        self.target = target
+        self.pool = pool
+        self.base_url = base_url
+        self.timeout = timeout
+    
+    def translate(self, text: str) -> str:
+        if not text.strip():
+            return text
+        
+        response = self.pool.get(
+            self.base_url,
+            params={'sl': self.source, 'tl': self.target, 'q': text.strip()},
+            timeout=self.timeout
+        )
+        if response.status_code == 429:
+            raise TooManyRequests()
+        if response.status_code != 200:
+            raise RequestError()
+        
+        match = self._RESULT.search(response.text)
+        if not match:
+            raise TranslationNotFound(text)
+        return html.unescape(match.group(1)).strip()
+
+class ClientCache:
+    """Thread-safe cache of one client per (source, target) language pair"""
+    
+    def __init__(self, pool: Optional[SessionPool] = None,
+                 factory: Optional[Callable[[str, str, SessionPool], GoogleWebClient]] = None):
+        self.pool = pool or SessionPool()
+        self.factory = factory or GoogleWebClient
+        self._clients: Dict[Tuple[str, str], GoogleWebClient] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, source: str, target: str) -> GoogleWebClient:
+        key = (source, target)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self.factory(source, target, self.pool)
+                    self._clients[key] = client
+        return client
+    
+    def close(self) -> None:
+        with self._lock:
+            self._clients.clear()
+        self.pool.close()
+
+_default_cache: Optional[ClientCache] = None
+_default_lock = threading.Lock()
+
+def get_default_client_cache() -> ClientCache:
+    """Return the process-wide client cache shared by every GoogleTranslationEngine"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = ClientCache()
+    return _default_cache
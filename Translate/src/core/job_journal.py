@@ -0,0 +1,146 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import sqlite3
+import threading
+import time
+
+class JobJournal:
+    """Durable record of a batch run, so that an interrupted run can resume.
+    
+    For every (file, target language) pair the journal holds the outcome of
+    the last attempt: done with its output path and source hash, or failed
+    with the error. While a file is being translated, each finished request
+    group is recorded segment by segment, so a crash or cancellation in the
+    middle of a large file only loses the requests that were in flight.
+    Segment rows are dropped once their file is done.
+    """
+    
+    DONE = 'done'
+    FAILED = 'failed'
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            ' source TEXT NOT NULL,'
+            ' target_lang TEXT NOT NULL,'
+            ' status TEXT NOT NULL,'
+            ' output TEXT,'
+            ' error TEXT,'
+            ' source_hash TEXT,'
+            ' updated REAL NOT NULL,'
+            ' PRIMARY KEY (source, target_lang))'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS segments ('
+            ' source TEXT NOT NULL,'
+            ' target_lang TEXT NOT NULL,'
+            ' key TEXT NOT NULL,'
+            ' translation TEXT NOT NULL,'
+            ' PRIMARY KEY (source, target_lang, key))'
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def _source(file_path: str) -> str:
+        return str(Path(file_path).resolve())
+    
+    @staticmethod
+    def _segment_key(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def file_status(self, file_path: str, target_lang: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, output, error, source_hash FROM files WHERE source = ? AND target_lang = ?',
+                (self._source(file_path), target_lang)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('status', 'output', 'error', 'source_hash'), row))
+    
+    def is_done(self, file_path: str, target_lang: str, source_hash: str, output_path: str) -> bool:
+        """True when the file was finished from this exact source into ``output_path``, which still exists.
+        
+        A run writing somewhere else, such as another output directory, is
+        not done just because an earlier run's output is.
+        """
+        status = self.file_status(file_path, target_lang)
+        return (status is not None and status['status'] == self.DONE
+                and status['source_hash'] == source_hash and status['output'] is not None
+                and Path(status['output']).resolve() == Path(output_path).resolve()
+                and Path(output_path).is_file())
+    
+    def segments(self, file_path: str, target_lang: str, texts: Iterable[str]) -> Dict[str, str]:
+        """Return the recorded translations among ``texts``, keyed by source text"""
+        by_key = {self._segment_key(text): text for text in texts}
+        found = {}
+        keys = list(by_key)
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(self._conn.execute(
+                    f'SELECT key, translation FROM segments WHERE source = ? AND target_lang = ?'
+                    f' AND key IN ({placeholders})',
+                    [self._source(file_path), target_lang, *chunk]
+                ).fetchall())
+        return {by_key[key]: translation for key, translation in found.items()}
+    
+    def record_segments(self, file_path: str, target_lang: str, pairs: Iterable[Tuple[str, str]]) -> None:
+        source = self._source(file_path)
+        rows = [(source, target_lang, self._segment_key(text), translation) for text, translation in pairs]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO segments (source, target_lang, key, translation) VALUES (?, ?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+    
+    def mark_done(self, file_path: str, target_lang: str, output_path: str, source_hash: str) -> None:
+        source = self._source(file_path)
+        with self._lock:
+            self._set_status(source, target_lang, self.DONE, output_path, None, source_hash)
+            self._conn.execute('DELETE FROM segments WHERE source = ? AND target_lang = ?', (source, target_lang))
+            self._conn.commit()
+    
+    def mark_failed(self, file_path: str, target_lang: str, error: str) -> None:
+        with self._lock:
+            self._set_status(self._source(file_path), target_lang, self.FAILED, None, error, None)
+            self._conn.commit()
+    
+    def failures(self, target_lang: Optional[str] = None) -> List[Tuple[str, str, str]]:
+        """Return (file, target language, error) for every file whose last attempt failed"""
+        query = 'SELECT source, target_lang, error FROM files WHERE status = ?'
+        params: List[str] = [self.FAILED]
+        if target_lang is not None:
+            query += ' AND target_lang = ?'
+            params.append(target_lang)
+        with self._lock:
+            return self._conn.execute(query + ' ORDER BY source', params).fetchall()
+    
+    def summary(self) -> Dict[str, int]:
+        """Count files per status, plus segments saved from unfinished files"""
+        with self._lock:
+            counts = dict(self._conn.execute('SELECT status, COUNT(*) FROM files GROUP BY status').fetchall())
+            counts['segments'] = self._conn.execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+        return counts
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+    
+    def _set_status(self, source: str, target_lang: str, status: str, output: Optional[str],
+                    error: Optional[str], source_hash: Optional[str]) -> None:
+        self._conn.execute(
+            'INSERT OR REPLACE INTO files (source, target_lang, status, output, error, source_hash, updated)'
+            ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (source, target_lang, status, output, error, source_hash, time.time())
+        )
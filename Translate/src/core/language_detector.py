@@ -1,34 +1,148 @@
-from typing import Optional
-from langdetect import detect, LangDetectException
-
-class LanguageDetector:
-    def __init__(self):
-        self.supported_languages = {
-            'hi': 'Hindi',
-            'bn': 'Bengali',
-            'te': 'Telugu',
-            'ta': 'Tamil',
-            'mr': 'Marathi',
-            'gu': 'Gujarati',
-            'kn': 'Kannada',
-            'ml': 'Malayalam',
-            'pa': 'Punjabi',
-            'en': 'English'
-        }
-    
-    def detect_language(self, text: str) -> Optional[str]:
-        """Detect the language of the given text.
-        Returns the language code if detected, None otherwise."""
-        try:
-            detected_code = detect(text)
-            return detected_code if detected_code in self.supported_languages else None
-        except LangDetectException:
-            return None
-    
-    def get_language_name(self, language_code: str) -> str:
-        """Get the full name of a language from its code."""
-        return self.supported_languages.get(language_code, 'Unknown')
-    
-    def get_supported_languages(self) -> dict:
-        """Get a dictionary of supported languages and their codes."""
-        return self.supported_languages.copy()
\ No newline at end of file
+from typing import Dict, Optional
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+from langdetect import DetectorFactory, detect, detect_langs, LangDetectException
+
+# langdetect samples randomly; a fixed seed gives the same answer for the same text every run
+DetectorFactory.seed = 0
+
+class LanguageDetector:
+    """Detect a text's language from its script, falling back to langdetect.
+    
+    Most Indic languages have a script of their own, so counting the
+    letters of each script in a bounded sample answers directly. Hindi and
+    Marathi share Devanagari and are told apart by frequent marker words;
+    langdetect is asked only when those are unclear or the text is in
+    another script, and then only about the sample. Results are cached by
+    a hash of the sample, so the same document is never classified twice.
+    """
+    
+    # Characters taken from the text, in evenly spaced windows so a title page does not decide alone
+    SAMPLE_CHARS = 2000
+    SAMPLE_WINDOWS = 4
+    # Share of the sampled letters a script needs to decide the language
+    SCRIPT_MAJORITY = 0.6
+    CACHE_SIZE = 1024
+    # Languages identified by script alone (Hindi and Marathi with marker words)
+    SCRIPT_LANGUAGES = ('hi', 'mr', 'bn', 'pa', 'gu', 'ta', 'te', 'kn', 'ml')
+    
+    _SCRIPTS = {
+        'bn': re.compile('[\u0980-\u09FF]'),
+        'pa': re.compile('[\u0A00-\u0A7F]'),
+        'gu': re.compile('[\u0A80-\u0AFF]'),
+        'ta': re.compile('[\u0B80-\u0BFF]'),
+        'te': re.compile('[\u0C00-\u0C7F]'),
+        'kn': re.compile('[\u0C80-\u0CFF]'),
+        'ml': re.compile('[\u0D00-\u0D7F]')
+    }
+    _DEVANAGARI = re.compile('[\u0900-\u097F\uA8E0-\uA8FF]')
+    # Letters, plus the Indic vowel signs and viramas the script counts include
+    _LETTER = re.compile(r'[^\W\d_]|[\u0900-\u0D7F\uA8E0-\uA8FF]')
+    # Frequent function words, and the Marathi letter LLA, which Hindi hardly uses
+    _HINDI_MARKERS = re.compile('(?<![\u0900-\u097F])(?:है|हैं|और|के|की|में|से|का|नहीं)(?![\u0900-\u097F])')
+    _MARATHI_MARKERS = re.compile('(?<![\u0900-\u097F])(?:आहे|आहेत|आणि|नाही|आहोत|होते|झाले)(?![\u0900-\u097F])|ळ')
+    
+    _cache: 'OrderedDict[str, Optional[str]]' = OrderedDict()
+    _cache_lock = threading.Lock()
+    
+    def __init__(self):
+        self.supported_languages = {
+            'hi': 'Hindi',
+            'bn': 'Bengali',
+            'te': 'Telugu',
+            'ta': 'Tamil',
+            'mr': 'Marathi',
+            'gu': 'Gujarati',
+            'kn': 'Kannada',
+            'ml': 'Malayalam',
+            'pa': 'Punjabi',
+            'en': 'English'
+        }
+    
+    def detect_language(self, text: str) -> Optional[str]:
+        """Detect the language of the given text.
+        Returns the language code if detected, None otherwise."""
+        sample = self._sample(text)
+        if not sample.strip():
+            return None
+        key = hashlib.blake2b(sample.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+        with LanguageDetector._cache_lock:
+            if key in LanguageDetector._cache:
+                LanguageDetector._cache.move_to_end(key)
+                return LanguageDetector._cache[key]
+        
+        detected = self.detect_script(sample)
+        if detected is None:
+            detected = self._detect_statistically(sample)
+        
+        with LanguageDetector._cache_lock:
+            LanguageDetector._cache[key] = detected
+            while len(LanguageDetector._cache) > LanguageDetector.CACHE_SIZE:
+                LanguageDetector._cache.popitem(last=False)
+        return detected
+    
+    def script_histogram(self, text: str) -> Dict[str, int]:
+        """Count the letters of each Indic script in ``text``, keyed by language (Devanagari as 'hi')"""
+        counts = {lang: len(pattern.findall(text)) for lang, pattern in self._SCRIPTS.items()}
+        counts['hi'] = len(self._DEVANAGARI.findall(text))
+        return counts
+    
+    def detect_script(self, text: str) -> Optional[str]:
+        """The language whose script holds most of the letters of ``text``, or None when no Indic script does"""
+        letters = len(self._LETTER.findall(text))
+        if not letters:
+            return None
+        counts = self.script_histogram(text)
+        lang = max(counts, key=counts.get)
+        if counts[lang] < letters * self.SCRIPT_MAJORITY:
+            return None
+        if lang == 'hi':
+            return self._hindi_or_marathi(text)
+        return lang
+    
+    def get_language_name(self, language_code: str) -> str:
+        """Get the full name of a language from its code."""
+        return self.supported_languages.get(language_code, 'Unknown')
+    
+    def get_supported_languages(self) -> dict:
+        """Get a dictionary of supported languages and their codes."""
+        return self.supported_languages.copy()
+    
+    def _sample(self, text: str) -> str:
+        if len(text) <= self.SAMPLE_CHARS:
+            return text
+        window = self.SAMPLE_CHARS // self.SAMPLE_WINDOWS
+        step = (len(text) - window) // (self.SAMPLE_WINDOWS - 1)
+        return '\n'.join(text[start:start + window] for start in range(0, step * self.SAMPLE_WINDOWS, step))
+    
+    def _detect_statistically(self, sample: str) -> Optional[str]:
+        try:
+            detected_code = detect(sample)
+        except LangDetectException:
+            return None
+        return detected_code if detected_code in self.supported_languages else None
+    
+    def marker_language(self, text: str) -> Optional[str]:
+        """'hi' or 'mr' when the marker words in Devanagari ``text`` clearly point to one, else None"""
+        hindi = len(self._HINDI_MARKERS.findall(text))
+        marathi = len(self._MARATHI_MARKERS.findall(text))
+        if hindi > 2 * marathi:
+            return 'hi'
+        if marathi > 2 * hindi:
+            return 'mr'
+        return None
+    
+    def _hindi_or_marathi(self, sample: str) -> str:
+        """Hindi and Marathi share Devanagari: decide by marker words, or by langdetect when they are unclear"""
+        by_markers = self.marker_language(sample)
+        if by_markers:
+            return by_markers
+        try:
+            for guess in detect_langs(sample):
+                if guess.lang in ('hi', 'mr'):
+                    return guess.lang
+        except LangDetectException:
+            pass
+        return 'hi'
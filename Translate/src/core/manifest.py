@@ -0,0 +1,105 @@
+from typing import Callable, Dict, List, Optional
+from pathlib import Path
+import hashlib
+import json
+import os
+
+class TranslationManifest:
+    """Sidecar record of what a translated output was built from.
+    
+    Stored next to the output as ``<output>.manifest.json``, it holds a hash
+    of the source file and, for every source segment, a hash of the segment
+    together with its translation. A later run can skip a file whose source
+    hash is unchanged, and otherwise send only new or edited segments to the
+    engine. Segments that disappeared from the source are dropped on save.
+    """
+    
+    SUFFIX = '.manifest.json'
+    VERSION = 1
+    
+    def __init__(self, output_path: str, target_lang: str,
+                 source_hash: Optional[str] = None,
+                 segments: Optional[Dict[str, str]] = None):
+        self.output_path = Path(output_path)
+        self.target_lang = target_lang
+        self.source_hash = source_hash
+        self._previous = segments or {}
+        self.segments: Dict[str, str] = {}
+        self.reused = 0
+        self.translated = 0
+    
+    @property
+    def path(self) -> Path:
+        return self.output_path.with_name(self.output_path.name + self.SUFFIX)
+    
+    @classmethod
+    def load(cls, output_path: str, target_lang: str) -> 'TranslationManifest':
+        """Load the manifest for an output, or start an empty one if it is missing or stale"""
+        manifest = cls(output_path, target_lang)
+        try:
+            with open(manifest.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if data.get('version') != cls.VERSION or data.get('target_lang') != target_lang:
+            return manifest
+        return cls(output_path, target_lang, data.get('source_hash'), data.get('segments', {}))
+    
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def is_current(self, source_hash: str) -> bool:
+        """True when the output exists and was built from a source with this hash"""
+        return self.source_hash == source_hash and self.output_path.is_file()
+    
+    def pending(self, segments: List[str]) -> List[str]:
+        """Return the distinct segments the manifest has no translation for"""
+        missing = {}
+        for segment in segments:
+            if self.hash_text(segment) not in self._previous:
+                missing[segment] = None
+        return list(missing)
+    
+    def complete(self, segments: List[str], pending: List[str], translations: List[str]) -> List[str]:
+        """Record ``translations`` of ``pending`` and return translations for all ``segments``"""
+        fresh = dict(zip(pending, translations))
+        results = []
+        for segment in segments:
+            key = self.hash_text(segment)
+            if segment in fresh:
+                translation = fresh[segment]
+                self.translated += 1
+            else:
+                translation = self._previous[key]
+                self.reused += 1
+            self.segments[key] = translation
+            results.append(translation)
+        return results
+    
+    def translate(self, segments: List[str], translate_batch: Callable[[List[str]], List[str]]) -> List[str]:
+        """Translate ``segments``, calling ``translate_batch`` only for the ones not recorded"""
+        pending = self.pending(segments)
+        return self.complete(segments, pending, translate_batch(pending) if pending else [])
+    
+    def save(self, source_hash: str) -> None:
+        """Write the manifest for the segments of this run, replacing the old one atomically"""
+        self.source_hash = source_hash
+        data = {
+            'version': self.VERSION,
+            'target_lang': self.target_lang,
+            'source_hash': source_hash,
+            'segments': self.segments
+        }
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,123 @@
+"""Local stand-in for the Google Translate web endpoint.
+
+Serves the same ``/m?sl=..&tl=..&q=..`` interface that GoogleWebClient calls,
+over HTTP/1.1 keep-alive, and counts requests and TCP connections so that
+connection reuse can be checked and benchmarked without network access.
+
+Run ``python -m core.mock_backend`` from ``src`` for a small benchmark.
+"""
+from typing import Callable, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import html
+import threading
+import time
+
+def _default_transform(text: str, target: str) -> str:
+    return f"[{target}] {text}"
+
+class MockTranslationServer:
+    def __init__(self, transform: Optional[Callable[[str, str], str]] = None,
+                 latency: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        self.transform = transform or _default_transform
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/m"
+    
+    def start(self) -> 'MockTranslationServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+    
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+    
+    def __enter__(self) -> 'MockTranslationServer':
+        return self.start()
+    
+    def __exit__(self, *exc) -> None:
+        self.stop()
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; avoid Nagle stalls on keep-alive
+            disable_nagle_algorithm = True
+            
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+            
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                query = parse_qs(urlparse(self.path).query)
+                text = query.get('q', [''])[0]
+                target = query.get('tl', [''])[0]
+                if server.latency:
+                    time.sleep(server.latency)
+                
+                body = (
+                    '<html><body><div class="result-container">'
+                    f'{html.escape(server.transform(text, target))}'
+                    '</div></body></html>'
+                ).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+
+def benchmark(calls: int = 200, latency: float = 0.0) -> None:
+    """Compare pooled, cached clients against a fresh connection per call"""
+    import requests
+    from .http_client import ClientCache, GoogleWebClient, SessionPool
+    
+    with MockTranslationServer(latency=latency) as server:
+        start = time.perf_counter()
+        for i in range(calls):
+            response = requests.get(server.url, params={'sl': 'auto', 'tl': 'hi', 'q': f'text {i}'})
+            response.raise_for_status()
+        fresh = time.perf_counter() - start
+        fresh_connections = server.connections
+        
+        server.reset_counters()
+        cache = ClientCache(SessionPool(),
+                            lambda source, target, pool: GoogleWebClient(source, target, pool, server.url))
+        start = time.perf_counter()
+        for i in range(calls):
+            cache.get('auto', 'hi').translate(f'text {i}')
+        pooled = time.perf_counter() - start
+        pooled_connections = server.connections
+        cache.close()
+    
+    print(f"fresh connection per call: {fresh:.3f}s, {fresh_connections} connections")
+    print(f"pooled cached client:      {pooled:.3f}s, {pooled_connections} connections")
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,433 +1,750 @@
-from typing import Dict, List, Tuple, Optional
-from pathlib import Path
-from PyPDF2 import PdfReader, PdfWriter
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTChar, LTAnno, LTTextLineHorizontal, LTImage
-from collections import defaultdict
-from reportlab.pdfgen import canvas
-from io import BytesIO
-from reportlab.lib.utils import ImageReader as Image
-
-class PDFHandler:
-    def __init__(self):
-        self.layout_info = defaultdict(list)
-        self.font_info = defaultdict(dict)
-        self.structure_info = defaultdict(dict)
-        self.text_segments = defaultdict(list)
-        self.image_elements = defaultdict(list)
-        self.fallback_fonts = {
-            'hi': 'Nirmala UI',  # Hindi
-            'bn': 'Nirmala UI',  # Bengali
-            'te': 'Nirmala UI',  # Telugu
-            'ta': 'Nirmala UI',  # Tamil
-            'mr': 'Nirmala UI',  # Marathi
-            'gu': 'Nirmala UI',  # Gujarati
-            'kn': 'Nirmala UI',  # Kannada
-            'ml': 'Nirmala UI',  # Malayalam
-            'pa': 'Nirmala UI'   # Punjabi
-        }
-    
-    def detect_structure(self, file_path: str) -> Dict:
-        """Detect document structure including headers, paragraphs, and columns"""
-        structure = defaultdict(dict)
-        
-        for page_num, page_layout in enumerate(extract_pages(file_path)):
-            # Track potential headers and columns
-            headers = []
-            columns = defaultdict(list)
-            
-            # Group text elements by their vertical and horizontal positions
-            v_groups = defaultdict(list)
-            h_groups = defaultdict(list)
-            
-            for element in page_layout:
-                if isinstance(element, LTTextContainer):
-                    bbox = element.bbox
-                    font_info = self._extract_font_info(element)
-                    
-                    # Group by vertical position
-                    v_pos = round(bbox[1])
-                    v_groups[v_pos].append({
-                        'text': element.get_text().strip(),
-                        'bbox': bbox,
-                        'font': font_info
-                    })
-                    
-                    # Group by horizontal position for column detection
-                    h_pos = round(bbox[0])
-                    h_groups[h_pos].append({
-                        'text': element.get_text().strip(),
-                        'bbox': bbox,
-                        'font': font_info
-                    })
-            
-            # Detect headers based on font size and position
-            sorted_v_pos = sorted(v_groups.keys(), reverse=True)
-            for v_pos in sorted_v_pos:
-                elements = v_groups[v_pos]
-                for element in elements:
-                    font_size = element['font'].get('size', 0)
-                    if font_size > 12 or element['font'].get('is_bold', False):
-                        headers.append(element)
-            
-            # Detect columns based on horizontal grouping
-            sorted_h_pos = sorted(h_groups.keys())
-            if len(sorted_h_pos) > 1:
-                avg_gap = sum(sorted_h_pos[i+1] - sorted_h_pos[i] 
-                            for i in range(len(sorted_h_pos)-1)) / (len(sorted_h_pos)-1)
-                
-                current_column = 0
-                prev_pos = sorted_h_pos[0]
-                
-                for h_pos in sorted_h_pos[1:]:
-                    if h_pos - prev_pos > avg_gap * 1.5:  # New column detected
-                        current_column += 1
-                    columns[current_column].extend(h_groups[h_pos])
-                    prev_pos = h_pos
-            
-            structure[page_num] = {
-                'headers': headers,
-                'columns': dict(columns),
-                'layout_type': 'multi_column' if len(columns) > 1 else 'single_column'
-            }
-        
-        return dict(structure)
-
-    def extract_text_with_layout(self, file_path: str, pages: Optional[List[int]] = None) -> Tuple[str, Dict]:
-        """Extract text while preserving layout information and ensuring XML compatibility"""
-        text_chunks = []
-        layout_info = defaultdict(list)
-        
-        for page_num, page_layout in enumerate(extract_pages(file_path)):
-            if pages is not None and page_num not in pages:
-                continue
-                
-            page_text = []
-            text_elements = []
-            
-            # First pass: collect all elements and their characteristics
-            for element in page_layout:
-                if isinstance(element, LTTextContainer):
-                    text = self._sanitize_text(element.get_text().strip())
-                    if text:
-                        bbox = element.bbox
-                        font_info = self._extract_font_info(element)
-                        text_elements.append({
-                            'text': text,
-                            'bbox': bbox,
-                            'font': font_info,
-                            'y_pos': round(bbox[1]),
-                            'x_pos': round(bbox[0]),
-                            'width': round(bbox[2] - bbox[0]),
-                            'height': round(bbox[3] - bbox[1])
-                        })
-                elif isinstance(element, LTImage):
-                    # Store image elements for later reconstruction
-                    self.image_elements[page_num].append({
-                        'bbox': element.bbox,
-                        'stream': element.stream,
-                        'name': element.name
-                    })
-            
-            # Second pass: group elements by logical blocks
-            blocks = self._group_elements_into_blocks(text_elements)
-            
-            # Store layout information with block context
-            for block in blocks:
-                layout_info[page_num].extend(block['elements'])
-                page_text.append(block['text'])
-            
-            text_chunks.append('\n'.join(page_text))
-        
-        return '\n\n'.join(text_chunks), dict(layout_info)
-    
-    def _sanitize_text(self, text: str) -> str:
-        """Sanitize text to ensure XML compatibility while preserving meaningful whitespace"""
-        if not text:
-            return ""
-        
-        # Normalize whitespace while preserving meaningful spaces
-        text = ' '.join(text.split())
-        
-        # Handle Unicode ranges and control characters
-        return ''.join(
-            char for char in text
-            if char in ' \n\t\r'
-            or (ord(char) >= 32 and ord(char) <= 55295)
-            or (ord(char) >= 57344 and ord(char) <= 65533)
-            or (ord(char) >= 65536 and ord(char) <= 1114111)
-        )
-
-    def _extract_font_info(self, text_container) -> Dict:
-        """Extract detailed font information from text elements"""
-        font_info = defaultdict(lambda: defaultdict(int))
-        
-        for text_line in text_container:
-            if isinstance(text_line, LTTextLineHorizontal):
-                for char in text_line:
-                    if isinstance(char, LTChar):
-                        font_name = char.fontname
-                        font_size = round(char.size)
-                        font_info[font_name][font_size] += 1
-        
-        if not font_info:
-            return {}
-        
-        # Find most common font and size
-        most_common_font = max(font_info.items(), key=lambda x: sum(x[1].values()))[0]
-        most_common_size = max(font_info[most_common_font].items(), key=lambda x: x[1])[0]
-        
-        return {
-            'name': most_common_font,
-            'size': most_common_size,
-            'is_bold': 'Bold' in most_common_font,
-            'is_italic': 'Italic' in most_common_font
-        }
-    
-    def write_pdf_with_layout(self, original_path: str, translated_text: str, output_path: str,
-                           layout_info: Dict, target_lang: str = None) -> None:
-        """Write translated text back to PDF while preserving layout and formatting"""
-        reader = PdfReader(original_path)
-        writer = PdfWriter()
-        
-        # Get document structure
-        structure = self.detect_structure(original_path)
-        
-        # Split translated text into segments based on structure
-        segments = self._split_translated_text(translated_text, structure)
-        current_segment = 0
-        
-        # Get language-specific font if available
-        target_font = self.fallback_fonts.get(target_lang, 'Helvetica')
-        
-        for page_num in range(len(reader.pages)):
-            page = reader.pages[page_num]
-            writer.add_page(page)
-            
-            if str(page_num) in layout_info and current_segment < len(segments):
-                packet = BytesIO()
-                c = canvas.Canvas(packet, pagesize=(page.mediabox[2], page.mediabox[3]))
-                
-                page_structure = structure.get(page_num, {})
-                layout_type = page_structure.get('layout_type', 'single_column')
-                
-                # Restore any images first
-                self._restore_images(c, page_num)
-                
-                if layout_type == 'multi_column':
-                    # Handle multi-column layout
-                    columns = page_structure.get('columns', {})
-                    for col_idx, col_elements in columns.items():
-                        if current_segment < len(segments):
-                            self._write_column(c, segments[current_segment], col_elements,
-                                           target_font=target_font)
-                            current_segment += 1
-                else:
-                    # Handle single-column layout with preserved formatting
-                    for element in layout_info[str(page_num)]:
-                        if current_segment < len(segments):
-                            text = segments[current_segment]
-                            bbox = element['bbox']
-                            font_info = element.get('font', {})
-                            
-                            # Scale font size if needed
-                            original_text_width = c.stringWidth(element['text'], font_info.get('name', target_font), font_info.get('size', 12))
-                            translated_text_width = c.stringWidth(text, target_font, font_info.get('size', 12))
-                            scale_factor = min(1.0, original_text_width / (translated_text_width + 0.001))
-                            
-                            # Set font properties with scaling
-                            font_size = font_info.get('size', 12) * scale_factor
-                            c.setFont(target_font, font_size)
-                            
-                            # Position and write text with proper wrapping and alignment
-                            self._write_text_block_with_wrapping(c, text, bbox, target_font, font_size)
-                            current_segment += 1
-                
-                c.save()
-                packet.seek(0)
-                overlay = PdfReader(packet)
-                page.merge_page(overlay.pages[0])
-        
-        # Save the final PDF
-        with open(output_path, 'wb') as output_file:
-            writer.write(output_file)
-
-    def _split_translated_text(self, text: str, structure: Dict) -> List[str]:
-        """Split translated text into segments based on document structure"""
-        segments = []
-        current_text = text
-        
-        for page_num in sorted(structure.keys()):
-            page_structure = structure[page_num]
-            
-            # Split by headers first
-            headers = page_structure.get('headers', [])
-            if headers:
-                for header in headers:
-                    header_length = len(header['text'])
-                    if len(current_text) > header_length:
-                        segments.append(current_text[:header_length])
-                        current_text = current_text[header_length:].strip()
-            
-            # Then split remaining text by columns if present
-            columns = page_structure.get('columns', {})
-            if columns:
-                avg_col_length = len(current_text) // (len(columns) + 1)
-                for _ in range(len(columns)):
-                    if len(current_text) > avg_col_length:
-                        segments.append(current_text[:avg_col_length])
-                        current_text = current_text[avg_col_length:].strip()
-            
-            # Add remaining text as a segment
-            if current_text:
-                segments.append(current_text)
-                current_text = ""
-        
-        return segments
-
-    def _write_column(self, canvas, text: str, column_elements: List[Dict], target_font: str = 'Helvetica') -> None:
-        """Write text in a column format"""
-        if not column_elements:
-            return
-            
-        # Calculate column boundaries
-        left = min(elem['bbox'][0] for elem in column_elements)
-        right = max(elem['bbox'][2] for elem in column_elements)
-        top = max(elem['bbox'][3] for elem in column_elements)
-        bottom = min(elem['bbox'][1] for elem in column_elements)
-        
-        # Set font based on first element
-        font_info = column_elements[0].get('font', {})
-        font_name = font_info.get('name', target_font)
-        font_size = font_info.get('size', 12)
-        canvas.setFont(font_name, font_size)
-        
-        # Write text in column bounds
-        self._write_text_block(canvas, text, (left, bottom, right, top), 'left')
-
-    def _write_text_block(self, canvas, text: str, bbox: tuple, alignment: str = 'left') -> None:
-        """Write a block of text with proper alignment and wrapping"""
-        x, y, right, top = bbox
-        width = right - x
-        height = top - y
-        
-        # Calculate text positioning based on alignment
-        if alignment == 'center':
-            x = x + (width / 2)
-            canvas.drawCentredString(x, y, text)
-        elif alignment == 'right':
-            canvas.drawRightString(right, y, text)
-        else:  # left alignment
-            canvas.drawString(x, y, text)
-
-    def _restore_images(self, canvas, page_num: int) -> None:
-        """Restore images in their original positions"""
-        for img in self.image_elements.get(page_num, []):
-            try:
-                # Convert image stream to reportlab image
-                img_stream = BytesIO(img['stream'].get_data())
-                img_obj = Image(img_stream)
-                
-                # Place image at original position
-                bbox = img['bbox']
-                canvas.drawImage(img_obj, bbox[0], bbox[1],
-                               width=bbox[2]-bbox[0],
-                               height=bbox[3]-bbox[1])
-            except Exception:
-                # Skip problematic images
-                continue
-
-    def _write_text_block_with_wrapping(self, canvas, text: str, bbox: tuple,
-                                     font_name: str, font_size: float) -> None:
-        """Write text with proper wrapping and alignment"""
-        x, y, right, top = bbox
-        width = right - x
-        height = top - y
-        
-        # Create text object for wrapping
-        text_obj = canvas.beginText()
-        text_obj.setFont(font_name, font_size)
-        
-        # Calculate alignment
-        if x < width / 3:  # Left third
-            text_obj.setTextOrigin(x, top)
-            alignment = 'left'
-        elif x > (2 * width) / 3:  # Right third
-            text_obj.setTextOrigin(right, top)
-            alignment = 'right'
-        else:  # Middle third
-            text_obj.setTextOrigin(x + width/2, top)
-            alignment = 'center'
-        
-        # Word wrap logic
-        words = text.split()
-        lines = []
-        current_line = []
-        current_width = 0
-        
-        for word in words:
-            word_width = canvas.stringWidth(word + ' ', font_name, font_size)
-            if current_width + word_width <= width:
-                current_line.append(word)
-                current_width += word_width
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                current_line = [word]
-                current_width = word_width
-        
-        if current_line:
-            lines.append(' '.join(current_line))
-        
-        # Write wrapped text with proper alignment
-        for line in lines:
-            if alignment == 'center':
-                line_width = canvas.stringWidth(line, font_name, font_size)
-                text_obj.setTextOrigin(x + (width - line_width)/2, text_obj.getY() - font_size)
-            elif alignment == 'right':
-                line_width = canvas.stringWidth(line, font_name, font_size)
-                text_obj.setTextOrigin(right - line_width, text_obj.getY() - font_size)
-            text_obj.textLine(line)
-        
-        canvas.drawText(text_obj)
-
-    def _group_elements_into_blocks(self, elements: List[Dict]) -> List[Dict]:
-        """Group text elements into logical blocks based on layout analysis"""
-        blocks = []
-        
-        # Sort elements by vertical position (top to bottom)
-        sorted_elements = sorted(elements, key=lambda x: (-x['y_pos'], x['x_pos']))
-        
-        current_block = {'elements': [], 'text': [], 'y_pos': None}
-        
-        for element in sorted_elements:
-            if current_block['y_pos'] is None:
-                # Start new block
-                current_block['y_pos'] = element['y_pos']
-                
-            # Check if element belongs to current block
-            y_diff = abs(element['y_pos'] - current_block['y_pos'])
-            if y_diff <= 5:  # Elements within 5 units are considered same line
-                current_block['elements'].append(element)
-                current_block['text'].append(element['text'])
-            else:
-                # Start new block
-                if current_block['elements']:
-                    blocks.append({
-                        'elements': current_block['elements'],
-                        'text': ' '.join(current_block['text'])
-                    })
-                current_block = {
-                    'elements': [element],
-                    'text': [element['text']],
-                    'y_pos': element['y_pos']
-                }
-        
-        # Add last block
-        if current_block['elements']:
-            blocks.append({
-                'elements': current_block['elements'],
-                'text': ' '.join(current_block['text'])
-            })
-        
-        return blocks
\ No newline at end of file
+from typing import Callable, Dict, List, Tuple, Optional
+from pathlib import Path
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTTextContainer, LTChar, LTAnno, LTTextLineHorizontal, LTImage, LTFigure
+from collections import defaultdict, deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from itertools import repeat
+import multiprocessing
+import os
+import threading
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
+from io import BytesIO
+from .fonts import register_font
+from .sanitizer import pdf_safe
+from .segmenter import TextSegmenter
+from reportlab.lib.utils import ImageReader as Image
+
+def _analyze_page_range(file_path: str, page_numbers: Optional[List[int]],
+                        include_images: bool = True) -> List[Tuple[int, Dict]]:
+    """Analyze a run of pages; module level so that process pool workers can run it"""
+    handler = PDFHandler()
+    page_layouts = extract_pages(file_path, page_numbers=page_numbers)
+    numbered = zip(page_numbers, page_layouts) if page_numbers is not None else enumerate(page_layouts)
+    return [(page_num, handler._analyze_page(page_layout, include_images)) for page_num, page_layout in numbered]
+
+class PDFHandler:
+    # Layout models shared by every handler, keyed by file identity and page selection
+    MODEL_CACHE_SIZE = 4
+    _model_cache: 'OrderedDict[Tuple, Dict]' = OrderedDict()
+    _model_lock = threading.Lock()
+    # Below this many pages, starting worker processes costs more than it saves
+    PARALLEL_MIN_PAGES = 16
+    # Page ranges handed out per worker, so one slow range does not hold up the rest
+    RANGES_PER_WORKER = 4
+    # Pages translated together; only this many pages' layouts and translations are held at once
+    WRITE_WINDOW_PAGES = 16
+    
+    def __init__(self, workers: Optional[int] = None):
+        """``workers`` sets the processes used for layout analysis (default: CPU count, 1 disables)"""
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.layout_info = defaultdict(list)
+        self.font_info = defaultdict(dict)
+        self.structure_info = defaultdict(dict)
+        self.text_segments = defaultdict(list)
+        self.image_elements = defaultdict(list)
+        self.fallback_fonts = {
+            'hi': 'Nirmala UI',  # Hindi
+            'bn': 'Nirmala UI',  # Bengali
+            'te': 'Nirmala UI',  # Telugu
+            'ta': 'Nirmala UI',  # Tamil
+            'mr': 'Nirmala UI',  # Marathi
+            'gu': 'Nirmala UI',  # Gujarati
+            'kn': 'Nirmala UI',  # Kannada
+            'ml': 'Nirmala UI',  # Malayalam
+            'pa': 'Nirmala UI'   # Punjabi
+        }
+    
+    def analyze_document(self, file_path: str, pages: Optional[List[int]] = None) -> Dict:
+        """Walk the PDF once and build the layout model used for reading and writing.
+        
+        The model holds, per page, the text elements and logical blocks, the
+        detected headers and columns, and any images, plus document-wide font
+        statistics. Models are cached per file, so the reader and the writer
+        share a single pdfminer pass.
+        """
+        key = self._model_key(file_path, pages)
+        with PDFHandler._model_lock:
+            if key in PDFHandler._model_cache:
+                PDFHandler._model_cache.move_to_end(key)
+                return PDFHandler._model_cache[key]
+        
+        page_numbers = sorted(set(pages)) if pages is not None else None
+        model = {'path': file_path, 'pages': dict(self._analyze_pages(file_path, page_numbers))}
+        self._finalize_model(model)
+        
+        with PDFHandler._model_lock:
+            PDFHandler._model_cache[key] = model
+            while len(PDFHandler._model_cache) > PDFHandler.MODEL_CACHE_SIZE:
+                PDFHandler._model_cache.popitem(last=False)
+        return model
+    
+    def get_model(self, file_path: str) -> Dict:
+        """Return the most recent cached model for a file, analyzing it if there is none"""
+        path_key = self._model_key(file_path, None)[:3]
+        with PDFHandler._model_lock:
+            for key in reversed(PDFHandler._model_cache):
+                if key[:3] == path_key:
+                    return PDFHandler._model_cache[key]
+        return self.analyze_document(file_path)
+    
+    def detect_structure(self, file_path: str) -> Dict:
+        """Detect document structure including headers, paragraphs, and columns"""
+        return self.structure_from_model(self.analyze_document(file_path))
+    
+    def extract_text_with_layout(self, file_path: str, pages: Optional[List[int]] = None) -> Tuple[str, Dict]:
+        """Extract text while preserving layout information and ensuring XML compatibility"""
+        model = self.analyze_document(file_path, pages)
+        return model['text'], self.layout_from_model(model)
+    
+    @staticmethod
+    def structure_from_model(model: Dict) -> Dict:
+        return {
+            page_num: {
+                'headers': page['headers'],
+                'columns': page['columns'],
+                'layout_type': page['layout_type']
+            }
+            for page_num, page in model['pages'].items()
+        }
+    
+    @staticmethod
+    def layout_from_model(model: Dict) -> Dict:
+        return {
+            page_num: [element for block in page['blocks'] for element in block['elements']]
+            for page_num, page in model['pages'].items()
+            if page['blocks']
+        }
+    
+    def _analyze_pages(self, file_path: str, page_numbers: Optional[List[int]]) -> List[Tuple[int, Dict]]:
+        """Analyze the selected pages, spreading page ranges over worker processes for large files"""
+        if self.workers > 1:
+            if page_numbers is None:
+                try:
+                    page_numbers = list(range(len(PdfReader(file_path).pages)))
+                except Exception:
+                    # Let pdfminer read files PyPDF2 cannot count
+                    return _analyze_page_range(file_path, None)
+            if len(page_numbers) >= self.PARALLEL_MIN_PAGES:
+                return self._analyze_pages_parallel(file_path, page_numbers)
+        return _analyze_page_range(file_path, page_numbers)
+    
+    def _analyze_pages_parallel(self, file_path: str, page_numbers: List[int]) -> List[Tuple[int, Dict]]:
+        page_ranges = self._page_ranges(page_numbers)
+        # map() yields results in submission order, so pages come back in order
+        with self._process_pool(len(page_ranges)) as executor:
+            results = executor.map(_analyze_page_range, repeat(file_path), page_ranges)
+            return [page for page_range in results for page in page_range]
+    
+    def _iter_page_models(self, file_path: str, page_numbers: List[int]):
+        """Yield (page number, model without images) in order, analyzing ahead in worker processes.
+        
+        Only a few ranges per worker are in flight or waiting to be
+        consumed, so memory stays bounded however long the document is.
+        """
+        if self.workers <= 1 or len(page_numbers) < self.PARALLEL_MIN_PAGES:
+            page_layouts = extract_pages(file_path, page_numbers=page_numbers)
+            for page_num, page_layout in zip(page_numbers, page_layouts):
+                yield page_num, self._analyze_page(page_layout, include_images=False)
+            return
+        
+        page_ranges = iter(self._page_ranges(page_numbers))
+        with self._process_pool(self.workers) as executor:
+            pending = deque()
+            for page_range in page_ranges:
+                pending.append(executor.submit(_analyze_page_range, file_path, page_range, False))
+                if len(pending) >= 2 * self.workers:
+                    break
+            while pending:
+                yield from pending.popleft().result()
+                page_range = next(page_ranges, None)
+                if page_range is not None:
+                    pending.append(executor.submit(_analyze_page_range, file_path, page_range, False))
+    
+    def _page_ranges(self, page_numbers: List[int]) -> List[List[int]]:
+        range_count = min(len(page_numbers), self.workers * self.RANGES_PER_WORKER)
+        size = -(-len(page_numbers) // range_count)
+        return [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+    
+    def _process_pool(self, ranges: int) -> ProcessPoolExecutor:
+        # Spawned, not forked: the caller usually runs translation threads, whose locks a fork would copy
+        return ProcessPoolExecutor(max_workers=min(self.workers, ranges),
+                                   mp_context=multiprocessing.get_context('spawn'))
+    
+    def _analyze_page(self, page_layout, include_images: bool = True) -> Dict:
+        """Collect text elements, images, fonts, blocks, headers and columns of one page"""
+        text_elements = []
+        images = []
+        font_stats = defaultdict(lambda: defaultdict(int))
+        
+        for element in page_layout:
+            if isinstance(element, LTTextContainer):
+                text = pdf_safe(element.get_text())
+                if not text:
+                    continue
+                bbox = element.bbox
+                font_counts = self._count_fonts(element)
+                for font_name, sizes in font_counts.items():
+                    for size, count in sizes.items():
+                        font_stats[font_name][size] += count
+                text_elements.append({
+                    'text': text,
+                    'bbox': bbox,
+                    'font': self._summarize_fonts(font_counts),
+                    'y_pos': round(bbox[1]),
+                    'x_pos': round(bbox[0]),
+                    'width': round(bbox[2] - bbox[0]),
+                    'height': round(bbox[3] - bbox[1])
+                })
+            elif include_images and isinstance(element, (LTImage, LTFigure)):
+                # Images usually sit inside figures; keep the raw bytes for reconstruction
+                for image in self._iter_images(element):
+                    try:
+                        data = image.stream.get_data()
+                    except Exception:
+                        continue
+                    images.append({'bbox': image.bbox, 'data': data, 'name': image.name})
+        
+        blocks = self._group_elements_into_blocks(text_elements)
+        headers, columns = self._detect_headers_and_columns(text_elements)
+        return {
+            'width': page_layout.width,
+            'height': page_layout.height,
+            'blocks': blocks,
+            'text': '\n'.join(block['text'] for block in blocks),
+            'headers': headers,
+            'columns': columns,
+            'layout_type': 'multi_column' if len(columns) > 1 else 'single_column',
+            'images': images,
+            'font_stats': {name: dict(sizes) for name, sizes in font_stats.items()}
+        }
+    
+    @staticmethod
+    def _finalize_model(model: Dict) -> None:
+        """Fill in the document-wide text and font statistics from the pages"""
+        font_stats = defaultdict(lambda: defaultdict(int))
+        for page in model['pages'].values():
+            for font_name, sizes in page['font_stats'].items():
+                for size, count in sizes.items():
+                    font_stats[font_name][size] += count
+        model['font_stats'] = {name: dict(sizes) for name, sizes in font_stats.items()}
+        model['text'] = '\n\n'.join(page['text'] for _, page in sorted(model['pages'].items()))
+    
+    def _detect_headers_and_columns(self, text_elements: List[Dict]) -> Tuple[List[Dict], Dict]:
+        """Find headers by font size/weight and columns by horizontal position"""
+        headers = []
+        columns = defaultdict(list)
+        
+        # Group text elements by their vertical and horizontal positions
+        v_groups = defaultdict(list)
+        h_groups = defaultdict(list)
+        for element in text_elements:
+            v_groups[element['y_pos']].append(element)
+            h_groups[element['x_pos']].append(element)
+        
+        # Detect headers based on font size and position
+        for v_pos in sorted(v_groups.keys(), reverse=True):
+            for element in v_groups[v_pos]:
+                font_size = element['font'].get('size', 0)
+                if font_size > 12 or element['font'].get('is_bold', False):
+                    headers.append(element)
+        
+        # Detect columns based on horizontal grouping
+        sorted_h_pos = sorted(h_groups.keys())
+        if len(sorted_h_pos) > 1:
+            avg_gap = sum(sorted_h_pos[i+1] - sorted_h_pos[i] 
+                        for i in range(len(sorted_h_pos)-1)) / (len(sorted_h_pos)-1)
+            
+            current_column = 0
+            prev_pos = sorted_h_pos[0]
+            
+            for h_pos in sorted_h_pos[1:]:
+                if h_pos - prev_pos > avg_gap * 1.5:  # New column detected
+                    current_column += 1
+                columns[current_column].extend(h_groups[h_pos])
+                prev_pos = h_pos
+        
+        return headers, dict(columns)
+    
+    @staticmethod
+    def _iter_images(element):
+        if isinstance(element, LTImage):
+            yield element
+        elif isinstance(element, LTFigure):
+            for child in element:
+                yield from PDFHandler._iter_images(child)
+    
+    @staticmethod
+    def _model_key(file_path: str, pages: Optional[List[int]]) -> Tuple:
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        return (str(path), stat.st_mtime_ns, stat.st_size,
+                tuple(sorted(set(pages))) if pages is not None else None)
+    
+    def _extract_font_info(self, text_container) -> Dict:
+        """Extract detailed font information from text elements"""
+        return self._summarize_fonts(self._count_fonts(text_container))
+    
+    def _count_fonts(self, text_container) -> Dict:
+        """Count characters per font name and rounded size"""
+        font_info = defaultdict(lambda: defaultdict(int))
+        
+        for text_line in text_container:
+            if isinstance(text_line, LTTextLineHorizontal):
+                for char in text_line:
+                    if isinstance(char, LTChar):
+                        font_name = char.fontname
+                        font_size = round(char.size)
+                        font_info[font_name][font_size] += 1
+        return font_info
+    
+    @staticmethod
+    def _summarize_fonts(font_info: Dict) -> Dict:
+        if not font_info:
+            return {}
+        
+        # Find most common font and size
+        most_common_font = max(font_info.items(), key=lambda x: sum(x[1].values()))[0]
+        most_common_size = max(font_info[most_common_font].items(), key=lambda x: x[1])[0]
+        
+        return {
+            'name': most_common_font,
+            'size': most_common_size,
+            'is_bold': 'Bold' in most_common_font,
+            'is_italic': 'Italic' in most_common_font
+        }
+    
+    def write_pdf_with_layout(self, original_path: str, translated_text: str, output_path: str,
+                           layout_info: Dict, target_lang: str = None, model: Optional[Dict] = None) -> None:
+        """Write translated text back to PDF while preserving layout and formatting"""
+        reader = PdfReader(original_path)
+        writer = PdfWriter()
+        
+        # Reuse the layout model built while reading instead of parsing the PDF again
+        model = model or self.get_model(original_path)
+        structure = self.structure_from_model(model)
+        
+        # Split translated text into segments based on structure
+        segments = self._split_translated_text(translated_text, structure)
+        current_segment = 0
+        
+        # Get language-specific font if available
+        target_font = self._overlay_font(target_lang)
+        
+        for page_num in range(len(reader.pages)):
+            page = reader.pages[page_num]
+            
+            # Layout keys are page numbers, or their string form after a JSON round trip
+            page_layout = layout_info.get(page_num, layout_info.get(str(page_num)))
+            if page_layout and current_segment < len(segments):
+                packet = BytesIO()
+                c = canvas.Canvas(packet, pagesize=(page.mediabox[2], page.mediabox[3]))
+                
+                page_structure = structure.get(page_num, {})
+                layout_type = page_structure.get('layout_type', 'single_column')
+                
+                # Restore any images first
+                self._restore_images(c, model['pages'].get(page_num, {}).get('images', []))
+                
+                if layout_type == 'multi_column':
+                    # Handle multi-column layout
+                    columns = page_structure.get('columns', {})
+                    for col_idx, col_elements in columns.items():
+                        if current_segment < len(segments):
+                            self._write_column(c, segments[current_segment], col_elements,
+                                           target_font=target_font)
+                            current_segment += 1
+                else:
+                    # Handle single-column layout with preserved formatting
+                    for element in page_layout:
+                        if current_segment < len(segments):
+                            text = segments[current_segment]
+                            bbox = element['bbox']
+                            font_info = element.get('font', {})
+                            
+                            # Scale font size if needed
+                            original_text_width = c.stringWidth(element['text'], font_info.get('name', target_font), font_info.get('size', 12))
+                            translated_text_width = c.stringWidth(text, target_font, font_info.get('size', 12))
+                            scale_factor = min(1.0, original_text_width / (translated_text_width + 0.001))
+                            
+                            # Set font properties with scaling
+                            font_size = font_info.get('size', 12) * scale_factor
+                            c.setFont(target_font, font_size)
+                            
+                            # Position and write text with proper wrapping and alignment
+                            self._write_text_block_with_wrapping(c, text, bbox, target_font, font_size)
+                            current_segment += 1
+                
+                c.save()
+                packet.seek(0)
+                overlay = PdfReader(packet)
+                page.merge_page(overlay.pages[0])
+            
+            # The writer copies the page, so add it only once the overlay is merged
+            writer.add_page(page)
+        
+        # Save the final PDF
+        with open(output_path, 'wb') as output_file:
+            writer.write(output_file)
+
+    def translate_pdf_streaming(self, input_path: str, output_path: str,
+                                translate_batch: Callable[[List[str]], List[str]],
+                                target_lang: str = None, pages: Optional[List[int]] = None,
+                                on_page: Optional[Callable[[int, List[str], List[str]], None]] = None,
+                                segmenter: Optional[TextSegmenter] = None) -> int:
+        """Translate a PDF a window of pages at a time, over its own layout.
+        
+        Each text element is translated with ``translate_batch`` and drawn
+        back over its own bounding box. Pages outside ``pages`` are copied
+        unchanged. ``on_page`` receives each page's source and translated
+        texts. Returns the number of pages translated.
+        """
+        page_callback = None
+        if on_page:
+            page_callback = lambda page_num, _, sources, translations: on_page(page_num, sources, translations)
+        return self.translate_pdf_to_targets(input_path, {target_lang: (output_path, translate_batch)},
+                                             pages=pages, on_page=page_callback, segmenter=segmenter)
+    
+    def translate_pdf_to_targets(self, input_path: str,
+                                 targets: Dict[str, Tuple[str, Callable[[List[str]], List[str]]]],
+                                 pages: Optional[List[int]] = None,
+                                 on_page: Optional[Callable[[int, str, List[str], List[str]], None]] = None,
+                                 failed: Optional[Dict[str, Exception]] = None,
+                                 segmenter: Optional[TextSegmenter] = None) -> int:
+        """Translate a PDF into several languages from a single layout analysis.
+        
+        ``targets`` maps each target language to its output path and
+        ``translate_batch``. Every page is analyzed once. The texts of a
+        whole window of pages go to each ``translate_batch`` in one call,
+        for all targets concurrently, so their requests can run together;
+        they are then drawn onto each target's own copy of the pages, so
+        adding a language does not add parsing.
+        ``on_page`` receives the page number, target language, and the
+        page's source and translated texts. Returns the number of pages
+        translated per target.
+        
+        With a ``segmenter``, elements are split into its chunks before
+        translation and joined again after, so no request outgrows it.
+        With ``failed`` given, a target whose translation or writing raises
+        is recorded there and dropped, and the others carry on; without it,
+        the first error is raised.
+        
+        Pages are translated in windows of ``WRITE_WINDOW_PAGES``. Each
+        target has one writer for the whole document, so resources the
+        original pages share are stored once. Overlays are merged into the
+        writer's copies and compressed at once, which keeps the source pages
+        untouched and leaves only compressed content in memory. PyPDF2
+        cannot append to a file, so those are held until the output is
+        written at the end.
+        """
+        outputs = [(target_lang, output_path, translate_batch, self._overlay_font(target_lang))
+                   for target_lang, (output_path, translate_batch) in targets.items()]
+        reader = PdfReader(input_path)
+        page_count = len(reader.pages)
+        selected = sorted(set(pages)) if pages is not None else list(range(page_count))
+        translated_pages = 0
+        
+        # Pages are analyzed ahead in worker processes for long documents
+        with closing(self._iter_page_models(input_path, selected)) as page_models, \
+                ThreadPoolExecutor(max_workers=len(outputs)) as executor:
+            # pdfminer may yield fewer pages than PyPDF2 counts; those without a model are copied unchanged
+            next_model = next(page_models, None)
+            writers = [PdfWriter() for _ in outputs]
+            active = list(range(len(outputs)))
+            
+            def fail(index: int, error: Exception) -> None:
+                if failed is None:
+                    raise error
+                failed[outputs[index][0]] = error
+                active.remove(index)
+            
+            def translate(index: int):
+                try:
+                    translations = outputs[index][2](chunks) if chunks else []
+                except Exception as e:
+                    return e
+                if segmented is None:
+                    return translations
+                joined, offset = [], 0
+                for text in segmented:
+                    joined.append(text.join(translations[offset:offset + len(text)]))
+                    offset += len(text)
+                return joined
+            
+            for start in range(0, page_count, self.WRITE_WINDOW_PAGES):
+                if not active:
+                    break
+                window_pages = range(start, min(start + self.WRITE_WINDOW_PAGES, page_count))
+                page_elements: Dict[int, List[Dict]] = {}
+                while next_model is not None and next_model[0] < window_pages.stop:
+                    page_num, page_model = next_model
+                    page_elements[page_num] = [element for block in page_model['blocks']
+                                               for element in block['elements']]
+                    next_model = next(page_models, None)
+                sources = [' '.join(element['text'].split())
+                           for elements in page_elements.values() for element in elements]
+                chunks, segmented = sources, None
+                if segmenter:
+                    segmented = [segmenter.segment(source) for source in sources]
+                    chunks = [chunk for text in segmented for chunk in text.chunks]
+                translated_pages += len(page_elements)
+                
+                for index, translations in zip(list(active), list(executor.map(translate, list(active)))):
+                    target_lang, _, _, font_name = outputs[index]
+                    try:
+                        if isinstance(translations, Exception):
+                            raise translations
+                        self._add_window(reader, writers[index], window_pages, page_elements, sources,
+                                         translations, target_lang, font_name, on_page)
+                    except Exception as e:
+                        fail(index, e)
+            
+            for index in list(active):
+                try:
+                    with open(outputs[index][1], 'wb') as output_file:
+                        writers[index].write(output_file)
+                except Exception as e:
+                    fail(index, e)
+        return translated_pages
+    
+    def _add_window(self, reader: PdfReader, writer: PdfWriter, window_pages: range,
+                    page_elements: Dict[int, List[Dict]], sources: List[str], translations: List[str],
+                    target_lang: str, font_name: str,
+                    on_page: Optional[Callable[[int, str, List[str], List[str]], None]]) -> None:
+        """Add a window of pages to one target's writer, with its translations drawn over them"""
+        offset = 0
+        for page_num in window_pages:
+            page = reader.pages[page_num]
+            elements = page_elements.get(page_num)
+            if elements is not None:
+                page_sources = sources[offset:offset + len(elements)]
+                page_translations = translations[offset:offset + len(elements)]
+                offset += len(elements)
+                if elements:
+                    # Drawn on a copy, so the reader every target shares keeps its pages as they were
+                    page = self._overlay_page(page, elements, page_translations, font_name)
+                    page.compress_content_streams()
+                if on_page:
+                    on_page(page_num, target_lang, page_sources, page_translations)
+            writer.add_page(page)
+    
+    def _overlay_page(self, page: PageObject, elements: List[Dict], translations: List[str],
+                      font_name: str) -> PageObject:
+        """Return a copy of ``page`` with the translations drawn over their elements"""
+        overlaid = PageObject(page.pdf, page.indirect_reference)
+        overlaid.update(page)
+        packet = BytesIO()
+        c = canvas.Canvas(packet, pagesize=(page.mediabox.width, page.mediabox.height))
+        for element, text in zip(elements, translations):
+            self._overlay_element(c, element, text, font_name)
+        c.save()
+        packet.seek(0)
+        overlaid.merge_page(PdfReader(packet).pages[0])
+        return overlaid
+    
+    def _overlay_font(self, target_lang: Optional[str]) -> str:
+        font_name = self.fallback_fonts.get(target_lang)
+        if font_name in pdfmetrics.getRegisteredFontNames():
+            return font_name
+        return register_font(target_lang)
+    
+    def _overlay_element(self, canvas, element: Dict, text: str, font_name: str) -> None:
+        """Cover an element's original text and draw its translation in the same box"""
+        x, y, right, top = element['bbox']
+        width, height = right - x, top - y
+        font_size = element.get('font', {}).get('size', 12)
+        
+        # Shrink the font until the wrapped translation fits the lines the original used
+        capacity = width * max(1, round(height / font_size))
+        needed = canvas.stringWidth(text, font_name, font_size)
+        if needed > capacity:
+            font_size *= capacity / needed
+        
+        canvas.setFillColorRGB(1, 1, 1)
+        canvas.rect(x, y, width, height, stroke=0, fill=1)
+        canvas.setFillColorRGB(0, 0, 0)
+        self._write_text_block_with_wrapping(canvas, text, element['bbox'], font_name, font_size)
+    
+    def _split_translated_text(self, text: str, structure: Dict) -> List[str]:
+        """Split translated text into segments based on document structure"""
+        segments = []
+        current_text = text
+        
+        for page_num in sorted(structure.keys()):
+            page_structure = structure[page_num]
+            
+            # Split by headers first
+            headers = page_structure.get('headers', [])
+            if headers:
+                for header in headers:
+                    header_length = len(header['text'])
+                    if len(current_text) > header_length:
+                        segments.append(current_text[:header_length])
+                        current_text = current_text[header_length:].strip()
+            
+            # Then split remaining text by columns if present
+            columns = page_structure.get('columns', {})
+            if columns:
+                avg_col_length = len(current_text) // (len(columns) + 1)
+                for _ in range(len(columns)):
+                    if len(current_text) > avg_col_length:
+                        segments.append(current_text[:avg_col_length])
+                        current_text = current_text[avg_col_length:].strip()
+            
+            # Add remaining text as a segment
+            if current_text:
+                segments.append(current_text)
+                current_text = ""
+        
+        return segments
+
+    def _write_column(self, canvas, text: str, column_elements: List[Dict], target_font: str = 'Helvetica') -> None:
+        """Write text in a column format"""
+        if not column_elements:
+            return
+            
+        # Calculate column boundaries
+        left = min(elem['bbox'][0] for elem in column_elements)
+        right = max(elem['bbox'][2] for elem in column_elements)
+        top = max(elem['bbox'][3] for elem in column_elements)
+        bottom = min(elem['bbox'][1] for elem in column_elements)
+        
+        # Set font based on first element
+        font_info = column_elements[0].get('font', {})
+        font_name = font_info.get('name', target_font)
+        font_size = font_info.get('size', 12)
+        canvas.setFont(font_name, font_size)
+        
+        # Write text in column bounds
+        self._write_text_block(canvas, text, (left, bottom, right, top), 'left')
+
+    def _write_text_block(self, canvas, text: str, bbox: tuple, alignment: str = 'left') -> None:
+        """Write a block of text with proper alignment and wrapping"""
+        x, y, right, top = bbox
+        width = right - x
+        height = top - y
+        
+        # Calculate text positioning based on alignment
+        if alignment == 'center':
+            x = x + (width / 2)
+            canvas.drawCentredString(x, y, text)
+        elif alignment == 'right':
+            canvas.drawRightString(right, y, text)
+        else:  # left alignment
+            canvas.drawString(x, y, text)
+
+    def _restore_images(self, canvas, images: List[Dict]) -> None:
+        """Restore images in their original positions"""
+        for img in images:
+            try:
+                # Convert image data to reportlab image
+                img_stream = BytesIO(img['data'])
+                img_obj = Image(img_stream)
+                
+                # Place image at original position
+                bbox = img['bbox']
+                canvas.drawImage(img_obj, bbox[0], bbox[1],
+                               width=bbox[2]-bbox[0],
+                               height=bbox[3]-bbox[1])
+            except Exception:
+                # Skip problematic images
+                continue
+
+    def _write_text_block_with_wrapping(self, canvas, text: str, bbox: tuple,
+                                     font_name: str, font_size: float) -> None:
+        """Write text with proper wrapping and alignment"""
+        x, y, right, top = bbox
+        width = right - x
+        height = top - y
+        
+        # Create text object for wrapping
+        text_obj = canvas.beginText()
+        text_obj.setFont(font_name, font_size)
+        
+        # Calculate alignment; the first baseline sits one line below the top of the box
+        baseline = top - font_size
+        if x < width / 3:  # Left third
+            text_obj.setTextOrigin(x, baseline)
+            alignment = 'left'
+        elif x > (2 * width) / 3:  # Right third
+            text_obj.setTextOrigin(right, baseline)
+            alignment = 'right'
+        else:  # Middle third
+            text_obj.setTextOrigin(x + width/2, baseline)
+            alignment = 'center'
+        
+        # Word wrap logic
+        words = text.split()
+        lines = []
+        current_line = []
+        current_width = 0
+        
+        for word in words:
+            word_width = canvas.stringWidth(word + ' ', font_name, font_size)
+            if current_width + word_width <= width:
+                current_line.append(word)
+                current_width += word_width
+            else:
+                if current_line:
+                    lines.append(' '.join(current_line))
+                current_line = [word]
+                current_width = word_width
+        
+        if current_line:
+            lines.append(' '.join(current_line))
+        
+        # Write wrapped text with proper alignment
+        for line in lines:
+            if alignment == 'center':
+                line_width = canvas.stringWidth(line, font_name, font_size)
+                text_obj.setTextOrigin(x + (width - line_width)/2, text_obj.getY())
+            elif alignment == 'right':
+                line_width = canvas.stringWidth(line, font_name, font_size)
+                text_obj.setTextOrigin(right - line_width, text_obj.getY())
+            text_obj.textLine(line)
+        
+        canvas.drawText(text_obj)
+
+    def _group_elements_into_blocks(self, elements: List[Dict]) -> List[Dict]:
+        """Group text elements into logical blocks based on layout analysis"""
+        blocks = []
+        
+        # Sort elements by vertical position (top to bottom)
+        sorted_elements = sorted(elements, key=lambda x: (-x['y_pos'], x['x_pos']))
+        
+        current_block = {'elements': [], 'text': [], 'y_pos': None}
+        
+        for element in sorted_elements:
+            if current_block['y_pos'] is None:
+                # Start new block
+                current_block['y_pos'] = element['y_pos']
+                
+            # Check if element belongs to current block
+            y_diff = abs(element['y_pos'] - current_block['y_pos'])
+            if y_diff <= 5:  # Elements within 5 units are considered same line
+                current_block['elements'].append(element)
+                current_block['text'].append(element['text'])
+            else:
+                # Start new block
+                if current_block['elements']:
+                    blocks.append({
+                        'elements': current_block['elements'],
+                        'text': ' '.join(current_block['text'])
+                    })
+                current_block = {
+                    'elements': [element],
+                    'text': [element['text']],
+                    'y_pos': element['y_pos']
+                }
+        
+        # Add last block
+        if current_block['elements']:
+            blocks.append({
+                'elements': current_block['elements'],
+                'text': ' '.join(current_block['text'])
+            })
+        
+        return blocks
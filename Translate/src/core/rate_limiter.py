@@ -0,0 +1,219 @@
+from typing import Awaitable, Callable, List, Optional, TypeVar
+import asyncio
+import random
+import threading
+import time
+from deep_translator.exceptions import TooManyRequests, TranslationNotFound
+from .translator import TranslationEngine
+
+T = TypeVar('T')
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend that keeps failing"""
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate adapts to what the backend accepts.
+    
+    Every success raises the rate additively and every throttling response
+    cuts it multiplicatively (AIMD), so throughput settles just below the
+    highest rate the backend tolerates. One instance is meant to be shared by
+    all threads and event loops that talk to the same backend.
+    """
+    
+    def __init__(self,
+                 rate: float = 5.0,
+                 min_rate: float = 0.5,
+                 max_rate: float = 50.0,
+                 burst: float = 5.0,
+                 increase: float = 0.1,
+                 decrease_factor: float = 0.5):
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("Rates must satisfy 0 < min_rate <= rate <= max_rate")
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Take one token, returning how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+    
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+    
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+    
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            # Drop any saved-up burst so the slowdown takes effect immediately
+            self._tokens = min(self._tokens, 0.0)
+
+class CircuitBreaker:
+    """Stop calling a backend after repeated failures, then probe it again later.
+    
+    Once ``reset_timeout`` has passed, a single caller is let through as the
+    probe and everyone else is still turned away until its outcome closes
+    or reopens the circuit. A probe that never reports back is replaced
+    after another ``reset_timeout``.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+    
+    def check(self) -> None:
+        """Raise CircuitOpenError unless this call may go to the backend"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Translation backend is unavailable; retry later")
+                self.state = self.HALF_OPEN
+            elif now - self._probe_started < self.reset_timeout:
+                raise CircuitOpenError("Translation backend is being probed; retry later")
+            # This call is the probe
+            self._probe_started = now
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self.state = self.CLOSED
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+class RateLimitedEngine(TranslationEngine):
+    """Wrap any TranslationEngine with rate limiting, retries and a circuit breaker.
+    
+    Failed requests are retried with exponential backoff and full jitter.
+    Throttling responses also slow the shared limiter down. Batches are handed
+    to the engine with a ``request`` hook, so every backend request it makes,
+    fallbacks included, costs one token and is retried on its own.
+    """
+    
+    def __init__(self,
+                 engine: TranslationEngine,
+                 limiter: Optional[AdaptiveRateLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 max_retries: int = 5,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0,
+                 on_retry: Optional[Callable[[int, int, float, Exception], None]] = None):
+        self.engine = engine
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_retry = on_retry
+        self.max_request_chars = getattr(engine, 'max_request_chars', None)
+    
+    def translate(self, text: str, target_lang: str) -> str:
+        return self._call(lambda: self.engine.translate(text, target_lang))
+    
+    async def translate_async(self, text: str, target_lang: str) -> str:
+        return await self._call_async(lambda: self.engine.translate_async(text, target_lang))
+    
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        request: Optional[Callable[[str, str], str]] = None) -> List[str]:
+        return self.engine.translate_batch(texts, target_lang, request=request or self.translate)
+    
+    async def translate_batch_async(self, texts: List[str], target_lang: str,
+                                    request: Optional[Callable[[str, str], Awaitable[str]]] = None) -> List[str]:
+        return await self.engine.translate_batch_async(texts, target_lang,
+                                                       request=request or self.translate_async)
+    
+    def _call(self, call: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            self.breaker.check()
+            self.limiter.acquire()
+            try:
+                result = call()
+            except Exception as e:
+                delay = self._handle_failure(e, attempt)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._handle_success()
+            return result
+    
+    async def _call_async(self, call: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            self.breaker.check()
+            await self.limiter.acquire_async()
+            try:
+                result = await call()
+            except Exception as e:
+                delay = self._handle_failure(e, attempt)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._handle_success()
+            return result
+    
+    def _handle_success(self) -> None:
+        self.limiter.on_success()
+        self.breaker.record_success()
+    
+    def _handle_failure(self, error: Exception, attempt: int) -> float:
+        """Record a failed attempt and return the backoff delay, or re-raise if final"""
+        if isinstance(error, (TranslationNotFound, ValueError)):
+            # The backend answered, so it is up; retrying the same text will not help
+            self.breaker.record_success()
+            raise error
+        if self._is_throttle(error):
+            self.limiter.on_throttle()
+        self.breaker.record_failure()
+        if attempt + 1 >= self.max_retries:
+            raise error
+        
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if self.on_retry:
+            self.on_retry(attempt + 2, self.max_retries, delay, error)
+        return delay
+    
+    @staticmethod
+    def _is_throttle(error: Exception) -> bool:
+        if isinstance(error, TooManyRequests):
+            return True
+        response = getattr(error, 'response', None)
+        return getattr(response, 'status_code', None) in (429, 503)
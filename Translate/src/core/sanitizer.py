@@ -0,0 +1,86 @@
+"""Control-character cleanup shared by the readers, the PDF analysis and the engines.
+
+Two profiles cover every call site:
+
+* ``xml_safe`` removes what XML 1.0 cannot hold (C0 controls other than
+  tab, line feed and carriage return, lone surrogates, U+FFFE/U+FFFF)
+  and DEL, which has no place in translated prose either.
+* ``pdf_safe`` also collapses every run of whitespace into one space,
+  for text pulled out of PDF layout boxes.
+
+Both run in C through one precompiled pattern; text without anything to
+remove is returned as is, without a copy.
+
+Run ``python -m core.sanitizer`` from ``src`` to compare them with the
+per-character loops they replace.
+"""
+from typing import Callable, Dict
+import re
+import time
+
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\ud800-\udfff\ufffe\uffff]')
+
+def xml_safe(text: str) -> str:
+    """Remove the characters XML cannot hold, keeping tabs and line breaks"""
+    if not text:
+        return ""
+    return _XML_INVALID.sub('', text)
+
+def pdf_safe(text: str) -> str:
+    """XML-safe text on one line, with whitespace runs collapsed to single spaces"""
+    if not text:
+        return ""
+    return _XML_INVALID.sub('', ' '.join(text.split()))
+
+PROFILES: Dict[str, Callable[[str], str]] = {
+    'xml': xml_safe,
+    'pdf': pdf_safe
+}
+
+def sanitize(text: str, profile: str = 'xml') -> str:
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown sanitizer profile: {profile}")
+    return PROFILES[profile](text)
+
+def benchmark(size: int = 4_000_000, repeat: int = 3) -> None:
+    """Time both profiles against the generator loops they replaced"""
+    sample = 'Plain text, देवनागरी पाठ,\ttabs and\x0b a stray control \x00character.\n'
+    text = sample * (size // len(sample))
+    
+    def legacy_document(text: str) -> str:
+        return ''.join(char for char in text if char in '\n\t' or (ord(char) >= 32 and ord(char) != 127))
+    
+    def legacy_engine(text: str) -> str:
+        return ''.join(char for char in text if ord(char) >= 32 or char in '\n\r\t')
+    
+    def legacy_pdf(text: str) -> str:
+        text = ' '.join(text.split())
+        return ''.join(
+            char for char in text
+            if char in ' \n\t\r'
+            or (ord(char) >= 32 and ord(char) <= 55295)
+            or (ord(char) >= 57344 and ord(char) <= 65533)
+            or (ord(char) >= 65536 and ord(char) <= 1114111)
+        )
+    
+    def best(function: Callable[[str], str], text: str) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function(text)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+    
+    clean = xml_safe(text)
+    print(f"{len(text) / 1e6:.1f}M characters, best of {repeat}")
+    for name, legacy, current, data in (
+        ('document reader', legacy_document, xml_safe, text),
+        ('engine', legacy_engine, xml_safe, text),
+        ('pdf text', legacy_pdf, pdf_safe, text),
+        ('already clean', legacy_document, xml_safe, clean)
+    ):
+        old, new = best(legacy, data), best(current, data)
+        print(f"{name:16} loop {old:.3f}s  sanitizer {new:.4f}s  {old / new:.0f}x faster")
+
+if __name__ == '__main__':
+    benchmark()
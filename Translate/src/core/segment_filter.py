@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional
+import re
+import threading
+from .language_detector import LanguageDetector
+from .translator import pack_requests
+
+class SegmentFilter:
+    """Decide which segments can skip translation and count what that saves.
+    
+    A segment passes through unchanged when it has nothing to translate
+    (numbers, URLs, e-mail addresses, paths, code, part numbers and the
+    like) or is already in the target language. Indic targets are checked
+    by script, which is certain except between Hindi and Marathi: those
+    share Devanagari, so a segment passes only when marker words decide it
+    or it is long enough for langdetect. Other targets are checked by
+    langdetect, only for segments long enough for it to be reliable, and
+    only for languages it can report. Anything in doubt is translated.
+    """
+    
+    # Fewer letters than this and langdetect is guessing
+    MIN_DETECT_LETTERS = 20
+    
+    # Tokens that are never translated: URLs, e-mail addresses, paths, numbers with units,
+    # versions, identifiers (snake_case, camelCase, dotted.names) and part numbers
+    _NON_TRANSLATABLE = re.compile(r'''
+        (?<!\w)(?:
+          (?:[a-z][a-z0-9+.-]*://|www\.)\S+
+        | [\w.+-]+@[\w-]+(?:\.[\w-]+)+
+        | (?:[A-Za-z]:)?[\\/](?:[\w.-]+[\\/])*[\w.-]*
+        | [\w.-]+\.(?:pdf|docx?|txt|rtf|odt|xlsx?|csv|json|xml|html?|py|js|exe|zip|png|jpe?g)
+        | [v#]?\d[\d.,:/x×%-]*[a-zA-Z]{0,3}
+        | [A-Za-z]*_\w*
+        | [a-z]+[A-Z]\w*
+        | [A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+(?:\(\))?
+        | [A-Za-z]*\d[\w-]*
+        )(?!\w)
+    ''', re.VERBOSE)
+    _SYMBOLS = re.compile(r'[^\w\s]+')
+    # Signs of a line of code; prose may show one of them, code shows at least two
+    _CODE_SIGNS = (
+        re.compile(r'[;{}]\s*$|^\s*[{}]'),
+        re.compile(r'\w\s*(?:==|!=|<=|>=|=>|->|:=|\+=|-=|=)\s*[\w"\'(\[{-]'),
+        re.compile(r'\w\([^()]*\)'),
+        re.compile(r'^\s*(?:def|class|return|import|from|if|for|while|var|let|const|function|'
+                   r'public|private|#include|#define|SELECT|INSERT|UPDATE)\b')
+    )
+    
+    def __init__(self, language_detector: Optional[LanguageDetector] = None):
+        self.language_detector = language_detector or LanguageDetector()
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.segments = 0
+            self.passed: Dict[str, int] = {'no_text': 0, 'code': 0, 'target_language': 0}
+            self.characters_saved = 0
+            self.requests_saved = 0
+    
+    def classify(self, text: str, target_lang: str) -> Optional[str]:
+        """Why ``text`` needs no translation ('no_text', 'code' or 'target_language'), or None"""
+        remainder = self._SYMBOLS.sub(' ', self._NON_TRANSLATABLE.sub(' ', text))
+        if not any(char.isalpha() for char in remainder):
+            return 'no_text'
+        if sum(1 for sign in self._CODE_SIGNS if sign.search(text)) >= 2:
+            return 'code'
+        if self._in_target_language(text, target_lang):
+            return 'target_language'
+        return None
+    
+    def split(self, texts: List[str], target_lang: str, max_request_chars: int) -> List[str]:
+        """Return the texts that still need translating, recording those that pass through.
+        
+        ``texts`` are distinct stripped segments; the requests saved are the
+        difference between packing all of them and packing the rest.
+        """
+        kept = []
+        passed: Dict[str, int] = {}
+        for text in texts:
+            reason = self.classify(text, target_lang)
+            if reason:
+                passed[reason] = passed.get(reason, 0) + 1
+            else:
+                kept.append(text)
+        
+        saved_chars = sum(len(text) for text in texts) - sum(len(text) for text in kept)
+        saved_requests = 0
+        if passed:
+            saved_requests = len(pack_requests(texts, max_request_chars)) - len(pack_requests(kept, max_request_chars))
+        with self._lock:
+            self.segments += len(texts)
+            for reason, count in passed.items():
+                self.passed[reason] += count
+            self.characters_saved += saved_chars
+            self.requests_saved += saved_requests
+        return kept
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'segments': self.segments,
+                'passed': sum(self.passed.values()),
+                **self.passed,
+                'characters_saved': self.characters_saved,
+                'requests_saved': self.requests_saved
+            }
+    
+    def _in_target_language(self, text: str, target_lang: str) -> bool:
+        detector = self.language_detector
+        script = detector.detect_script(text)
+        letters = sum(char.isalpha() for char in text)
+        if script is not None or target_lang in detector.SCRIPT_LANGUAGES:
+            # An Indic script decides, both for Indic targets and against Latin ones
+            if script in ('hi', 'mr') and script == target_lang:
+                # Short Devanagari without marker words was only guessed at by langdetect
+                return detector.marker_language(text) == script or letters >= self.MIN_DETECT_LETTERS
+            return script == target_lang
+        if target_lang not in detector.supported_languages:
+            # langdetect only ever reports supported languages, so it cannot match this one
+            return False
+        return letters >= self.MIN_DETECT_LETTERS and detector.detect_language(text) == target_lang
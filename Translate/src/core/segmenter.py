@@ -0,0 +1,149 @@
+from typing import Callable, List
+import re
+
+class SegmentedText:
+    """Text split into translatable chunks and the exact whitespace between them.
+    
+    ``separators`` always holds one more entry than ``chunks`` so that
+    ``separators[0] + chunks[0] + separators[1] + ... + separators[-1]``
+    reproduces the original text.
+    """
+    
+    def __init__(self, chunks: List[str], separators: List[str]):
+        if len(separators) != len(chunks) + 1:
+            raise ValueError("SegmentedText needs exactly one more separator than chunks")
+        self.chunks = chunks
+        self.separators = separators
+    
+    def __len__(self) -> int:
+        return len(self.chunks)
+    
+    def join(self, translated_chunks: List[str]) -> str:
+        """Rebuild the document from translated chunks, keeping the original layout"""
+        if len(translated_chunks) != len(self.chunks):
+            raise ValueError(
+                f"Expected {len(self.chunks)} translated chunks, got {len(translated_chunks)}"
+            )
+        parts = [self.separators[0]]
+        for chunk, separator in zip(translated_chunks, self.separators[1:]):
+            parts.append(chunk)
+            parts.append(separator)
+        return ''.join(parts)
+
+class TextSegmenter:
+    """Split document text at paragraph and sentence boundaries into bounded chunks.
+    
+    Every line break is treated as a paragraph boundary, since that is how
+    DocumentHandler joins DOCX/ODT paragraphs and PDF blocks. Paragraphs longer
+    than ``max_chars`` are packed sentence by sentence, and sentences that are
+    still too long are cut at the last whitespace before the limit.
+    """
+    
+    # Google's web endpoint rejects requests above 5000 characters
+    DEFAULT_MAX_CHARS = 4500
+    
+    _PARAGRAPH_BREAK = re.compile(r'\s*\n\s*')
+    # Latin, Devanagari danda/double danda and CJK sentence terminators
+    _SENTENCE_BREAK = re.compile(r'(?<=[.!?।॥。])\s+')
+    
+    def __init__(self, max_chars: int = DEFAULT_MAX_CHARS):
+        if max_chars <= 0:
+            raise ValueError("max_chars must be positive")
+        self.max_chars = max_chars
+    
+    def segment(self, text: str) -> SegmentedText:
+        chunks: List[str] = []
+        separators: List[str] = []
+        pending = ''
+        position = 0
+        
+        for match in self._PARAGRAPH_BREAK.finditer(text):
+            paragraph = text[position:match.start()]
+            pending = self._add_paragraph(paragraph, pending, chunks, separators)
+            pending += match.group()
+            position = match.end()
+        
+        pending = self._add_paragraph(text[position:], pending, chunks, separators)
+        separators.append(pending)
+        return SegmentedText(chunks, separators)
+    
+    def translate(self, text: str, translate_fn: Callable[[str], str]) -> str:
+        """Translate ``text`` chunk by chunk with ``translate_fn`` and reassemble it"""
+        segmented = self.segment(text)
+        return segmented.join([translate_fn(chunk) for chunk in segmented.chunks])
+    
+    def _add_paragraph(self, paragraph: str, pending: str,
+                       chunks: List[str], separators: List[str]) -> str:
+        """Append the chunks of one paragraph and return the separator still pending"""
+        stripped = paragraph.strip()
+        if not stripped:
+            return pending + paragraph
+        
+        start = paragraph.index(stripped[0])
+        pending += paragraph[:start]
+        trailing = paragraph[start + len(stripped):]
+        
+        for chunk, gap in self._split_paragraph(stripped):
+            separators.append(pending)
+            chunks.append(chunk)
+            pending = gap
+        
+        return pending + trailing
+    
+    def _split_paragraph(self, paragraph: str) -> List[tuple]:
+        """Return (chunk, following whitespace) pairs for a stripped paragraph"""
+        if len(paragraph) <= self.max_chars:
+            return [(paragraph, '')]
+        
+        pieces = []
+        current = ''
+        position = 0
+        for match in self._SENTENCE_BREAK.finditer(paragraph):
+            sentence = paragraph[position:match.start()]
+            current = self._pack(current, sentence, match.group(), pieces)
+            position = match.end()
+        current = self._pack(current, paragraph[position:], '', pieces)
+        if current:
+            pieces.append((current, ''))
+        return pieces
+    
+    def _pack(self, current: str, sentence: str, gap: str, pieces: List[tuple]) -> str:
+        """Add a sentence to the chunk being built, flushing it when it would overflow"""
+        if current and len(current) + len(sentence) > self.max_chars:
+            text, trailing = self._rstrip_gap(current)
+            pieces.append((text, trailing))
+            current = ''
+        
+        if len(sentence) > self.max_chars:
+            for piece, piece_gap in self._hard_split(sentence):
+                pieces.append((piece, piece_gap))
+            text, _ = pieces.pop()
+            current = text
+        
+        else:
+            current += sentence
+        
+        return current + gap
+    
+    def _hard_split(self, sentence: str) -> List[tuple]:
+        """Cut an over-long sentence at whitespace, or mid-word when there is none"""
+        pieces = []
+        while len(sentence) > self.max_chars:
+            window = sentence[:self.max_chars + 1]
+            cut = max(window.rfind(' '), window.rfind('\t'))
+            if cut <= 0:
+                pieces.append((sentence[:self.max_chars], ''))
+                sentence = sentence[self.max_chars:]
+                continue
+            head = sentence[:cut].rstrip()
+            rest = sentence[cut:]
+            body = rest.lstrip()
+            pieces.append((head, sentence[len(head):cut] + rest[:len(rest) - len(body)]))
+            sentence = body
+        pieces.append((sentence, ''))
+        return pieces
+    
+    @staticmethod
+    def _rstrip_gap(chunk: str) -> tuple:
+        text = chunk.rstrip()
+        return text, chunk[len(text):]
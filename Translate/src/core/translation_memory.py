@@ -0,0 +1,526 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+from difflib import SequenceMatcher
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import tracemalloc
+import unicodedata
+import weakref
+import zlib
+
+class FuzzyMatch:
+    """A stored translation of a source text similar to the one looked up"""
+    
+    def __init__(self, source: str, translation: str, score: float):
+        self.source = source
+        self.translation = translation
+        # Similarity of the normalized texts, from 0 to 1 (1 is identical)
+        self.score = score
+    
+    def __repr__(self) -> str:
+        return f"FuzzyMatch(score={self.score:.3f}, source={self.source!r})"
+
+class TranslationMemory:
+    """Persistent translation memory backed by SQLite.
+    
+    Entries are keyed by a hash of the normalized source text, the engine name
+    and the target language. The table is capped at ``max_entries`` rows and
+    the least recently used rows are evicted first. A small in-process LRU
+    (the hot tier) answers repeated lookups without touching the database;
+    such hits do not refresh the row's recency, so LRU order is approximate.
+    
+    Keys are 16-byte digests, and nothing per entry is kept in Python
+    beyond the hot tier. ``memory_budget`` bounds the bytes held in
+    process: the hot tier gets ``HOT_SHARE`` of it and SQLite the rest, as
+    its page cache or, for an in-memory database, the database itself,
+    which is spilled to a temporary file once it outgrows that share.
+    
+    With ``fuzzy`` set, the normalized source of every entry is also
+    stored, in a side table keyed by digest, and indexed by MinHash
+    locality-sensitive hashing over character trigrams, so ``get_fuzzy``
+    finds the most similar earlier source in a few indexed queries however
+    large the memory is. Without it, no source is stored at all. Only
+    entries stored while the index was on are found this way; a file may
+    be shared by memories with and without it.
+    """
+    
+    _WHITESPACE = re.compile(r'[ \t]+')
+    
+    # Bytes of the SHA-256 digest kept as the key; 128 bits keep collisions out of reach
+    KEY_BYTES = 16
+    # Schema 2 stores keys as digest blobs instead of 64-character hex strings;
+    # schema 3 keeps sources out of the entries, in fuzzy_sources
+    SCHEMA_VERSION = 3
+    # Share of memory_budget the hot tier may take
+    HOT_SHARE = 0.25
+    # What an OrderedDict entry costs beyond its key and value objects
+    _HOT_OVERHEAD = 104
+    
+    # MinHash signature of BANDS * ROWS values; two texts share a bucket when one band matches,
+    # which happens almost always above 0.8 trigram overlap and rarely below 0.4
+    BANDS = 8
+    ROWS = 4
+    SHINGLE = 3
+    # Candidates scored exactly per lookup, those sharing the most buckets first
+    MAX_CANDIDATES = 16
+    
+    def __init__(self, path: str = ':memory:', max_entries: int = 500_000,
+                 hot_entries: int = 10_000, fuzzy: bool = False,
+                 memory_budget: Optional[int] = None):
+        if max_entries <= 0 or hot_entries < 0:
+            raise ValueError("max_entries must be positive and hot_entries non-negative")
+        if memory_budget is not None and memory_budget < 1 << 20:
+            raise ValueError("memory_budget must be at least 1 MiB")
+        self.path = path
+        self.max_entries = max_entries
+        self.hot_entries = hot_entries
+        self.fuzzy = fuzzy
+        self.memory_budget = memory_budget
+        self.spilled = False
+        self._spill_cleanup: Optional[weakref.finalize] = None
+        self._hot: 'OrderedDict[bytes, str]' = OrderedDict()
+        self._hot_bytes = 0
+        self._lock = threading.RLock()
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._configure()
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key BLOB PRIMARY KEY,'
+            ' translation TEXT NOT NULL,'
+            ' last_used INTEGER NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)')
+        # Created even without fuzzy lookups, since memories with and without them may share the file
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS fuzzy_sources ('
+            ' key BLOB PRIMARY KEY,'
+            ' source TEXT NOT NULL) WITHOUT ROWID'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS fuzzy_buckets ('
+            ' bucket INTEGER NOT NULL,'
+            ' key BLOB NOT NULL,'
+            ' PRIMARY KEY (bucket, key)) WITHOUT ROWID'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS fuzzy_buckets_key ON fuzzy_buckets(key)')
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < self.SCHEMA_VERSION:
+            if version < 2:
+                self._migrate_keys()
+            self._migrate_sources()
+            self._conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        self._conn.commit()
+        
+        row = self._conn.execute('SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM entries').fetchone()
+        self._count, self._clock = row
+    
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        return cls._WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+    
+    @classmethod
+    def make_key(cls, text: str, engine: str, target_lang: str) -> bytes:
+        normalized = cls.normalize(text)
+        digest = hashlib.sha256()
+        for part in (engine, target_lang, normalized):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.digest()[:cls.KEY_BYTES]
+    
+    def get(self, text: str, engine: str, target_lang: str) -> Optional[str]:
+        return self.get_many([text], engine, target_lang)[0]
+    
+    def get_many(self, texts: List[str], engine: str, target_lang: str) -> List[Optional[str]]:
+        """Look up several texts at once; misses come back as None"""
+        keys = [self.make_key(text, engine, target_lang) for text in texts]
+        results: List[Optional[str]] = [None] * len(keys)
+        cold: Dict[bytes, List[int]] = {}
+        
+        with self._lock:
+            for index, key in enumerate(keys):
+                if key in self._hot:
+                    self._hot.move_to_end(key)
+                    results[index] = self._hot[key]
+                else:
+                    cold.setdefault(key, []).append(index)
+            
+            if not cold:
+                return results
+            
+            found = self._fetch(list(cold))
+            if found:
+                self._clock += 1
+                self._conn.executemany(
+                    'UPDATE entries SET last_used = ? WHERE key = ?',
+                    [(self._clock, key) for key in found]
+                )
+                self._conn.commit()
+            
+            for key, translation in found.items():
+                self._remember(key, translation)
+                for index in cold[key]:
+                    results[index] = translation
+        
+        return results
+    
+    def put(self, text: str, engine: str, target_lang: str, translation: str) -> None:
+        self.put_many([(text, translation)], engine, target_lang)
+    
+    def put_many(self, pairs: Iterable[Tuple[str, str]], engine: str, target_lang: str) -> None:
+        """Store (source, translation) pairs and evict old entries past the size cap"""
+        rows = {self.make_key(text, engine, target_lang): (text, translation) for text, translation in pairs}
+        if not rows:
+            return
+        
+        with self._lock:
+            self._clock += 1
+            known = len(self._fetch(list(rows)))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO entries (key, translation, last_used) VALUES (?, ?, ?)',
+                [(key, translation, self._clock) for key, (_, translation) in rows.items()]
+            )
+            if self.fuzzy:
+                # A key's source never changes, so a source and buckets already stored stay valid
+                sources = {key: self.normalize(text) for key, (text, _) in rows.items()}
+                self._conn.executemany('INSERT OR IGNORE INTO fuzzy_sources (key, source) VALUES (?, ?)',
+                                       sources.items())
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO fuzzy_buckets (bucket, key) VALUES (?, ?)',
+                    [(bucket, key) for key, source in sources.items()
+                     for bucket in self._buckets(source, engine, target_lang)]
+                )
+            self._count += len(rows) - known
+            
+            for key, (_, translation) in rows.items():
+                self._remember(key, translation)
+            
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+            if self.memory_budget is not None and not self.spilled and self.path == ':memory:':
+                page_size, page_count = (self._conn.execute(f'PRAGMA {name}').fetchone()[0]
+                                         for name in ('page_size', 'page_count'))
+                if page_size * page_count > self._database_budget():
+                    self._spill()
+    
+    def get_fuzzy(self, text: str, engine: str, target_lang: str,
+                  threshold: float = 0.75) -> Optional[FuzzyMatch]:
+        return self.get_fuzzy_many([text], engine, target_lang, threshold)[0]
+    
+    def get_fuzzy_many(self, texts: List[str], engine: str, target_lang: str,
+                       threshold: float = 0.75) -> List[Optional[FuzzyMatch]]:
+        """Find the most similar stored source for each text, if one scores at least ``threshold``.
+        
+        The score is difflib's similarity ratio of the normalized, casefolded
+        texts, so callers can accept high scores outright and send the rest
+        for review. Needs a memory opened with ``fuzzy`` set.
+        """
+        if not self.fuzzy:
+            raise RuntimeError("Fuzzy lookups need a TranslationMemory opened with fuzzy=True")
+        results: List[Optional[FuzzyMatch]] = []
+        with self._lock:
+            for text in texts:
+                normalized = self.normalize(text)
+                results.append(self._best_match(normalized, engine, target_lang, threshold) if normalized else None)
+        return results
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._hot.clear()
+            self._hot_bytes = 0
+            for table in ('fuzzy_buckets', 'fuzzy_sources', 'entries'):
+                self._conn.execute(f'DELETE FROM {table}')
+            self._conn.commit()
+            self._count = 0
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+            if self._spill_cleanup is not None:
+                self._spill_cleanup()
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes held in process by the hot tier and by SQLite, and the entries stored"""
+        with self._lock:
+            page_size, page_count = (self._conn.execute(f'PRAGMA {name}').fetchone()[0]
+                                     for name in ('page_size', 'page_count'))
+            if self.path == ':memory:':
+                database = page_size * page_count
+            else:
+                cache = self._conn.execute('PRAGMA cache_size').fetchone()[0]
+                cache_bytes = -cache * 1024 if cache < 0 else cache * page_size
+                database = min(page_size * page_count, cache_bytes)
+            return {
+                'entries': self._count,
+                'hot_entries': len(self._hot),
+                'hot_bytes': self._hot_bytes,
+                'database_bytes': database,
+                'spilled': self.spilled
+            }
+    
+    def _configure(self) -> None:
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        if self.memory_budget is not None:
+            # A negative cache size is in KiB
+            self._conn.execute(f'PRAGMA cache_size = -{max(1, self._database_budget() // 1024)}')
+    
+    def _database_budget(self) -> int:
+        return int(self.memory_budget * (1 - self.HOT_SHARE))
+    
+    def _migrate_keys(self) -> None:
+        """Shorten the hex keys of schema 1 to the digest prefix they encode"""
+        self._conn.create_function('digest_key', 1, lambda key: bytes.fromhex(key)[:self.KEY_BYTES],
+                                   deterministic=True)
+        tables = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in ('entries', 'fuzzy_buckets'):
+            if table in tables:
+                self._conn.execute(f"UPDATE {table} SET key = digest_key(key) WHERE typeof(key) = 'text'")
+    
+    def _migrate_sources(self) -> None:
+        """Move the sources earlier schemas kept in the entries to fuzzy_sources, for indexed entries only"""
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(entries)')]
+        if 'source' not in columns:
+            return
+        self._conn.execute(
+            'INSERT OR IGNORE INTO fuzzy_sources (key, source) SELECT key, source FROM entries'
+            ' WHERE source IS NOT NULL AND key IN (SELECT key FROM fuzzy_buckets)'
+        )
+        self._conn.execute('ALTER TABLE entries DROP COLUMN source')
+    
+    def _spill(self) -> None:
+        """Move an in-memory database that outgrew its budget to a temporary file"""
+        handle, path = tempfile.mkstemp(prefix='translation_memory_', suffix='.db')
+        os.close(handle)
+        disk = sqlite3.connect(path, check_same_thread=False)
+        self._conn.backup(disk)
+        self._conn.close()
+        self._conn = disk
+        self.path = path
+        self.spilled = True
+        self._configure()
+        # The file belongs to this memory: removed when it is closed or collected, or at exit
+        self._spill_cleanup = weakref.finalize(self, _remove_database, disk, path)
+    
+    def _fetch(self, keys: List[bytes]) -> Dict[bytes, str]:
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(self._conn.execute(
+                f'SELECT key, translation FROM entries WHERE key IN ({placeholders})', chunk
+            ).fetchall())
+        return found
+    
+    def _remember(self, key: bytes, translation: str) -> None:
+        if not self.hot_entries:
+            return
+        previous = self._hot.get(key)
+        if previous is not None:
+            self._hot_bytes -= self._hot_size(key, previous)
+        self._hot[key] = translation
+        self._hot.move_to_end(key)
+        self._hot_bytes += self._hot_size(key, translation)
+        hot_budget = None if self.memory_budget is None else self.memory_budget * self.HOT_SHARE
+        while len(self._hot) > self.hot_entries or (hot_budget is not None and self._hot_bytes > hot_budget):
+            self._hot_bytes -= self._hot_size(*self._hot.popitem(last=False))
+    
+    def _hot_size(self, key: bytes, translation: str) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(translation) + self._HOT_OVERHEAD
+    
+    def _evict(self) -> None:
+        # Evict a little past the cap so eviction does not run on every insert
+        excess = self._count - self.max_entries + max(1, self.max_entries // 20)
+        evicted = [row[0] for row in self._conn.execute(
+            'SELECT key FROM entries ORDER BY last_used LIMIT ?', (excess,)
+        )]
+        for table in ('entries', 'fuzzy_sources', 'fuzzy_buckets'):
+            self._conn.executemany(f'DELETE FROM {table} WHERE key = ?', [(key,) for key in evicted])
+        for key in evicted:
+            translation = self._hot.pop(key, None)
+            if translation is not None:
+                self._hot_bytes -= self._hot_size(key, translation)
+        self._count -= len(evicted)
+    
+    def _best_match(self, normalized: str, engine: str, target_lang: str,
+                    threshold: float) -> Optional[FuzzyMatch]:
+        buckets = self._buckets(normalized, engine, target_lang)
+        placeholders = ','.join('?' * len(buckets))
+        candidates = [row[0] for row in self._conn.execute(
+            f'SELECT key FROM fuzzy_buckets WHERE bucket IN ({placeholders})'
+            f' GROUP BY key ORDER BY COUNT(*) DESC LIMIT ?', (*buckets, self.MAX_CANDIDATES)
+        )]
+        if not candidates:
+            return None
+        
+        placeholders = ','.join('?' * len(candidates))
+        rows = self._conn.execute(
+            f'SELECT s.source, e.translation FROM fuzzy_sources s JOIN entries e ON e.key = s.key'
+            f' WHERE s.key IN ({placeholders})',
+            candidates
+        ).fetchall()
+        query = normalized.casefold()
+        matcher = SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(query)
+        best = None
+        for source, translation in rows:
+            matcher.set_seq1(source.casefold())
+            # The cheap upper bounds rule most candidates out before the real ratio
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                continue
+            score = matcher.ratio()
+            if score >= threshold and (best is None or score > best.score):
+                best = FuzzyMatch(source, translation, score)
+        return best
+    
+    @classmethod
+    def _buckets(cls, normalized: str, engine: str, target_lang: str) -> List[int]:
+        """LSH buckets of a text: one per band of its MinHash signature, scoped to engine and target"""
+        signature = cls._signature(normalized.casefold())
+        scope = f'{engine}\0{target_lang}\0'.encode('utf-8')
+        band_format = f'<B{cls.ROWS}I'
+        return [
+            int.from_bytes(hashlib.blake2b(
+                scope + struct.pack(band_format, band, *signature[band * cls.ROWS:(band + 1) * cls.ROWS]),
+                digest_size=8
+            ).digest(), 'little', signed=True)
+            for band in range(cls.BANDS)
+        ]
+    
+    @classmethod
+    def _signature(cls, text: str) -> List[int]:
+        """One-permutation MinHash: each trigram hash lands in one bin, which keeps its minimum.
+        
+        A single hash per distinct trigram keeps signing linear in the text
+        length; bins left empty by short texts borrow from the next filled bin.
+        """
+        size = cls.BANDS * cls.ROWS
+        empty = 0xFFFFFFFF
+        signature = [empty] * size
+        # UTF-32 gives every character the same width, so trigrams are fixed-size byte slices
+        data = text.encode('utf-32-le')
+        width = 4 * cls.SHINGLE
+        hashes = {zlib.crc32(data[start:start + width]) for start in range(0, max(4, len(data) - width + 4), 4)}
+        for value in hashes:
+            slot, rank = value % size, value // size
+            if rank < signature[slot]:
+                signature[slot] = rank
+        filled = [slot for slot in range(size) if signature[slot] != empty]
+        if not filled:
+            return signature
+        for slot in range(size):
+            if signature[slot] == empty:
+                source = next((other for other in filled if other > slot), filled[0])
+                signature[slot] = (signature[source] + (source - slot) % size * 0x9E3779B1) & 0xFFFFFFFF
+        return signature
+
+
+def _remove_database(conn: sqlite3.Connection, path: str) -> None:
+    conn.close()
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(path + suffix)
+        except OSError:
+            pass
+
+def benchmark(entries: int = 100_000, target_lang: str = 'hi') -> None:
+    """Compare bytes per entry with a nested ``{source: {target: translation}}`` dict.
+    
+    Run ``python -m core.translation_memory`` from ``src``. Python objects
+    are measured with tracemalloc and SQLite by its page count, which
+    tracemalloc does not see. At the default 100,000 entries it reports
+    about 581 bytes/entry for the nested dict, 407 for hex keys and 297
+    for digest keys, of which the translation itself takes 222;
+    ``tests/test_translation_memory.py`` holds the per-entry overhead
+    under 100 bytes.
+    """
+    rng = random.Random(0)
+    latin = 'abcdefghijklmnopqrstuvwxyz      '
+    devanagari = ''.join(chr(code) for code in range(0x0915, 0x0939)) + '      '
+    
+    def pairs():
+        for index in range(entries):
+            source = f'{index} ' + ''.join(rng.choice(latin) for _ in range(70))
+            yield source, ''.join(rng.choice(devanagari) for _ in range(80))
+    
+    def traced(build):
+        rng.seed(0)
+        tracemalloc.start()
+        kept = build()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return kept, used
+    
+    def nested():
+        memory: Dict[str, Dict[str, str]] = {}
+        for source, translation in pairs():
+            memory.setdefault(source, {})[target_lang] = translation
+        return memory
+    
+    def hex_keys():
+        # Schema 1: 64-character hex keys, stored once in the table and again in its key index
+        conn = sqlite3.connect(':memory:')
+        conn.execute('CREATE TABLE entries (key TEXT PRIMARY KEY, translation TEXT NOT NULL,'
+                     ' last_used INTEGER NOT NULL)')
+        conn.execute('CREATE INDEX entries_last_used ON entries(last_used)')
+        conn.executemany('INSERT INTO entries VALUES (?, ?, 1)', (
+            (hashlib.sha256(source.encode('utf-8')).hexdigest(), translation)
+            for source, translation in pairs()
+        ))
+        return conn
+    
+    def compact(budget=None):
+        memory = TranslationMemory(max_entries=entries, hot_entries=0, memory_budget=budget)
+        batch = []
+        for pair in pairs():
+            batch.append(pair)
+            if len(batch) == 1000:
+                memory.put_many(batch, 'google', target_lang)
+                batch = []
+        memory.put_many(batch, 'google', target_lang)
+        return memory
+    
+    def pages(conn: sqlite3.Connection) -> int:
+        return conn.execute('PRAGMA page_size').fetchone()[0] * conn.execute('PRAGMA page_count').fetchone()[0]
+    
+    print(f"{entries} entries, 70-character sources, 80-character {target_lang} translations")
+    memory, used = traced(nested)
+    print(f"nested dict          {used / entries:7.0f} bytes/entry")
+    del memory
+    conn, used = traced(hex_keys)
+    print(f"SQLite, hex keys     {(used + pages(conn)) / entries:7.0f} bytes/entry")
+    conn.close()
+    memory, used = traced(compact)
+    print(f"SQLite, digest keys  {(used + memory.memory_usage()['database_bytes']) / entries:7.0f} bytes/entry")
+    memory.close()
+    
+    hot = OrderedDict()
+    for index, (source, translation) in enumerate(pairs()):
+        if index == 10_000:
+            break
+        hot[TranslationMemory.make_key(source, 'google', target_lang)] = translation
+    hex_hot = sum(sys.getsizeof(hashlib.sha256(key).hexdigest()) for key in hot)
+    print(f"hot tier keys        {hex_hot / len(hot):7.0f} -> {sum(map(sys.getsizeof, hot)) / len(hot):.0f} bytes/entry")
+    
+    budget = 8 << 20
+    memory = compact(budget)
+    usage = memory.memory_usage()
+    print(f"budget {budget >> 20} MiB: spilled={usage['spilled']}, in process "
+          f"{(usage['hot_bytes'] + usage['database_bytes']) / (1 << 20):.1f} MiB")
+    memory.close()
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,50 +1,417 @@
-from abc import ABC, abstractmethod
-from typing import Dict, Optional
-from deep_translator import GoogleTranslator
-
-class TranslationEngine(ABC):
-    @abstractmethod
-    def translate(self, text: str, target_lang: str) -> str:
-        pass
-
-class GoogleTranslationEngine(TranslationEngine):
-    def translate(self, text: str, target_lang: str) -> str:
-        # Sanitize input text to ensure XML compatibility
-        sanitized_text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\r\t')
-        
-        translator = GoogleTranslator(source='auto', target=target_lang)
-        result = translator.translate(sanitized_text)
-        
-        # Ensure output is also XML compatible
-        return ''.join(char for char in result if ord(char) >= 32 or char in '\n\r\t')
-
-class TranslationManager:
-    def __init__(self):
-        self.engines: Dict[str, TranslationEngine] = {
-            'google': GoogleTranslationEngine()
-        }
-        self.current_engine = 'google'
-        self.translation_memory: Dict[str, Dict[str, str]] = {}
-    
-    def set_engine(self, engine_name: str) -> None:
-        if engine_name not in self.engines:
-            raise ValueError(f"Unknown translation engine: {engine_name}")
-        self.current_engine = engine_name
-    
-    def translate(self, text: str, target_lang: str) -> str:
-        # Check translation memory first
-        if text in self.translation_memory and target_lang in self.translation_memory[text]:
-            return self.translation_memory[text][target_lang]
-        
-        # Perform translation
-        result = self.engines[self.current_engine].translate(text, target_lang)
-        
-        # Store in translation memory
-        if text not in self.translation_memory:
-            self.translation_memory[text] = {}
-        self.translation_memory[text][target_lang] = result
-        
-        return result
-    
-    def get_available_engines(self) -> list[str]:
-        return list(self.engines.keys())
\ No newline at end of file
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import Future
+import asyncio
+import re
+import threading
+from .http_client import ClientCache, get_default_client_cache
+from .sanitizer import xml_safe
+from .segmenter import TextSegmenter
+from .translation_memory import FuzzyMatch, TranslationMemory
+
+def pack_requests(texts: List[str], max_chars: int, overhead: int = 10) -> List[List[str]]:
+    """Group texts, in order, so each group fits in one backend request.
+    
+    ``overhead`` leaves room for the markers an engine adds per segment when
+    packing a batch; a text longer than ``max_chars`` gets a group of its own.
+    """
+    groups = []
+    current: List[str] = []
+    size = 0
+    for text in texts:
+        cost = len(text) + overhead
+        if current and size + cost > max_chars:
+            groups.append(current)
+            current = []
+            size = 0
+        current.append(text)
+        size += cost
+    if current:
+        groups.append(current)
+    return groups
+
+class TranslationEngine(ABC):
+    @abstractmethod
+    def translate(self, text: str, target_lang: str) -> str:
+        pass
+
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        request: Optional[Callable[[str, str], str]] = None) -> List[str]:
+        """Translate several segments, returning results in the same order.
+        
+        Engines without a native batch mode fall back to one call per segment.
+        Every backend request goes through ``request`` (default: ``translate``),
+        so a wrapper can rate limit and retry each one on its own.
+        """
+        request = request or self.translate
+        return [request(text, target_lang) if text.strip() else text for text in texts]
+    
+    async def translate_async(self, text: str, target_lang: str) -> str:
+        """Async form of translate; engines with a native async client should override this"""
+        return await asyncio.to_thread(self.translate, text, target_lang)
+    
+    async def translate_batch_async(self, texts: List[str], target_lang: str,
+                                    request: Optional[Callable[[str, str], Awaitable[str]]] = None) -> List[str]:
+        """Async form of translate_batch, awaiting ``request`` for every backend request.
+        
+        Without ``request``, blocking engines run in the default executor.
+        """
+        if request is None:
+            return await asyncio.to_thread(self.translate_batch, texts, target_lang)
+        return [await request(text, target_lang) if text.strip() else text for text in texts]
+
+class GoogleTranslationEngine(TranslationEngine):
+    # Stay below the 5000 character limit of the web endpoint
+    max_request_chars = 4500
+    
+    # Numbered markers on their own line come back from the backend untouched
+    _BATCH_MARKER = '[[{}]]'
+    _BATCH_MARKER_PATTERN = re.compile(r'\s*\[\[\s*(\d+)\s*\]\]\s*')
+    
+    def __init__(self, client_cache: Optional[ClientCache] = None):
+        # Clients and their pooled HTTP connections are shared process-wide by default
+        self.clients = client_cache or get_default_client_cache()
+    
+    def translate(self, text: str, target_lang: str) -> str:
+        # Sanitize input text to ensure XML compatibility
+        translator = self.clients.get('auto', target_lang)
+        result = translator.translate(xml_safe(text))
+        
+        # Ensure output is also XML compatible
+        return xml_safe(result)
+    
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        request: Optional[Callable[[str, str], str]] = None) -> List[str]:
+        """Pack segments into as few requests as the size limit allows"""
+        request = request or self.translate
+        results = list(texts)
+        for group in self._pack_requests(self._pending(texts)):
+            cores = [core for _, core in group]
+            if len(cores) == 1:
+                translations = [request(cores[0], target_lang)]
+            else:
+                translations = self._unpack(request(self._pack(cores), target_lang), len(cores))
+                if translations is None:
+                    # Markers were mangled; translate this group one segment at a time
+                    translations = [request(core, target_lang) for core in cores]
+            self._place(texts, results, group, translations)
+        return results
+    
+    async def translate_batch_async(self, texts: List[str], target_lang: str,
+                                    request: Optional[Callable[[str, str], Awaitable[str]]] = None) -> List[str]:
+        if request is None:
+            return await asyncio.to_thread(self.translate_batch, texts, target_lang)
+        results = list(texts)
+        for group in self._pack_requests(self._pending(texts)):
+            cores = [core for _, core in group]
+            if len(cores) == 1:
+                translations = [await request(cores[0], target_lang)]
+            else:
+                translations = self._unpack(await request(self._pack(cores), target_lang), len(cores))
+                if translations is None:
+                    translations = [await request(core, target_lang) for core in cores]
+            self._place(texts, results, group, translations)
+        return results
+    
+    @staticmethod
+    def _pending(texts: List[str]) -> List[Tuple[int, str]]:
+        """Return (position, stripped text) of every segment with something to translate"""
+        return [(index, text.strip()) for index, text in enumerate(texts) if text.strip()]
+    
+    @staticmethod
+    def _place(texts: List[str], results: List[str], group: List[Tuple[int, str]],
+               translations: List[str]) -> None:
+        """Put each translation back between its segment's original surrounding whitespace"""
+        for (index, core), translation in zip(group, translations):
+            text = texts[index]
+            start = text.index(core)
+            results[index] = text[:start] + translation.strip() + text[start + len(core):]
+    
+    def _pack_requests(self, pending: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """Group segments so each joined request stays within max_request_chars"""
+        groups = []
+        current = []
+        current_size = 0
+        for index, core in pending:
+            size = len(core) + len(self._BATCH_MARKER.format(len(current))) + 2
+            if current and current_size + size > self.max_request_chars:
+                groups.append(current)
+                current = []
+                current_size = 0
+            current.append((index, core))
+            current_size += size
+        if current:
+            groups.append(current)
+        return groups
+    
+    def _pack(self, segments: List[str]) -> str:
+        """Join segments into one request, each under its numbered marker"""
+        return '\n'.join(
+            f"{self._BATCH_MARKER.format(number)}\n{segment}"
+            for number, segment in enumerate(segments)
+        )
+    
+    def _unpack(self, translated: str, expected: int) -> Optional[List[str]]:
+        pieces = self._BATCH_MARKER_PATTERN.split(translated)
+        # split() yields [before, number, text, number, text, ...]
+        if pieces[0].strip() or len(pieces) != 2 * expected + 1:
+            return None
+        numbers = [int(number) for number in pieces[1::2]]
+        if numbers != list(range(expected)):
+            return None
+        return pieces[2::2]
+
+class BatchRequest:
+    """Segments of one translate_batch call, split into memory hits and misses"""
+    
+    def __init__(self, texts: List[str], target_lang: str, engine: str):
+        self.texts = texts
+        self.target_lang = target_lang
+        self.engine = engine
+        self.cores = [text.strip() for text in texts]
+        self.results = list(self.cores)
+        # Unique stripped texts still to translate, mapped to their positions
+        self.missing: Dict[str, List[int]] = {}
+        # Results other callers are waiting for, one per text in ``missing``
+        self.owned: Dict[str, Future] = {}
+        # Texts another call is already translating: its future and their positions here
+        self.shared: Dict[str, Tuple[Future, List[int]]] = {}
+        # Texts answered by a fuzzy memory match instead of the engine
+        self.fuzzy: Dict[str, FuzzyMatch] = {}
+
+class TranslationManager:
+    def __init__(self,
+                 max_segment_chars: int = TextSegmenter.DEFAULT_MAX_CHARS,
+                 memory_path: Optional[str] = None,
+                 memory_max_entries: int = 500_000,
+                 requests_per_second: float = 5.0,
+                 filter_segments: bool = True,
+                 fuzzy_threshold: Optional[float] = None,
+                 fuzzy_accept: Optional[float] = None,
+                 memory_budget: Optional[int] = None):
+        """``fuzzy_threshold`` turns on fuzzy memory matching: ``suggest`` returns
+        earlier translations of sources at least that similar (0 to 1).
+        With ``fuzzy_accept`` set, segments whose best match scores at least
+        that much reuse its translation instead of calling the engine.
+        ``memory_budget`` caps the bytes the translation memory keeps in process.
+        """
+        from .rate_limiter import AdaptiveRateLimiter, RateLimitedEngine
+        from .segment_filter import SegmentFilter
+        
+        # Every engine gets rate limiting, backoff and a circuit breaker
+        self.engines: Dict[str, TranslationEngine] = {
+            'google': RateLimitedEngine(
+                GoogleTranslationEngine(),
+                AdaptiveRateLimiter(rate=requests_per_second)
+            )
+        }
+        self.current_engine = 'google'
+        # Without a path the memory lives in an in-process SQLite database
+        for score in (fuzzy_threshold, fuzzy_accept):
+            if score is not None and not 0 < score <= 1:
+                raise ValueError("Fuzzy scores must be between 0 and 1")
+        if fuzzy_threshold is None:
+            fuzzy_threshold = fuzzy_accept
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_accept = fuzzy_accept
+        self.fuzzy_accepted = 0
+        self.translation_memory = TranslationMemory(memory_path or ':memory:', memory_max_entries,
+                                                    fuzzy=fuzzy_threshold is not None,
+                                                    memory_budget=memory_budget)
+        self.segmenter = TextSegmenter(max_segment_chars)
+        # Segments with nothing to translate, or already in the target language, pass through
+        self.segment_filter = SegmentFilter() if filter_segments else None
+        # One engine call per (engine, target, text) at a time; concurrent callers share its result
+        self._in_flight: Dict[Tuple[str, str, str], Future] = {}
+        self._flight_lock = threading.Lock()
+        self.coalesced = 0
+    
+    def set_engine(self, engine_name: str) -> None:
+        if engine_name not in self.engines:
+            raise ValueError(f"Unknown translation engine: {engine_name}")
+        self.current_engine = engine_name
+    
+    def translate(self, text: str, target_lang: str) -> str:
+        return self.translate_batch([text], target_lang)[0]
+    
+    def translate_batch(self, texts: List[str], target_lang: str) -> List[str]:
+        """Translate many segments, sending only unique memory misses to the engine.
+        
+        The memory is keyed on the stripped text, so surrounding whitespace is
+        re-attached to each result rather than stored with it.
+        """
+        request = self.prepare_batch(texts, target_lang)
+        try:
+            translations = []
+            if request.missing:
+                translations = self.engines[request.engine].translate_batch(list(request.missing), target_lang)
+            return self.complete_batch(request, translations)
+        except BaseException as error:
+            self.abandon_batch(request, error)
+            raise
+    
+    def iter_translate_batch(self, texts: List[str], target_lang: str) -> Iterator[Tuple[List[str], List[str]]]:
+        """Translate ``texts`` one request-sized group at a time, yielding (group, translations).
+        
+        Callers that report progress or honour cancellation do so between
+        groups, so neither waits for more than a single request.
+        """
+        for group in pack_requests(texts, self.max_request_chars(self.current_engine)):
+            yield group, self.translate_batch(group, target_lang)
+    
+    def max_request_chars(self, engine_name: str) -> int:
+        return getattr(self.engines[engine_name], 'max_request_chars', None) or self.segmenter.max_chars
+    
+    def prepare_batch(self, texts: List[str], target_lang: str) -> BatchRequest:
+        """Resolve what the translation memory already knows for a batch.
+        
+        Segments the filter passes through keep their source text and are
+        neither stored in the memory nor sent to the engine, and so are
+        those answered by a fuzzy match scoring at least ``fuzzy_accept``
+        (recorded in ``request.fuzzy``). Segments that
+        another call is translating right now are left to that call and
+        moved to ``request.shared``; the rest stay in ``request.missing``,
+        and the caller must finish them with ``complete_batch`` or, on
+        failure, ``abandon_batch``, since other callers may be waiting.
+        """
+        request = BatchRequest(texts, target_lang, self.current_engine)
+        cached_results = self.translation_memory.get_many(request.cores, request.engine, target_lang)
+        for index, (core, cached) in enumerate(zip(request.cores, cached_results)):
+            if cached is not None:
+                request.results[index] = cached
+            elif core:
+                request.missing.setdefault(core, []).append(index)
+        
+        if self.segment_filter and request.missing:
+            kept = self.segment_filter.split(list(request.missing), target_lang,
+                                             self.max_request_chars(request.engine))
+            request.missing = {core: request.missing[core] for core in kept}
+        if self.fuzzy_accept is not None and request.missing:
+            self._accept_fuzzy(request)
+        if request.missing:
+            self._claim(request)
+        return request
+    
+    def complete_batch(self, request: BatchRequest, translations: List[str]) -> List[str]:
+        """Store engine results for ``request.missing`` (in order) and assemble the batch.
+        
+        Blocks until the segments shared with other calls are translated.
+        """
+        self._store(request, translations)
+        return self._assemble(request)
+    
+    async def complete_batch_async(self, request: BatchRequest, translations: List[str]) -> List[str]:
+        """Like ``complete_batch``, but stores and waits for shared segments without blocking the event loop"""
+        await asyncio.to_thread(self._store, request, translations)
+        if request.shared:
+            await asyncio.wait([asyncio.wrap_future(future) for future, _ in request.shared.values()])
+        return self._assemble(request)
+    
+    def abandon_batch(self, request: BatchRequest, error: BaseException) -> None:
+        """Fail the segments this request was translating for others, so nobody waits forever"""
+        self._release(request, {}, error)
+    
+    def suggest(self, texts: List[str], target_lang: str) -> List[Optional[FuzzyMatch]]:
+        """The best earlier translation of a similar source for each text, with its score.
+        
+        Matches below ``fuzzy_threshold`` are not returned; callers can
+        accept high scores and send the rest for review.
+        """
+        if self.fuzzy_threshold is None:
+            raise RuntimeError("Fuzzy matching is off; create the TranslationManager with fuzzy_threshold")
+        return self.translation_memory.get_fuzzy_many([text.strip() for text in texts], self.current_engine,
+                                                      target_lang, self.fuzzy_threshold)
+    
+    def coalescing_stats(self) -> Dict[str, int]:
+        with self._flight_lock:
+            return {'in_flight': len(self._in_flight), 'coalesced': self.coalesced}
+    
+    def _claim(self, request: BatchRequest) -> None:
+        """Take over the missing segments nobody is translating yet; share the others"""
+        with self._flight_lock:
+            for core in list(request.missing):
+                key = (request.engine, request.target_lang, core)
+                future = self._in_flight.get(key)
+                if future is None:
+                    request.owned[core] = self._in_flight[key] = Future()
+                else:
+                    request.shared[core] = (future, request.missing.pop(core))
+                    self.coalesced += 1
+        
+        # A call may have finished between the memory lookup and the claim; results are
+        # stored before they are released, so a second look settles it
+        owned = list(request.missing)
+        found = {}
+        for core, cached in zip(owned, self.translation_memory.get_many(owned, request.engine,
+                                                                        request.target_lang)):
+            if cached is not None:
+                for index in request.missing.pop(core):
+                    request.results[index] = cached
+                found[core] = cached
+        if found:
+            self._release(request, found)
+    
+    def _accept_fuzzy(self, request: BatchRequest) -> None:
+        """Answer missing segments from close enough matches; they are not stored as exact entries"""
+        sources = list(request.missing)
+        matches = self.translation_memory.get_fuzzy_many(sources, request.engine, request.target_lang,
+                                                         self.fuzzy_accept)
+        for core, match in zip(sources, matches):
+            if match is not None:
+                for index in request.missing.pop(core):
+                    request.results[index] = match.translation
+                request.fuzzy[core] = match
+        with self._flight_lock:
+            self.fuzzy_accepted += len(request.fuzzy)
+    
+    def _store(self, request: BatchRequest, translations: List[str]) -> None:
+        sources = list(request.missing)
+        if len(translations) != len(sources):
+            raise ValueError(f"Expected {len(sources)} translations, got {len(translations)}")
+        translations = [translation.strip() for translation in translations]
+        if sources:
+            self.translation_memory.put_many(zip(sources, translations), request.engine, request.target_lang)
+        for core, translation in zip(sources, translations):
+            for index in request.missing[core]:
+                request.results[index] = translation
+        self._release(request, dict(zip(sources, translations)))
+    
+    def _release(self, request: BatchRequest, translations: Dict[str, str],
+                 error: Optional[BaseException] = None) -> None:
+        """Hand results (or ``error``) to the callers waiting on segments this request owns"""
+        settled = [core for core in request.owned if core in translations or error is not None]
+        with self._flight_lock:
+            for core in settled:
+                key = (request.engine, request.target_lang, core)
+                if self._in_flight.get(key) is request.owned[core]:
+                    del self._in_flight[key]
+        for core in settled:
+            future = request.owned.pop(core)
+            if not future.done():
+                if error is None:
+                    future.set_result(translations[core])
+                else:
+                    future.set_exception(error)
+    
+    def _assemble(self, request: BatchRequest) -> List[str]:
+        for core, (future, positions) in request.shared.items():
+            translation = future.result()
+            for index in positions:
+                request.results[index] = translation
+        return [self._restore_edges(text, core, result)
+                for text, core, result in zip(request.texts, request.cores, request.results)]
+    
+    @staticmethod
+    def _restore_edges(text: str, core: str, result: str) -> str:
+        if not core:
+            return text
+        start = text.index(core)
+        return text[:start] + result + text[start + len(core):]
+    
+    def translate_document(self, text: str, target_lang: str) -> str:
+        """Translate a whole document in bounded chunks, preserving its whitespace layout"""
+        segmented = self.segmenter.segment(text)
+        return segmented.join(self.translate_batch(segmented.chunks, target_lang))
+    
+    def get_available_engines(self) -> list[str]:
+        return list(self.engines.keys())
@@ -0,0 +1,123 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import queue
+import threading
+
+class TranslationCancelled(Exception):
+    """Raised inside a job once the user has cancelled it"""
+
+class TranslationWorker:
+    """Run translation jobs off the Tk thread and report back through a queue.
+    
+    A job is a callable that receives the worker. It runs in a daemon thread
+    and never touches widgets: it posts progress, preview and other events,
+    and calls ``check_cancelled`` between segments. The Tk thread drains the
+    queue every ``poll_interval_ms`` via ``after()`` and dispatches each event
+    to the handler registered under its name. Preview text and progress are
+    coalesced per poll, so a fast job is not held back by widget redraws.
+    
+    A finished job posts ``done`` with its result, ``cancelled``, or
+    ``failed`` with the exception.
+    """
+    
+    POLL_INTERVAL_MS = 100
+    
+    def __init__(self, root, handlers: Dict[str, Callable[..., None]],
+                 poll_interval_ms: int = POLL_INTERVAL_MS):
+        self.root = root
+        self.handlers = handlers
+        self.poll_interval_ms = poll_interval_ms
+        self._events: 'queue.Queue[Tuple[str, tuple]]' = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._on_done: Optional[Callable[[Any], None]] = None
+    
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    def start(self, job: Callable[['TranslationWorker'], Any],
+              on_done: Optional[Callable[[Any], None]] = None) -> bool:
+        """Start ``job`` unless one is already running; ``on_done`` overrides the done handler"""
+        if self.is_running:
+            return False
+        self._cancel.clear()
+        self._on_done = on_done
+        self._thread = threading.Thread(target=self._run, args=(job,), daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_interval_ms, self._poll)
+        return True
+    
+    def cancel(self) -> None:
+        self._cancel.set()
+    
+    # Called from the job's thread
+    
+    def post(self, kind: str, *args) -> None:
+        self._events.put((kind, args))
+    
+    def progress(self, current: int, total: int, message: str) -> None:
+        self.post('progress', current, total, message)
+    
+    def preview(self, text: str) -> None:
+        self.post('preview', text)
+    
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise TranslationCancelled()
+    
+    def _run(self, job: Callable[['TranslationWorker'], Any]) -> None:
+        try:
+            result = job(self)
+        except TranslationCancelled:
+            self.post('cancelled')
+        except Exception as e:
+            self.post('failed', e)
+        else:
+            if self.cancelled:
+                self.post('cancelled')
+            else:
+                self.post('done', result)
+    
+    # Called on the Tk thread
+    
+    def _poll(self) -> None:
+        preview: List[str] = []
+        progress: Optional[tuple] = None
+        finished = False
+        
+        def flush() -> None:
+            nonlocal progress
+            if preview:
+                self._dispatch('preview', (''.join(preview),))
+                preview.clear()
+            if progress is not None:
+                self._dispatch('progress', progress)
+                progress = None
+        
+        while True:
+            try:
+                kind, args = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'preview':
+                preview.append(args[0])
+            elif kind == 'progress':
+                progress = args
+            else:
+                # Keep the order of anything that is not coalesced
+                flush()
+                self._dispatch(kind, args)
+                finished = finished or kind in ('done', 'cancelled', 'failed')
+        flush()
+        
+        if not finished:
+            self.root.after(self.poll_interval_ms, self._poll)
+    
+    def _dispatch(self, kind: str, args: tuple) -> None:
+        handler = self._on_done if kind == 'done' and self._on_done else self.handlers.get(kind)
+        if handler:
+            handler(*args)
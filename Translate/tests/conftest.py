@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The application is run from src, where its modules import each other as top-level packages
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
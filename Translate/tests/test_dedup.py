@@ -0,0 +1,59 @@
+from core.batch_processor import BatchProcessor
+from core.dedup import SegmentDeduplicator
+from core.translator import TranslationEngine, TranslationManager
+
+def test_distinct_segments_are_counted_once():
+    deduplicator = SegmentDeduplicator(max_request_chars=60)
+    deduplicator.add(['Hello', 'World', 'Hello', '  '])
+    deduplicator.add(['World', 'Goodbye'])
+    deduplicator.add([])
+    
+    assert deduplicator.unique == ['Hello', 'World', 'Goodbye']
+    assert deduplicator.groups() == [['Hello', 'World', 'Goodbye']]
+    deduplicator.record(['Hello', 'World', 'Goodbye'], ['Bonjour', 'Monde', 'Au revoir'])
+    assert deduplicator.lookup(['World', 'Unknown']) == {'World': 'Monde'}
+    assert deduplicator.stats() == {
+        'files': 2,
+        'segments': 5,
+        'unique': 3,
+        'ratio': 0.4,
+        'requests': 1,
+        # Each file alone would have needed a request of its own
+        'requests_saved': 1,
+    }
+
+def test_groups_respect_the_request_size():
+    deduplicator = SegmentDeduplicator(max_request_chars=30)
+    deduplicator.add(['a' * 10, 'b' * 10, 'c' * 10])
+    assert deduplicator.groups() == [['a' * 10], ['b' * 10], ['c' * 10]]
+    assert deduplicator.stats()['requests'] == 3
+
+def test_empty_batch_reports_no_ratio():
+    assert SegmentDeduplicator(100).stats()['ratio'] == 0.0
+
+class UpperEngine(TranslationEngine):
+    def __init__(self):
+        self.calls = []
+    
+    def translate(self, text, target_lang):
+        self.calls.append(text)
+        return text.upper()
+
+def test_batch_translates_shared_segments_once(tmp_path):
+    sources = tmp_path / 'in'
+    sources.mkdir()
+    (sources / 'a.txt').write_text('Shared line.\nOnly in a.\n', encoding='utf-8')
+    (sources / 'b.txt').write_text('Shared line.\nOnly in b.\nShared line.\n', encoding='utf-8')
+    engine = UpperEngine()
+    manager = TranslationManager(filter_segments=False)
+    manager.engines['google'] = engine
+    processor = BatchProcessor(manager, incremental=False, dedup=True)
+    
+    files = [str(sources / 'a.txt'), str(sources / 'b.txt')]
+    results = processor.process_files(files, 'fr', str(tmp_path / 'out'))
+    
+    assert sorted(engine.calls) == ['Only in a.', 'Only in b.', 'Shared line.']
+    assert (tmp_path / 'out' / 'b.txt').read_text(encoding='utf-8') == 'SHARED LINE.\nONLY IN B.\nSHARED LINE.\n'
+    assert set(results) == set(files)
+    stats = processor.dedup_stats['fr']
+    assert (stats['files'], stats['unique']) == (2, 3)
@@ -0,0 +1,52 @@
+import docx
+from docx.oxml.ns import qn
+
+from core.docx_handler import DocxHandler
+
+def run_layout(run):
+    """The run's text and separators in order, as (tag, text) pairs"""
+    return [(child.tag.split('}')[1], child.text) for child in run._r
+            if child.tag in (qn('w:t'), qn('w:tab'), qn('w:br'))]
+
+def translate_file(tmp_path, build):
+    source = docx.Document()
+    build(source)
+    source_path, output_path = str(tmp_path / 'source.docx'), str(tmp_path / 'output.docx')
+    source.save(source_path)
+    handler = DocxHandler(source_path)
+    texts = handler.texts
+    handler.translate(lambda batch: [text.upper() for text in batch])
+    handler.save(output_path)
+    return texts, docx.Document(output_path).paragraphs[0].runs
+
+def test_tab_inside_a_run_stays_between_its_texts(tmp_path):
+    def build(document):
+        run = document.add_paragraph().add_run('Name')
+        run.add_tab()
+        run.add_text('Value')
+    
+    texts, runs = translate_file(tmp_path, build)
+    assert texts == ['Name', 'Value']
+    assert run_layout(runs[0]) == [('t', 'NAME'), ('tab', None), ('t', 'VALUE')]
+
+def test_break_inside_a_run_stays_between_its_lines(tmp_path):
+    def build(document):
+        run = document.add_paragraph().add_run('First line')
+        run.add_break()
+        run.add_text('Second line')
+    
+    texts, runs = translate_file(tmp_path, build)
+    assert texts == ['First line', 'Second line']
+    assert run_layout(runs[0]) == [('t', 'FIRST LINE'), ('br', None), ('t', 'SECOND LINE')]
+
+def test_paragraph_text_keeps_tabs_and_breaks(tmp_path):
+    document = docx.Document()
+    run = document.add_paragraph().add_run('Name')
+    run.add_tab()
+    run.add_text('Value')
+    run.add_break()
+    run.add_text('More')
+    path = str(tmp_path / 'source.docx')
+    document.save(path)
+    
+    assert DocxHandler(path).paragraph_texts()[0] == 'Name\tValue\nMore'
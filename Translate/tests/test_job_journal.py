@@ -0,0 +1,34 @@
+from core.job_journal import JobJournal
+
+def test_done_only_for_the_output_it_was_written_to(tmp_path):
+    source = tmp_path / 'a.txt'
+    source.write_text('Hello')
+    output = tmp_path / 'out' / 'a.txt'
+    output.parent.mkdir()
+    output.write_text('Bonjour')
+    journal = JobJournal(str(tmp_path / 'journal.db'))
+    journal.mark_done(str(source), 'fr', str(output), 'hash')
+    
+    assert journal.is_done(str(source), 'fr', 'hash', str(output))
+    assert not journal.is_done(str(source), 'fr', 'hash', str(tmp_path / 'other' / 'a.txt'))
+    assert not journal.is_done(str(source), 'fr', 'changed', str(output))
+    assert not journal.is_done(str(source), 'de', 'hash', str(output))
+
+def test_missing_output_is_not_done(tmp_path):
+    source = tmp_path / 'a.txt'
+    source.write_text('Hello')
+    output = tmp_path / 'a_translated.txt'
+    output.write_text('Bonjour')
+    journal = JobJournal(str(tmp_path / 'journal.db'))
+    journal.mark_done(str(source), 'fr', str(output), 'hash')
+    output.unlink()
+    
+    assert not journal.is_done(str(source), 'fr', 'hash', str(output))
+
+def test_segments_are_kept_until_done(tmp_path):
+    journal = JobJournal(':memory:')
+    journal.record_segments('a.txt', 'fr', [('Hello', 'Bonjour'), ('Goodbye', 'Au revoir')])
+    
+    assert journal.segments('a.txt', 'fr', ['Hello', 'Thanks']) == {'Hello': 'Bonjour'}
+    journal.mark_done('a.txt', 'fr', str(tmp_path / 'a_translated.txt'), 'hash')
+    assert journal.segments('a.txt', 'fr', ['Hello']) == {}
@@ -0,0 +1,65 @@
+import json
+
+from core.manifest import TranslationManifest
+
+def upper_counting(calls):
+    def translate_batch(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+    return translate_batch
+
+def test_only_new_or_edited_segments_are_translated(tmp_path):
+    output = tmp_path / 'a_translated.txt'
+    calls = []
+    first = TranslationManifest.load(str(output), 'fr')
+    assert first.translate(['One', 'Two', 'One'], upper_counting(calls)) == ['ONE', 'TWO', 'ONE']
+    first.save('hash-1')
+    
+    second = TranslationManifest.load(str(output), 'fr')
+    assert second.translate(['One', 'Three'], upper_counting(calls)) == ['ONE', 'THREE']
+    assert calls == [['One', 'Two'], ['Three']]
+    assert (second.reused, second.translated) == (1, 1)
+
+def test_save_drops_segments_no_longer_in_the_source(tmp_path):
+    output = tmp_path / 'a_translated.txt'
+    manifest = TranslationManifest.load(str(output), 'fr')
+    manifest.translate(['One', 'Two'], upper_counting([]))
+    manifest.save('hash-1')
+    manifest = TranslationManifest.load(str(output), 'fr')
+    manifest.translate(['Two'], upper_counting([]))
+    manifest.save('hash-2')
+    
+    data = json.loads(manifest.path.read_text(encoding='utf-8'))
+    assert data['source_hash'] == 'hash-2'
+    assert list(data['segments'].values()) == ['TWO']
+    assert not manifest.path.with_name(manifest.path.name + '.tmp').exists()
+
+def test_is_current_needs_same_source_and_existing_output(tmp_path):
+    output = tmp_path / 'a_translated.txt'
+    manifest = TranslationManifest.load(str(output), 'fr')
+    manifest.save('hash-1')
+    assert not TranslationManifest.load(str(output), 'fr').is_current('hash-1')
+    
+    output.write_text('translated', encoding='utf-8')
+    assert TranslationManifest.load(str(output), 'fr').is_current('hash-1')
+    assert not TranslationManifest.load(str(output), 'fr').is_current('hash-2')
+
+def test_other_target_or_corrupt_manifest_starts_empty(tmp_path):
+    output = tmp_path / 'a_translated.txt'
+    output.write_text('translated', encoding='utf-8')
+    manifest = TranslationManifest.load(str(output), 'fr')
+    manifest.translate(['One'], upper_counting([]))
+    manifest.save('hash-1')
+    
+    other = TranslationManifest.load(str(output), 'de')
+    assert other.source_hash is None and other.pending(['One']) == ['One']
+    
+    manifest.path.write_text('{not json', encoding='utf-8')
+    assert TranslationManifest.load(str(output), 'fr').pending(['One']) == ['One']
+
+def test_hash_file_matches_the_bytes(tmp_path):
+    first, second = tmp_path / 'a.txt', tmp_path / 'b.txt'
+    first.write_bytes(b'Hello\r\n')
+    second.write_bytes(b'Hello\n')
+    assert TranslationManifest.hash_file(str(first)) != TranslationManifest.hash_file(str(second))
+    assert TranslationManifest.hash_file(str(first)) == TranslationManifest.hash_file(str(first))
@@ -0,0 +1,75 @@
+import pytest
+
+from core import rate_limiter
+from core.rate_limiter import CircuitBreaker, CircuitOpenError
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock)
+    return clock
+
+def open_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    for _ in range(2):
+        breaker.check()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+def test_opens_after_threshold_and_refuses_until_timeout(clock):
+    breaker = open_breaker()
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = open_breaker()
+    clock.now += 30
+    breaker.check()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Everyone else waits for the probe's outcome
+    with pytest.raises(CircuitOpenError, match='probed'):
+        breaker.check()
+
+def test_successful_probe_closes(clock):
+    breaker = open_breaker()
+    clock.now += 30
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.check()
+    breaker.check()
+
+def test_failed_probe_reopens_for_another_timeout(clock):
+    breaker = open_breaker()
+    clock.now += 30
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 29
+    with pytest.raises(CircuitOpenError, match='unavailable'):
+        breaker.check()
+    clock.now += 1
+    breaker.check()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+def test_lost_probe_is_replaced_after_timeout(clock):
+    breaker = open_breaker()
+    clock.now += 30
+    breaker.check()
+    # The probe never reports back
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock.now += 1
+    breaker.check()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
@@ -0,0 +1,55 @@
+import pytest
+
+from core.language_detector import LanguageDetector
+from core.segment_filter import SegmentFilter
+
+@pytest.mark.parametrize('text', [
+    '42',
+    'https://example.com/docs/index.html',
+    'support@example.com',
+    'C:\\Users\\app\\config.json',
+    'v2.10.3',
+    'config.load_settings()',
+    'AB1234-X',
+])
+def test_nothing_to_translate(text):
+    assert SegmentFilter().classify(text, 'fr') == 'no_text'
+
+def test_code_needs_two_signs():
+    segment_filter = SegmentFilter()
+    assert segment_filter.classify('if (count == total) { finish(); }', 'fr') == 'code'
+    assert segment_filter.classify('Press the button (the red one) to start', 'fr') is None
+
+@pytest.mark.parametrize('text, target_lang, reason', [
+    ('বাংলা ভাষা', 'bn', 'target_language'),
+    ('বাংলা ভাষা', 'ta', None),
+    ('यह एक बहुत लंबा वाक्य है जिसमें कई शब्द हैं और वह हिंदी में है', 'hi', 'target_language'),
+    ('मी घरी जात आहे आणि तो नाही', 'mr', 'target_language'),
+    ('This is an English sentence long enough to detect', 'en', 'target_language'),
+    ('Short English', 'en', None),
+    ('This is an English sentence long enough to detect', 'hi', None),
+])
+def test_target_language(text, target_lang, reason):
+    assert SegmentFilter().classify(text, target_lang) == reason
+
+@pytest.mark.parametrize('text', ['कृपया ध्यान दें', 'खाना खाओ'])
+@pytest.mark.parametrize('target_lang', ['hi', 'mr'])
+def test_short_devanagari_without_markers_is_translated(text, target_lang):
+    # langdetect cannot tell Hindi from Marathi in a few words, so neither target may skip them
+    assert SegmentFilter().classify(text, target_lang) is None
+
+def test_unsupported_target_skips_langdetect(monkeypatch):
+    detector = LanguageDetector()
+    monkeypatch.setattr(detector, 'detect_language', lambda text: pytest.fail('langdetect was called'))
+    segment_filter = SegmentFilter(detector)
+    assert segment_filter.classify('Ceci est une phrase française assez longue pour détecter', 'fr') is None
+
+def test_split_counts_what_passes():
+    segment_filter = SegmentFilter()
+    kept = segment_filter.split(['Hello there, friend', '12.5kg', 'https://example.com'], 'fr', 5000)
+    assert kept == ['Hello there, friend']
+    stats = segment_filter.stats()
+    assert stats['segments'] == 3
+    assert stats['passed'] == stats['no_text'] == 2
+    assert stats['characters_saved'] == len('12.5kg') + len('https://example.com')
+    assert stats['requests_saved'] == 0
@@ -0,0 +1,46 @@
+import pytest
+
+from core.segmenter import SegmentedText, TextSegmenter
+
+TEXTS = [
+    '',
+    '   ',
+    'One line.',
+    '  Leading and trailing spaces.  \n',
+    'First paragraph.\n\n  Second paragraph.\r\n\tThird.\n\n\n',
+    'A first sentence. A second one! And a third? The end.',
+    'Hindi sentence one। Hindi sentence two॥ 中文句子。 Last.',
+    'averyveryverylongwordwithoutanyspacesatallthatmustbecutsomewhere',
+    'Words  with   double spaces\tand tabs that go on and on past the limit.',
+]
+
+@pytest.mark.parametrize('max_chars', [10, 25, 4500])
+@pytest.mark.parametrize('text', TEXTS)
+def test_identity_round_trip(text, max_chars):
+    segmented = TextSegmenter(max_chars).segment(text)
+    assert segmented.join(segmented.chunks) == text
+    assert all(0 < len(chunk) <= max_chars for chunk in segmented.chunks)
+    assert all(chunk == chunk.strip() for chunk in segmented.chunks)
+
+def test_layout_is_kept_around_translations():
+    segmented = TextSegmenter(20).segment('  Hello there.\n\nHow are you today? Fine.\n')
+    assert segmented.chunks == ['Hello there.', 'How are you today?', 'Fine.']
+    assert segmented.join(['Bonjour.', 'Comment allez-vous ?', 'Bien.']) == \
+        '  Bonjour.\n\nComment allez-vous ? Bien.\n'
+
+def test_sentences_are_packed_up_to_the_limit():
+    segmented = TextSegmenter(30).segment('One. Two. Three. Four. Five. Six. Seven.')
+    assert segmented.chunks == ['One. Two. Three. Four. Five.', 'Six. Seven.']
+
+def test_join_needs_one_translation_per_chunk():
+    segmented = TextSegmenter().segment('One.\nTwo.')
+    with pytest.raises(ValueError):
+        segmented.join(['Un.'])
+
+def test_separators_must_outnumber_chunks_by_one():
+    with pytest.raises(ValueError):
+        SegmentedText(['a', 'b'], ['', ''])
+
+def test_max_chars_must_be_positive():
+    with pytest.raises(ValueError):
+        TextSegmenter(0)
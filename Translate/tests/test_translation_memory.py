@@ -0,0 +1,166 @@
+import hashlib
+import sqlite3
+
+from core.translation_memory import FuzzyMatch, TranslationMemory
+
+def schema_1_key(text: str, engine: str, target_lang: str) -> str:
+    # Schema 1 keyed entries by the full hex SHA-256 digest
+    digest = hashlib.sha256()
+    for part in (engine, target_lang, TranslationMemory.normalize(text)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def make_schema_1_database(path, entries, fuzzy=False):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE entries (key TEXT PRIMARY KEY, translation TEXT NOT NULL, last_used INTEGER NOT NULL)')
+    conn.execute('CREATE INDEX entries_last_used ON entries(last_used)')
+    if fuzzy:
+        conn.execute('ALTER TABLE entries ADD COLUMN source TEXT')
+        conn.execute('CREATE TABLE fuzzy_buckets (bucket INTEGER NOT NULL, key TEXT NOT NULL,'
+                     ' PRIMARY KEY (bucket, key)) WITHOUT ROWID')
+    for clock, (text, engine, target_lang, translation) in enumerate(entries, 1):
+        key = schema_1_key(text, engine, target_lang)
+        if fuzzy:
+            source = TranslationMemory.normalize(text)
+            conn.execute('INSERT INTO entries (key, translation, last_used, source) VALUES (?, ?, ?, ?)',
+                         (key, translation, clock, source))
+            conn.executemany('INSERT INTO fuzzy_buckets (bucket, key) VALUES (?, ?)',
+                             [(bucket, key) for bucket in TranslationMemory._buckets(source, engine, target_lang)])
+        else:
+            conn.execute('INSERT INTO entries (key, translation, last_used) VALUES (?, ?, ?)',
+                         (key, translation, clock))
+    conn.commit()
+    conn.close()
+
+def test_schema_1_entries_are_read_after_migration(tmp_path):
+    path = str(tmp_path / 'memory.db')
+    make_schema_1_database(path, [
+        ('Hello world', 'google', 'hi', 'नमस्ते दुनिया'),
+        ('Good  morning', 'google', 'fr', 'Bonjour'),
+    ])
+    
+    memory = TranslationMemory(path)
+    try:
+        assert len(memory) == 2
+        assert memory.get('Hello world', 'google', 'hi') == 'नमस्ते दुनिया'
+        assert memory.get('Good morning', 'google', 'fr') == 'Bonjour'
+        assert memory.get('Hello world', 'google', 'fr') is None
+        
+        memory.put('Hello world', 'google', 'hi', 'हैलो दुनिया')
+        assert len(memory) == 2
+        assert memory.get('Hello world', 'google', 'hi') == 'हैलो दुनिया'
+    finally:
+        memory.close()
+    
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == TranslationMemory.SCHEMA_VERSION
+    assert conn.execute("SELECT DISTINCT typeof(key) FROM entries").fetchall() == [('blob',)]
+    conn.close()
+
+def test_schema_1_fuzzy_entries_are_found_after_migration(tmp_path):
+    path = str(tmp_path / 'memory.db')
+    make_schema_1_database(path, [('The quick brown fox jumps over the lazy dog', 'google', 'fr',
+                                   'Le rapide renard brun saute par-dessus le chien paresseux')], fuzzy=True)
+    
+    memory = TranslationMemory(path, fuzzy=True)
+    try:
+        match = memory.get_fuzzy('The quick brown fox jumps over the lazy dogs', 'google', 'fr')
+        assert isinstance(match, FuzzyMatch)
+        assert match.translation == 'Le rapide renard brun saute par-dessus le chien paresseux'
+    finally:
+        memory.close()
+
+def test_fuzzy_and_plain_memories_share_a_file(tmp_path):
+    path = str(tmp_path / 'memory.db')
+    fuzzy = TranslationMemory(path, fuzzy=True, hot_entries=0)
+    fuzzy.put_many([
+        ('The cat sat on the mat', 'Le chat était assis sur le tapis'),
+        ('A storm is coming from the north', 'Une tempête arrive du nord'),
+    ], 'google', 'fr')
+    plain = TranslationMemory(path, max_entries=4, hot_entries=0)
+    try:
+        # Overwritten without the index, the entry keeps its source and stays findable
+        plain.put('The cat sat on the mat', 'google', 'fr', 'Le chat s\'est assis sur le tapis')
+        match = fuzzy.get_fuzzy('The cat sat on the mat!', 'google', 'fr')
+        assert match is not None
+        assert match.translation == 'Le chat s\'est assis sur le tapis'
+        
+        # Evicted without the index, the two oldest entries take their buckets with them;
+        # the newer ones were stored without buckets, so nothing is found
+        plain.put_many([(f'Unrelated sentence number {index}', f'Phrase {index}') for index in range(4)],
+                       'google', 'fr')
+        assert len(plain) <= 4
+        assert fuzzy.get_fuzzy_many(['The cat sat on the mat!', 'A storm is coming from the north!',
+                                     'Unrelated sentence number 1!'], 'google', 'fr') == [None, None, None]
+        
+        conn = sqlite3.connect(path)
+        for table in ('fuzzy_buckets', 'fuzzy_sources'):
+            assert conn.execute(f'SELECT COUNT(*) FROM {table} t LEFT JOIN entries e ON e.key = t.key'
+                                ' WHERE e.key IS NULL').fetchone()[0] == 0
+        conn.close()
+    finally:
+        plain.close()
+        fuzzy.close()
+
+def test_plain_memory_stores_no_sources(tmp_path):
+    path = str(tmp_path / 'memory.db')
+    memory = TranslationMemory(path)
+    try:
+        memory.put_many([('Hello world', 'Bonjour le monde'), ('Good night', 'Bonne nuit')], 'google', 'fr')
+    finally:
+        memory.close()
+    
+    conn = sqlite3.connect(path)
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(entries)')]
+    assert columns == ['key', 'translation', 'last_used']
+    assert conn.execute('SELECT COUNT(*) FROM fuzzy_sources').fetchone()[0] == 0
+    assert conn.execute('SELECT COUNT(*) FROM fuzzy_buckets').fetchone()[0] == 0
+    conn.close()
+
+def test_schema_2_sources_move_out_of_the_entries(tmp_path):
+    path = str(tmp_path / 'memory.db')
+    indexed = 'The quick brown fox jumps over the lazy dog'
+    key, plain_key = (TranslationMemory.make_key(text, 'google', 'fr') for text in (indexed, 'Good night'))
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE entries (key BLOB PRIMARY KEY, translation TEXT NOT NULL,'
+                 ' last_used INTEGER NOT NULL, source TEXT)')
+    conn.execute('CREATE TABLE fuzzy_buckets (bucket INTEGER NOT NULL, key BLOB NOT NULL,'
+                 ' PRIMARY KEY (bucket, key)) WITHOUT ROWID')
+    conn.executemany('INSERT INTO entries VALUES (?, ?, 1, ?)', [
+        (key, 'Le rapide renard brun saute par-dessus le chien paresseux', indexed),
+        (plain_key, 'Bonne nuit', 'Good night'),
+    ])
+    conn.executemany('INSERT INTO fuzzy_buckets VALUES (?, ?)',
+                     [(bucket, key) for bucket in TranslationMemory._buckets(indexed, 'google', 'fr')])
+    conn.execute('PRAGMA user_version = 2')
+    conn.commit()
+    conn.close()
+    
+    memory = TranslationMemory(path, fuzzy=True)
+    try:
+        assert memory.get('Good night', 'google', 'fr') == 'Bonne nuit'
+        match = memory.get_fuzzy(indexed + 's', 'google', 'fr')
+        assert match is not None and match.source == indexed
+    finally:
+        memory.close()
+    
+    conn = sqlite3.connect(path)
+    assert 'source' not in [row[1] for row in conn.execute('PRAGMA table_info(entries)')]
+    assert conn.execute('SELECT key FROM fuzzy_sources').fetchall() == [(key,)]
+    conn.close()
+
+def test_entries_stay_compact():
+    # 16-byte keys, no sources and the last_used index come to about 76 bytes beyond the
+    # translation; hex keys or stored sources would add as much again
+    entries = 5000
+    pairs = [(f'{index} source sentence number {index} of the compaction check',
+              'कखगघ चछजझ ' * 8) for index in range(entries)]
+    memory = TranslationMemory(max_entries=entries, hot_entries=0)
+    try:
+        memory.put_many(pairs, 'google', 'hi')
+        translation_bytes = sum(len(translation.encode('utf-8')) for _, translation in pairs)
+        overhead = (memory.memory_usage()['database_bytes'] - translation_bytes) / entries
+    finally:
+        memory.close()
+    assert overhead < 100
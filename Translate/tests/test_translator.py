@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.translator import GoogleTranslationEngine, TranslationEngine, TranslationManager
+
+class BlockingEngine(TranslationEngine):
+    """Upper-cases text, holding every call until ``release`` is set"""
+    
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+    
+    def translate(self, text, target_lang):
+        self.calls.append(text)
+        self.started.set()
+        assert self.release.wait(5)
+        return text.upper()
+
+def make_manager(engine):
+    manager = TranslationManager(filter_segments=False)
+    manager.engines['google'] = engine
+    return manager
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_concurrent_callers_share_one_engine_call():
+    engine = BlockingEngine()
+    manager = make_manager(engine)
+    results = {}
+    first = threading.Thread(target=lambda: results.update(first=manager.translate_batch(['Hello'], 'fr')))
+    second = threading.Thread(target=lambda: results.update(second=manager.translate_batch([' Hello '], 'fr')))
+    first.start()
+    assert engine.started.wait(5)
+    second.start()
+    wait_until(lambda: manager.coalescing_stats()['coalesced'] == 1)
+    engine.release.set()
+    first.join(5)
+    second.join(5)
+    
+    assert engine.calls == ['Hello']
+    assert results == {'first': ['HELLO'], 'second': [' HELLO ']}
+    assert manager.coalescing_stats() == {'in_flight': 0, 'coalesced': 1}
+
+def test_waiters_get_the_owners_error():
+    manager = make_manager(BlockingEngine())
+    owner = manager.prepare_batch(['Hello', 'World'], 'fr')
+    waiter = manager.prepare_batch(['Hello'], 'fr')
+    assert list(owner.missing) == ['Hello', 'World']
+    assert list(waiter.missing) == [] and list(waiter.shared) == ['Hello']
+    
+    manager.abandon_batch(owner, RuntimeError('backend down'))
+    with pytest.raises(RuntimeError, match='backend down'):
+        manager.complete_batch(waiter, [])
+    assert manager.coalescing_stats()['in_flight'] == 0
+    # Nothing was stored, so the next call claims the segment again
+    assert list(manager.prepare_batch(['Hello'], 'fr').missing) == ['Hello']
+
+def test_released_segments_are_read_from_memory():
+    manager = make_manager(BlockingEngine())
+    owner = manager.prepare_batch(['Hello'], 'fr')
+    assert manager.complete_batch(owner, ['Bonjour']) == ['Bonjour']
+    
+    later = manager.prepare_batch(['Hello'], 'fr')
+    assert not later.missing and not later.shared
+    assert manager.complete_batch(later, []) == ['Bonjour']
+
+def test_async_waiter_does_not_block_the_loop():
+    manager = make_manager(BlockingEngine())
+    owner = manager.prepare_batch(['Hello', 'World'], 'fr')
+    waiter = manager.prepare_batch(['World', 'Again'], 'fr')
+    assert list(waiter.shared) == ['World'] and list(waiter.missing) == ['Again']
+    
+    async def run():
+        waiting = asyncio.ensure_future(manager.complete_batch_async(waiter, ['Encore']))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        # The owner completes on the same loop while the waiter is parked on it
+        owned = await manager.complete_batch_async(owner, ['Bonjour', 'Monde'])
+        return owned, await asyncio.wait_for(waiting, 5)
+    
+    # A loop blocked by the waiter would never run the owner, so give up on it rather than hang
+    results = []
+    loop_thread = threading.Thread(target=lambda: results.append(asyncio.run(run())), daemon=True)
+    loop_thread.start()
+    loop_thread.join(5)
+    assert results == [(['Bonjour', 'Monde'], ['Monde', 'Encore'])]
+    assert manager.coalescing_stats() == {'in_flight': 0, 'coalesced': 1}
+
+def test_unpack_splits_on_numbered_markers():
+    engine = GoogleTranslationEngine(client_cache=object())
+    packed = engine._pack(['Hello', 'Good morning', 'Bye'])
+    assert packed == '[[0]]\nHello\n[[1]]\nGood morning\n[[2]]\nBye'
+    assert engine._unpack(packed, 3) == ['Hello', 'Good morning', 'Bye']
+    # Backends may pad or re-space the markers
+    assert engine._unpack(' [[ 0 ]] Bonjour \n[[1]]Bon matin\n[[ 2]]\nAu revoir\n', 3) == \
+        ['Bonjour', 'Bon matin', 'Au revoir\n']
+
+@pytest.mark.parametrize('translated', [
+    '[[0]]\nBonjour\n[[1]]\nBon matin',                      # a marker lost
+    '[[0]]\nBonjour\n[[2]]\nBon matin\n[[1]]\nAu revoir',   # out of order
+    'Voici : [[0]]\nBonjour\n[[1]]\nBon matin\n[[2]]\nAu revoir',  # text before the first marker
+    '[[0]]\nBonjour\n[[1]]\nBon matin\n[[2]]\nAu revoir\n[[3]]\nEncore',
+])
+def test_unpack_rejects_mangled_markers(translated):
+    assert GoogleTranslationEngine(client_cache=object())._unpack(translated, 3) is None
+
+def test_every_request_goes_through_the_hook():
+    engine = GoogleTranslationEngine(client_cache=object())
+    requests = []
+    
+    def mangle(text, target_lang):
+        requests.append(text)
+        return 'Voici : ' + text
+    
+    results = engine.translate_batch(['Hello', ' Good morning ', '', 'Bye'], 'fr', request=mangle)
+    # One packed request, then one per segment once its markers could not be split off
+    assert requests == [engine._pack(['Hello', 'Good morning', 'Bye']), 'Hello', 'Good morning', 'Bye']
+    assert results == ['Voici : Hello', ' Voici : Good morning ', '', 'Voici : Bye']